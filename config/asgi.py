@@ -0,0 +1,28 @@
+"""
+ASGI config for Prospector project.
+
+This module contains the ASGI application used by ASGI servers such as uvicorn,
+which let the async views (the address lookups) wait on other services without
+holding a thread.  It should expose a module-level variable named
+``application``, e.g.::
+
+    uvicorn config.asgi:application --workers 4
+
+The WSGI application in config/wsgi.py serves the same site, and the async views
+work there too, just without that benefit.
+"""
+import os
+import sys
+
+from django.core.asgi import get_asgi_application
+
+# This allows easy placement of apps within the interior
+# prospector directory.
+app_path = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+)
+sys.path.append(os.path.join(app_path, "prospector"))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+application = get_asgi_application()
@@ -59,6 +59,11 @@ SITE_URL = env.str("SITE_URL", "")
 # https://docs.djangoproject.com/en/dev/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
+# This commit ID is substituted in during the Docker build process
+COMMIT_ID = "@@__COMMIT_ID__@@"
+if COMMIT_ID == ("@@" + "__COMMIT_ID__" + "@@"):
+    COMMIT_ID = ""
+
 # Sentry
 # ------------------------------------------------------------------------------
 SENTRY_DSN = env("SENTRY_DSN", default="")
@@ -72,12 +77,7 @@ if SENTRY_DSN:
         event_level=logging.ERROR,  # Send events from Error messages
     )
 
-    # This commit ID is substituted in during the Docker build process
-    COMMIT_ID = "@@__COMMIT_ID__@@"
-    if COMMIT_ID != ("@@" + "__COMMIT_ID__" + "@@"):
-        SENTRY_RELEASE = f"prospector@{COMMIT_ID}"
-    else:
-        SENTRY_RELEASE = None
+    SENTRY_RELEASE = f"prospector@{COMMIT_ID}" if COMMIT_ID else None
 
     sentry_sdk.init(
         dsn=SENTRY_DSN,
@@ -144,6 +144,7 @@ LOCAL_APPS = [
     "prospector.apps.crm",
     "prospector.dataformats",
     "prospector.apps.parity",
+    "prospector.apps.exports",
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -187,8 +188,10 @@ AUTH_PASSWORD_VALIDATORS = [
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
     "prospector.middleware.healthcheck.HealthCheckMiddleware",
+    "prospector.middleware.metrics.MetricsMiddleware",
+    "prospector.middleware.performance.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "prospector.middleware.static.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -198,6 +201,28 @@ MIDDLEWARE = [
     "waffle.middleware.WaffleMiddleware",
 ]
 
+# PAGE CACHE
+# ------------------------------------------------------------------------------
+# Pages that are the same for every visitor, and the static blocks of the others,
+# are kept in the "pages" cache.  Its entries are versioned by the deployed commit,
+# so each deploy starts with an empty cache.  Templates read the timeout as
+# PAGE_CACHE_TIMEOUT, for their {% cache %} blocks.
+PAGE_CACHE_TIMEOUT = env.int("PAGE_CACHE_TIMEOUT", default=60 * 60)
+PAGE_CACHE_VERSION = env.str("PAGE_CACHE_VERSION", default=COMMIT_ID or "1")
+
+# SESSIONS
+# ------------------------------------------------------------------------------
+# The questionnaire keeps its state (the answers id and the trail) in the session,
+# which is read on every page.  Keep that out of the database: by default sessions
+# live in the "sessions" cache (Redis in production).  Set DJANGO_SESSION_ENGINE to
+# "django.contrib.sessions.backends.signed_cookies" to keep them client-side instead.
+# https://docs.djangoproject.com/en/dev/ref/settings/#session-engine
+SESSION_ENGINE = env.str(
+    "DJANGO_SESSION_ENGINE", default="django.contrib.sessions.backends.cache"
+)
+# https://docs.djangoproject.com/en/dev/ref/settings/#session-cache-alias
+SESSION_CACHE_ALIAS = "sessions"
+
 # STATIC
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#static-root
@@ -256,6 +281,7 @@ TEMPLATES = [
                 "django.template.context_processors.static",
                 "django.template.context_processors.tz",
                 "django.contrib.messages.context_processors.messages",
+                "prospector.apps.questionnaire.context_processors.page_cache",
             ],
         },
     }
@@ -310,6 +336,64 @@ CRM_API = {
     "RESOURCE": env.str("CRM_API_RESOURCE", default=""),
     "CLIENT_ID": env.str("CRM_API_CLIENT_ID", default=""),
     "CLIENT_SECRET": env.str("CRM_API_CLIENT_SECRET", default=""),
+    # Overrides the Azure AD token endpoint, e.g. for the fake CRM server
+    "TOKEN_URL": env.str("CRM_API_TOKEN_URL", default=""),
+}
+
+# BULK ELIGIBILITY API
+# ------------------------------------------------------------------------------
+# Partner organisations and their API keys, as name=key,name=key
+PARTNER_API_KEYS = env.dict("PARTNER_API_KEYS", default={})
+BULK_ELIGIBILITY_MAX_PROPERTIES = 10000
+# Properties looked up in the Parity data per query
+BULK_ELIGIBILITY_CHUNK_SIZE = 500
+
+# PARITY SNAPSHOT
+# ------------------------------------------------------------------------------
+# Where the Parity imports keep a columnar copy of the data for reports, such
+# as stock_report --snapshot; blank (the default) to not keep one.  See
+# prospector.apps.parity.snapshot.
+PARITY_SNAPSHOT_DIR = env.str("PARITY_SNAPSHOT_DIR", default="")
+
+# API RECORDER
+# ------------------------------------------------------------------------------
+# "record" to keep each Postcoder, Data8 and CRM call, redacted, in
+# API_RECORDER_DIR; "replay" to answer those calls from the recordings instead
+# of the network.  See prospector.apis.recorder.
+API_RECORDER = env.str("API_RECORDER", default="")
+API_RECORDER_DIR = env.str("API_RECORDER_DIR", default=str(ROOT_DIR("recordings")))
+API_RECORDER_MAX_BYTES = env.int("API_RECORDER_MAX_BYTES", default=10 * 1024 * 1024)
+API_RECORDER_BACKUPS = env.int("API_RECORDER_BACKUPS", default=5)
+
+# METRICS
+# ------------------------------------------------------------------------------
+# Where the web, Celery and RQ processes keep their metrics; Redis by default, so
+# that one scrape of /.well-known/x-metrics sees them all.  Scrapers authenticate
+# with METRICS_TOKEN, and the endpoint is off without one.
+METRICS_BACKEND = env.str(
+    "METRICS_BACKEND", default="prospector.metrics.backends.RedisBackend"
+)
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+# Seconds between writes of the samples recorded on every request
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=5)
+
+# PERFORMANCE
+# ------------------------------------------------------------------------------
+# Outbound HTTP calls are timed per service, by host; calls to the CRM_API
+# RESOURCE host are tagged "crm" too.
+PERFORMANCE_HTTP_TAGS = {
+    "ws.postcoder.com": "postcoder",
+    "webservices.data-8.co.uk": "data8",
+    "login.microsoftonline.com": "crm",
+}
+# Per-view limits (by view class name, "*" for all views) on the measures
+# recorded by PerformanceMiddleware: wall_ms, queries, db_ms, http_ms,
+# cache_misses, and <tag>_calls and <tag>_ms for each PERFORMANCE_HTTP_TAGS tag.
+# Requests that exceed them are logged as warnings.
+PERFORMANCE_BUDGETS = {
+    "*": {"wall_ms": 1000, "queries": 20, "postcoder_calls": 1, "data8_calls": 1},
+    "PropertyAddress": {"wall_ms": 3000},
+    "RecommendedMeasures": {"wall_ms": 2000},
 }
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = ["gds"]
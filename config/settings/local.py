@@ -49,8 +49,22 @@ CACHES = {
             "MAX_ENTRIES": 10000,
         },
     },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sessions",
+    },
+    # Not cached, so template changes show straight away
+    "pages": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
 }
 
+# PARITY SNAPSHOT
+# ------------------------------------------------------------------------------
+PARITY_SNAPSHOT_DIR = env.str(
+    "PARITY_SNAPSHOT_DIR", default=str(ROOT_DIR("snapshots/parity"))  # noqa
+)
+
 # LOGGING
 # ------------------------------------------------------------------------------
 coloredlogs.install()
@@ -53,6 +53,12 @@ CACHES = {
             "MAX_ENTRIES": 10000,
         },
     },
+    "pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pages",
+        "TIMEOUT": PAGE_CACHE_TIMEOUT,  # noqa F405
+        "VERSION": PAGE_CACHE_VERSION,  # noqa F405
+    },
 }
 
 # SECURITY
@@ -1,3 +1,5 @@
+from urllib.parse import quote
+
 import requests
 
 from .base import *  # noqa
@@ -55,6 +57,33 @@ CACHES = {
             "MAX_ENTRIES": 10000,
         },
     },
+    # Questionnaire sessions; a separate Redis database from the RQ/Celery queues.
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        # Same connection settings as RQ_QUEUES, including password and TLS.
+        "LOCATION": "{0}://:{1}@{2}:{3}/{4}".format(
+            "rediss" if env.bool("REDIS_SSL", default=False) else "redis",
+            quote(env.str("REDIS_PASSWORD", default=""), safe=""),
+            env.str("REDIS_HOST"),
+            env.int("REDIS_PORT", default=6379),
+            env.int("REDIS_SESSION_DB", default=1),
+        ),
+    },
+    # Shared by the web workers, so a campaign's landing page is rendered once.
+    # A database of its own, as clearing it flushes the whole database.
+    "pages": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "{0}://:{1}@{2}:{3}/{4}".format(
+            "rediss" if env.bool("REDIS_SSL", default=False) else "redis",
+            quote(env.str("REDIS_PASSWORD", default=""), safe=""),
+            env.str("REDIS_HOST"),
+            env.int("REDIS_PORT", default=6379),
+            env.int("REDIS_PAGE_CACHE_DB", default=2),
+        ),
+        "KEY_PREFIX": "pages",
+        "TIMEOUT": PAGE_CACHE_TIMEOUT,  # noqa F405
+        "VERSION": PAGE_CACHE_VERSION,  # noqa F405
+    },
 }
 
 # SECURITY
@@ -22,6 +22,8 @@ TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
 # Turn off whitenoise for test runs
 STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
+# Link the stylesheet rather than compiling it, which needs node_modules
+SASS_PROCESSOR_ENABLED = False
 
 # CACHES
 # ------------------------------------------------------------------------------
@@ -39,8 +41,27 @@ CACHES = {
             "MAX_ENTRIES": 10000,
         },
     },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sessions",
+    },
+    "pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pages",
+        "VERSION": PAGE_CACHE_VERSION,  # noqa F405
+    },
 }
 
+# METRICS
+# ------------------------------------------------------------------------------
+METRICS_BACKEND = "prospector.metrics.backends.LocalBackend"
+# Tests flush buffered samples themselves, with metrics.flush()
+METRICS_FLUSH_INTERVAL = 60 * 60
+
+# PARITY SNAPSHOT
+# ------------------------------------------------------------------------------
+PARITY_SNAPSHOT_DIR = ""
+
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
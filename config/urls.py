@@ -1,16 +1,24 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.urls import include
 from django.urls import path
 from django.views import defaults as default_views
 
+from prospector.middleware.performance import performance_report
+
 
 urlpatterns = [
     path("", include("prospector.apps.questionnaire.urls")),
     path("accounts/", include("prospector.apps.users.urls")),
     # Has to go above the main admin bit
     path(f"{settings.ADMIN_URL}django-rq/", include("django_rq.urls")),
+    path(
+        f"{settings.ADMIN_URL}performance/",
+        staff_member_required(performance_report),
+        name="performance-report",
+    ),
     path(settings.ADMIN_URL, admin.site.urls),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
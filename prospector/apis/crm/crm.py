@@ -1,20 +1,60 @@
+import email.utils
+import functools
 import json
 import logging
+import re
+import time
 import urllib.parse
+import uuid
 from pathlib import Path
+from typing import List
 from typing import Optional
+from typing import Tuple
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from oauthlib.oauth2 import BackendApplicationClient
+from oauthlib.oauth2 import TokenExpiredError
 from requests_oauthlib import OAuth2Session
 
+from prospector.apis import recorder
 from prospector.apps.questionnaire import enums
 from prospector.apps.questionnaire import models
 
 logger = logging.getLogger(__name__)
 
 
+class CrmThrottled(Exception):
+    """The CRM's service protection limits were hit; back off for retry_after."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("CRM throttled, retry after %ss" % retry_after)
+        self.retry_after = retry_after
+
+
+class CrmUnauthorised(Exception):
+    """The CRM rejected the session's access token, e.g. because it expired."""
+
+
+# Errors a fresh session can fix; the request never reached the CRM's records
+AUTH_ERRORS = (CrmUnauthorised, TokenExpiredError)
+
+
+def parse_retry_after(value: Optional[str], default: float = 1) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return default
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(0, retry_at.timestamp() - time.time())
+
+
 def get_crm_settings():
     unconfigured_settings = False
     if not getattr(settings, "CRM_API", False):
@@ -39,7 +79,8 @@ def get_settings():
         "client_secret": crm_api["CLIENT_SECRET"],
         "resource": crm_api["RESOURCE"],
         "token_url": (
-            "https://login.microsoftonline.com/%s/oauth2/token" % (crm_api["TENANT"])
+            crm_api.get("TOKEN_URL")
+            or "https://login.microsoftonline.com/%s/oauth2/token" % (crm_api["TENANT"])
         ),
         "include_client_id": True,
     }
@@ -57,6 +98,7 @@ def get_authorised_session(client):
     return session
 
 
+@recorder.recorded("crm")
 def crm_request(session, query, params={}, json={}, request_method="GET"):
     crm_api = get_crm_settings()
 
@@ -70,14 +112,86 @@ def crm_request(session, query, params={}, json={}, request_method="GET"):
         "prefer": "return=representation",
     }
 
-    return session.request(
+    response = session.request(
         request_method,
         url,
         timeout=15,
         params=encoded_params,
         json=json,
         headers=headers,
-    ).json()
+    )
+    check_throttled(response)
+    check_authorised(response)
+    return response.json()
+
+
+def check_throttled(response):
+    if response.status_code == 429:
+        raise CrmThrottled(parse_retry_after(response.headers.get("Retry-After")))
+
+
+def check_authorised(response):
+    if response.status_code == 401:
+        raise CrmUnauthorised("CRM rejected the access token")
+
+
+@recorder.recorded("crm")
+def crm_batch(session, requests: List[Tuple[str, str, dict]]) -> List[Optional[dict]]:
+    """Send several (method, query, json) requests in one OData $batch.
+
+    The requests are independent (no changeset), so one failing doesn't roll back
+    the others.  Returns each response body in order; a response without a JSON
+    body is returned as None.
+    """
+    crm_api = get_crm_settings()
+    base_url = "%sapi/data/v9.1/" % crm_api["RESOURCE"]
+    boundary = "batch_%s" % uuid.uuid4()
+
+    parts = []
+    for method, query, data in requests:
+        parts.append(
+            "--%s\r\n"
+            "Content-Type: application/http\r\n"
+            "Content-Transfer-Encoding: binary\r\n"
+            "\r\n"
+            "%s %s%s HTTP/1.1\r\n"
+            "Content-Type: application/json; type=entry\r\n"
+            "Prefer: return=representation\r\n"
+            "\r\n"
+            "%s\r\n" % (boundary, method, base_url, query, json.dumps(data))
+        )
+    parts.append("--%s--\r\n" % boundary)
+
+    response = session.request(
+        "POST",
+        base_url + "$batch",
+        timeout=60,
+        data="".join(parts).encode("utf-8"),
+        headers={
+            "OData-MaxVersion": "4.0",
+            "OData-Version": "4.0",
+            "Content-Type": "multipart/mixed; boundary=%s" % boundary,
+        },
+    )
+    check_throttled(response)
+    check_authorised(response)
+    return parse_batch_response(response)
+
+
+def parse_batch_response(response) -> List[Optional[dict]]:
+    content_type = response.headers.get("Content-Type", "")
+    match = re.search(r"boundary=\"?([^;\"]+)", content_type)
+    if not match:
+        raise ValueError("Not a $batch response: %s" % content_type)
+
+    results = []
+    for part in response.text.split("--%s" % match.group(1))[1:-1]:
+        # MIME headers, then the embedded HTTP response's headers, then its body
+        _, _, http_response = part.partition("\r\n\r\n")
+        _, _, body = http_response.partition("\r\n\r\n")
+        body = body.strip()
+        results.append(json.loads(body) if body else None)
+    return results
 
 
 def get_pcc_fields(client):
@@ -131,6 +245,9 @@ def get_pcc_optionset(client):
     return crm_request(client, query, params=params)
 
 
+# The metadata files are static, and map_crm looks up picklist values ~20 times
+# per record, so parse them once per process.
+@functools.lru_cache(maxsize=None)
 def load_crm_metadata(name):
     path = Path(__file__).parent / name
     with path.open() as f:
@@ -151,6 +268,7 @@ def pcc_picklists():
     return picklists
 
 
+@functools.lru_cache(maxsize=None)
 def pcc_entities():
     entity_definitions = load_crm_metadata("entity_definitions.json")
     picklist_definitions = pcc_picklists()
@@ -668,6 +786,33 @@ def create_pcc_record(client, crm_data: dict) -> Optional[dict]:
     return crm_request(client, query, json=crm_data, request_method="POST")
 
 
+def create_pcc_records(client, records: List[dict]) -> List[Optional[dict]]:
+    """Create several records in one $batch request."""
+    return crm_batch(
+        client, [("POST", "pcc_retrofitintermediates", data) for data in records]
+    )
+
+
+def update_pcc_record(client, pcc_name: str, crm_data: dict) -> Optional[dict]:
+    """Upsert the record with the given ``pcc_name`` (the Answers uuid).
+
+    ``pcc_name`` is an alternate key on pcc_retrofitintermediate, so the record
+    is addressed without knowing its CRM id and only the fields in ``crm_data``
+    are changed.
+    """
+    query = "pcc_retrofitintermediates(pcc_name='%s')" % pcc_name
+    return crm_request(client, query, json=crm_data, request_method="PATCH")
+
+
+def changed_fields(previous: dict, current: dict) -> dict:
+    """The fields of ``current`` that differ from the ``previous`` payload."""
+    return {
+        field: value
+        for field, value in current.items()
+        if field not in previous or previous[field] != value
+    }
+
+
 def answers_to_submit():
     return models.Answers.objects.filter(
         completed_at__isnull=False,  # Completed records only at this time.
@@ -0,0 +1,194 @@
+"""Fake Dynamics Web API, for load testing the CRM submission pipeline.
+
+Serves the token endpoint and the ``pcc_retrofitintermediates`` endpoints used by
+``crm`` (create, upsert by ``pcc_name`` and ``$batch``), with configurable
+latency and injected server errors and 429 throttling.  Run it with the
+``crm_fake_server`` command and point the app at it with::
+
+    CRM_API_RESOURCE=http://127.0.0.1:8765/
+    CRM_API_TOKEN_URL=http://127.0.0.1:8765/token
+    OAUTHLIB_INSECURE_TRANSPORT=1
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+
+API_ROOT = "/api/data/v9.1/"
+ENTITY_PATH = re.compile(
+    r"^/api/data/v9\.1/pcc_retrofitintermediates(?:\(pcc_name='([^']+)'\))?$"
+)
+BATCH_REQUEST = re.compile(
+    r"^(POST|PATCH) (\S+) HTTP/1\.1\r\n.*?\r\n\r\n(.*?)\r\n--",
+    re.DOTALL | re.MULTILINE,
+)
+
+
+@dataclass
+class FakeCrmConfig:
+    latency: float = 0.0  # Mean seconds per request
+    jitter: float = 0.0  # Standard deviation of the latency
+    error_rate: float = 0.0  # Fraction of requests answered 500
+    throttle_rate: float = 0.0  # Fraction of requests answered 429
+    retry_after: int = 1
+    seed: Optional[int] = None
+
+
+class FakeCrm(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), config: FakeCrmConfig = None):
+        super().__init__(address, FakeCrmHandler)
+        self.config = config or FakeCrmConfig()
+        self.records = {}
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.random = random.Random(self.config.seed)
+
+    @property
+    def url(self) -> str:
+        return "http://%s:%d/" % self.server_address[:2]
+
+    def crm_api_settings(self) -> dict:
+        """CRM_API settings pointing at this server."""
+        return {
+            "TENANT": "fake",
+            "RESOURCE": self.url,
+            "CLIENT_ID": "fake",
+            "CLIENT_SECRET": "fake",
+            "TOKEN_URL": self.url + "token",
+        }
+
+    def start(self) -> "FakeCrm":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def wait(self):
+        with self.lock:
+            delay = self.random.gauss(self.config.latency, self.config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def fault(self) -> Optional[int]:
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.config.throttle_rate:
+            return 429
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            return 500
+        return None
+
+    def upsert(self, pcc_name: Optional[str], data: dict) -> dict:
+        with self.lock:
+            pcc_name = pcc_name or data.get("pcc_name") or str(uuid.uuid4())
+            record = self.records.setdefault(
+                pcc_name, {"pcc_retrofitintermediateid": str(uuid.uuid4())}
+            )
+            record.update(data, pcc_name=pcc_name)
+            return dict(record)
+
+
+class FakeCrmHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PATCH(self):
+        self.handle_request("PATCH")
+
+    def handle_request(self, method: str):
+        path = unquote(urlsplit(self.path).path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        server = self.server
+        with server.lock:
+            server.counts[method, path.split("(")[0]] += 1
+
+        if method == "POST" and path == "/token":
+            self.send_json(200, {"access_token": "fake", "token_type": "Bearer"})
+            return
+
+        server.wait()
+        fault = server.fault()
+        if fault == 429:
+            self.send_json(
+                429,
+                {"error": {"code": "0x80072322", "message": "Throttled"}},
+                {"Retry-After": str(server.config.retry_after)},
+            )
+        elif fault:
+            self.send_json(fault, {"error": {"code": "0x0", "message": "Injected"}})
+        elif method == "POST" and path == API_ROOT + "$batch":
+            self.send_batch(body.decode("utf-8"))
+        else:
+            status, data = self.entity(method, path, body)
+            self.send_json(status, data)
+
+    def entity(self, method: str, path: str, body: bytes):
+        match = ENTITY_PATH.match(path)
+        if not match or (method == "PATCH") != bool(match.group(1)):
+            return 404, {"error": {"code": "0x80060888", "message": "Not found"}}
+        data = json.loads(body or b"{}")
+        return (200 if method == "PATCH" else 201), self.server.upsert(
+            match.group(1), data
+        )
+
+    def send_batch(self, body: str):
+        boundary = "batchresponse_%s" % uuid.uuid4()
+        parts = []
+        for method, url, data in BATCH_REQUEST.findall(body):
+            status, result = self.entity(method, urlsplit(url).path, data.encode())
+            parts.append(
+                "--%s\r\n"
+                "Content-Type: application/http\r\n"
+                "Content-Transfer-Encoding: binary\r\n"
+                "\r\n"
+                "HTTP/1.1 %d %s\r\n"
+                "Content-Type: application/json; odata.metadata=minimal\r\n"
+                "\r\n"
+                "%s\r\n"
+                % (boundary, status, self.responses[status][0], json.dumps(result))
+            )
+        parts.append("--%s--\r\n" % boundary)
+        self.send_body(
+            200,
+            "".join(parts).encode("utf-8"),
+            "multipart/mixed; boundary=%s" % boundary,
+        )
+
+    def send_json(self, status: int, data: dict, headers: dict = None):
+        self.send_body(
+            status, json.dumps(data).encode("utf-8"), "application/json", headers
+        )
+
+    def send_body(self, status, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
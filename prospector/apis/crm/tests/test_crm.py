@@ -1,14 +1,20 @@
 import json
 import os
 from datetime import datetime
+from unittest import mock
 
 import pytest
 import requests
+from django.contrib.admin import site
+from django.utils import timezone
 from django.utils.timezone import make_aware
 from factory.django import DjangoModelFactory
 
 from prospector.apis.crm import crm
+from prospector.apps.crm import outbox
 from prospector.apps.crm import tasks
+from prospector.apps.crm.admin import CrmOutboxAdmin
+from prospector.apps.crm.models import CrmOutbox
 from prospector.apps.crm.models import CrmResult
 from prospector.apps.crm.models import CrmState
 from prospector.apps.questionnaire import enums
@@ -268,6 +274,58 @@ def test_crm_create(mock_session_token, mock_crm_request, mock_crm_response, ans
     assert crmresult.state == CrmState.SUCCESS
 
 
+@pytest.mark.django_db
+def test_crm_create_updates_changed_fields(
+    mock_session_token, mock_crm_request, mock_crm_response, answers
+):
+    dummy_answers = answers()
+
+    query = "pcc_retrofitintermediates"
+    create = mock_crm_request(
+        query, mock_request_method="post", mock_response_data=mock_crm_response(query)
+    )
+    update_query = "pcc_retrofitintermediates(pcc_name='%s')" % dummy_answers.uuid
+    update = mock_crm_request(
+        update_query,
+        mock_request_method="patch",
+        mock_response_data=mock_crm_response(update_query),
+    )
+
+    tasks.crm_create(dummy_answers.uuid)
+    dummy_answers.property_address_1 = "Corrected Address Line 1"
+    dummy_answers.save()
+    tasks.crm_create(dummy_answers.uuid)
+
+    assert create.call_count == 1
+    assert update.call_count == 1
+    assert update.last_request.json() == {"pcc_street1": "Corrected Address Line 1"}
+    assert dummy_answers.crmresult_set.filter(state=CrmState.SUCCESS).count() == 2
+
+    # Nothing changed, nothing sent
+    assert tasks.crm_create(dummy_answers.uuid) is None
+    assert update.call_count == 1
+    assert dummy_answers.crmresult_set.count() == 2
+
+
+@pytest.mark.django_db
+def test_crm_create_updates_everything_without_payload(
+    mock_session_token, mock_crm_request, mock_crm_response, answers
+):
+    dummy_answers = answers()
+    # Submitted before payloads were stored
+    dummy_answers.crmresult_set.create(state=CrmState.SUCCESS)
+
+    update_query = "pcc_retrofitintermediates(pcc_name='%s')" % dummy_answers.uuid
+    update = mock_crm_request(
+        update_query,
+        mock_request_method="patch",
+        mock_response_data=mock_crm_response(update_query),
+    )
+
+    tasks.crm_create(dummy_answers.uuid)
+    assert update.last_request.json() == crm.map_crm(dummy_answers)
+
+
 @pytest.mark.django_db
 def test_crm_create_with_timeout(mock_session_token, mock_crm_request_exc, answers):
     dummy_answers = answers()
@@ -456,9 +514,184 @@ def test_answers_to_submit_no_resubmit_with_crmresult(answers, crmresult):
 
 
 @pytest.mark.django_db
-def test_close_questionnaire_calls_async_crm_create(mocker, answers):
+def test_close_questionnaire_adds_answers_to_outbox(answers):
+    dummy_answers = answers()
+
+    services.close_questionnaire(dummy_answers)
+    assert CrmOutbox.objects.filter(answers=dummy_answers).exists()
+
+
+@pytest.mark.django_db
+def test_close_questionnaire_only_adds_answers_to_outbox_once(answers):
     dummy_answers = answers()
 
-    mock_task = mocker.patch("prospector.apps.crm.tasks.crm_create.delay")
+    assert services.close_questionnaire(dummy_answers) is True
+    completed_at = dummy_answers.completed_at
+
+    # A second render holding a stale copy of the same answers
+    stale = type(dummy_answers).objects.get(pk=dummy_answers.pk)
+    stale.completed_at = None
+    assert services.close_questionnaire(stale) is False
+    assert services.close_questionnaire(dummy_answers) is False
+
+    dummy_answers.refresh_from_db()
+    assert dummy_answers.completed_at == completed_at
+    assert CrmOutbox.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_drain_crm_outbox(
+    mock_session_token, mock_crm_request, mock_crm_response, answers
+):
+    dummy_answers_batch = [answers() for _ in range(0, 5)]
+    for dummy_answers in dummy_answers_batch:
+        services.close_questionnaire(dummy_answers)
+
+    query = "pcc_retrofitintermediates"
+    mocker = mock_crm_request(
+        query, mock_request_method="post", mock_response_data=mock_crm_response(query)
+    )
+
+    assert outbox.drain(concurrency=2, batch_size=2) == 5
+    assert mocker.call_count == 5
+    assert CrmOutbox.objects.count() == 0
+    assert CrmResult.objects.filter(state=CrmState.SUCCESS).count() == 5
+
+
+@pytest.mark.django_db
+def test_drain_crm_outbox_backs_off_failures(
+    mock_session_token, mock_crm_request_exc, answers
+):
+    dummy_answers = answers()
     services.close_questionnaire(dummy_answers)
-    assert mock_task.call_count == 1
+
+    query = "pcc_retrofitintermediates"
+    mock_crm_request_exc(
+        query,
+        mock_request_method="post",
+        mock_request_exc=requests.exceptions.ConnectTimeout,
+    )
+
+    (entry,) = outbox.claim(10)
+    assert outbox.deliver(entry, lambda fresh=False: requests.Session(), max_attempts=2) is False
+
+    entry.refresh_from_db()
+    assert entry.attempts == 1
+    assert entry.available_at > timezone.now()
+    assert outbox.claim(10) == []
+    assert dummy_answers.crmresult_set.count() == 0
+
+    # Out of attempts: kept as a dead letter with a FAILURE result
+    assert outbox.deliver(entry, lambda fresh=False: requests.Session(), max_attempts=2) is False
+    entry.refresh_from_db()
+    assert entry.attempts == 2
+    assert dummy_answers.crmresult_set.get().state == CrmState.FAILURE
+
+
+def test_crm_request_raises_when_throttled(
+    mock_session_token, mock_crm_api_settings, requests_mock
+):
+    requests_mock.register_uri(
+        "POST",
+        "https://test.crm4.dynamics.com/api/data/v9.1/pcc_retrofitintermediates",
+        status_code=429,
+        headers={"Retry-After": "12"},
+        json={"error": {"code": "0x80072322"}},
+    )
+
+    with pytest.raises(crm.CrmThrottled) as exc_info:
+        crm.create_pcc_record(requests.Session(), {})
+    assert exc_info.value.retry_after == 12
+
+
+def test_parse_retry_after():
+    assert crm.parse_retry_after("7") == 7
+    assert crm.parse_retry_after(None, default=3) == 3
+    assert crm.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+@pytest.mark.django_db
+def test_drain_crm_outbox_throttled_keeps_attempts(
+    mock_session_token, mock_crm_api_settings, requests_mock, answers
+):
+    dummy_answers = answers()
+    services.close_questionnaire(dummy_answers)
+    requests_mock.register_uri(
+        "POST",
+        "https://test.crm4.dynamics.com/api/data/v9.1/pcc_retrofitintermediates",
+        status_code=429,
+        headers={"Retry-After": "60"},
+    )
+
+    (entry,) = outbox.claim(10)
+    with pytest.raises(crm.CrmThrottled):
+        outbox.deliver(entry, lambda fresh=False: requests.Session(), max_attempts=2)
+
+    entry.refresh_from_db()
+    assert entry.attempts == 0
+    assert entry.available_at > timezone.now()
+    assert dummy_answers.crmresult_set.count() == 0
+
+
+@pytest.mark.django_db
+def test_drain_crm_outbox_retries_on_fresh_session(
+    mock_session_token, mock_crm_request, mock_crm_response, answers
+):
+    dummy_answers = answers()
+    services.close_questionnaire(dummy_answers)
+
+    query = "pcc_retrofitintermediates"
+    mock_crm_request(
+        query, mock_request_method="post", mock_response_data=mock_crm_response(query)
+    )
+    expired = mock.Mock(request=mock.Mock(return_value=mock.Mock(status_code=401)))
+    sessions = []
+
+    def get_session(fresh=False):
+        sessions.append(fresh)
+        return requests.Session() if fresh else expired
+
+    (entry,) = outbox.claim(10)
+    assert outbox.deliver(entry, get_session, max_attempts=2) is True
+    assert sessions == [False, True]
+    assert dummy_answers.crmresult_set.get().state == CrmState.SUCCESS
+
+
+@pytest.mark.django_db
+def test_drain_crm_outbox_does_not_repeat_timed_out_create(
+    mock_session_token, mock_crm_request_exc, answers
+):
+    dummy_answers = answers()
+    services.close_questionnaire(dummy_answers)
+    mock_crm_request_exc(
+        "pcc_retrofitintermediates",
+        mock_request_method="post",
+        mock_request_exc=requests.exceptions.ReadTimeout,
+    )
+    sessions = []
+
+    def get_session(fresh=False):
+        sessions.append(fresh)
+        return requests.Session()
+
+    (entry,) = outbox.claim(10)
+    assert outbox.deliver(entry, get_session, max_attempts=2) is False
+    assert sessions == [False]
+    entry.refresh_from_db()
+    assert entry.attempts == 1
+
+
+@pytest.mark.django_db
+def test_crm_outbox_admin_retry_supersedes_failure(answers):
+    dummy_answers = answers()
+    services.close_questionnaire(dummy_answers)
+    entry = CrmOutbox.objects.get(answers=dummy_answers)
+    outbox.record_failure(entry, ValueError("CRM down"), max_attempts=1)
+    assert dummy_answers.crmresult_set.get().state == CrmState.FAILURE
+
+    CrmOutboxAdmin(CrmOutbox, site).retry(None, CrmOutbox.objects.all())
+
+    entry.refresh_from_db()
+    assert entry.attempts == 0
+    assert dummy_answers.crmresult_set.count() == 0
+    assert outbox.claim(10) == [entry]
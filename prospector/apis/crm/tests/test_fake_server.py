@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+
+from prospector.apis.crm import crm
+from prospector.apis.crm.fake_server import FakeCrm
+from prospector.apis.crm.fake_server import FakeCrmConfig
+from prospector.apps.crm.management.commands import crm_benchmark
+
+
+@pytest.fixture()
+def fake_crm(settings, monkeypatch):
+    monkeypatch.setenv("OAUTHLIB_INSECURE_TRANSPORT", "1")
+
+    def start(**config):
+        server = FakeCrm(config=FakeCrmConfig(**config)).start()
+        settings.CRM_API = server.crm_api_settings()
+        servers.append(server)
+        return server, crm.get_authorised_session(crm.get_client())
+
+    servers = []
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_fake_crm_create_and_update(fake_crm):
+    server, session = fake_crm()
+
+    created = crm.create_pcc_record(session, {"pcc_name": "abc", "pcc_street1": "1"})
+    updated = crm.update_pcc_record(session, "abc", {"pcc_street1": "2"})
+
+    assert updated["pcc_retrofitintermediateid"] == (
+        created["pcc_retrofitintermediateid"]
+    )
+    assert server.records["abc"]["pcc_street1"] == "2"
+
+
+def test_fake_crm_batch(fake_crm):
+    server, session = fake_crm()
+
+    results = crm.create_pcc_records(
+        session, [{"pcc_name": "record-%d" % i} for i in range(0, 3)]
+    )
+
+    assert [r["pcc_name"] for r in results] == ["record-0", "record-1", "record-2"]
+    assert server.counts["POST", "/api/data/v9.1/$batch"] == 1
+    assert len(server.records) == 3
+
+
+def test_fake_crm_throttling(fake_crm):
+    server, session = fake_crm(throttle_rate=1, retry_after=7)
+
+    with pytest.raises(crm.CrmThrottled) as exc_info:
+        crm.create_pcc_record(session, {"pcc_name": "abc"})
+    assert exc_info.value.retry_after == 7
+    assert server.records == {}
+
+
+def test_crm_benchmark(capsys):
+    call_command(crm_benchmark.Command(), "--fake", "--count=10", "--batch-size=3")
+
+    out = capsys.readouterr().out
+    assert "transport: 10 ok, 0 failed" in out
+    assert "records/s" in out
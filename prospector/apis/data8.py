@@ -8,6 +8,7 @@ import requests
 from django.conf import settings
 from requests.adapters import HTTPAdapter
 
+from . import recorder
 from prospector.dataformats import postcodes
 
 
@@ -66,6 +67,12 @@ def _process_results(results: list) -> List[AddressData]:
     return out
 
 
+def _load_addresses(rows: list) -> List[AddressData]:
+    return [AddressData(**row) for row in rows]
+
+
+# The addresses in a postcode are public, so responses are kept whole
+@recorder.recorded("data8", load=_load_addresses, redact_response=False)
 def get_for_postcode(raw_postcode: str) -> Optional[List[AddressData]]:
     """Return addresses for the given postcode (UPRN only).
 
@@ -77,8 +84,8 @@ def get_for_postcode(raw_postcode: str) -> Optional[List[AddressData]]:
         []: if the API can’t be reached or another non-fatal error occurred,
         None: if the postcode is validly-formed but not a real/serviced postcode.
     """
-    postcode = postcodes.normalise(raw_postcode)
-    if not postcodes.validate_household_postcode(postcode):
+    postcode = postcodes.parse(raw_postcode)
+    if postcode is None:
         raise ValueError("This is not a UK household postcode")
 
     if not getattr(settings, "DATA8_API_KEY", None):
@@ -6,15 +6,18 @@ from dataclasses import dataclass
 from os import path
 from typing import List, Optional
 
+import httpx
 import requests
 from django.conf import settings
 from requests.adapters import HTTPAdapter
 
+from . import recorder
 from prospector.dataformats import postcodes
 
 
 logger = logging.getLogger(__name__)
 BASE_URL = "https://ws.postcoder.com/pcw/"
+TIMEOUT = 15  # Seconds
 
 
 @dataclass
@@ -49,6 +52,12 @@ def _process_results(results: list) -> List[AddressData]:
     return out
 
 
+def _load_addresses(rows: list) -> List[AddressData]:
+    return [AddressData(**row) for row in rows]
+
+
+# The addresses in a postcode are public, so responses are kept whole
+@recorder.recorded("postcoder", load=_load_addresses, redact_response=False)
 def get_for_postcode(raw_postcode: str) -> Optional[List[AddressData]]:
     """Return addresses for the given postcode (UPRN only).
 
@@ -60,8 +69,8 @@ def get_for_postcode(raw_postcode: str) -> Optional[List[AddressData]]:
         []: if the API can’t be reached or another non-fatal error occurred,
         None: if the postcode is validly-formed but not a real/serviced postcode.
     """
-    postcode = postcodes.normalise(raw_postcode)
-    if not postcodes.validate_household_postcode(postcode):
+    postcode = postcodes.parse(raw_postcode)
+    if postcode is None:
         raise ValueError("This is not a UK household postcode")
 
     if not getattr(settings, "POSTCODER_API_KEY", None):
@@ -70,19 +79,14 @@ def get_for_postcode(raw_postcode: str) -> Optional[List[AddressData]]:
         return []
 
     if settings.POSTCODER_API_KEY == 'DUMMY':
-        # Read in an example response file (for PL2 1BX) to allow local testing without using API credits.
-        with open(path.join(settings.SRC_DIR, 'testutils', 'example_postcoder_response.json')) as f:
-            dummy_response = f.read()
-        data = json.loads(dummy_response)
+        data = _dummy_response()
 
     else:
-        url = f"{BASE_URL}{settings.POSTCODER_API_KEY}/addressbase/{urllib.parse.quote_plus(postcode)}?lines=3&addtags=uprn&postcodeonly=true"
-
         try:
             with requests.Session() as s:
                 # Mount retries for the scheme/host, not the full URL
                 s.mount("https://", HTTPAdapter(max_retries=3))
-                resp = s.get(url, timeout=15)
+                resp = s.get(_url(postcode), timeout=TIMEOUT)
                 resp.raise_for_status()
                 data = resp.json()
         except requests.exceptions.RequestException as e:
@@ -92,11 +96,56 @@ def get_for_postcode(raw_postcode: str) -> Optional[List[AddressData]]:
             logger.error(f"Postcoder response was not valid JSON for {postcode}: {e}")
             return []
 
+    return _addresses(postcode, data)
+
+
+@recorder.recorded("postcoder", load=_load_addresses, redact_response=False)
+async def aget_for_postcode(raw_postcode: str) -> Optional[List[AddressData]]:
+    """``get_for_postcode``, awaiting Postcoder's answer rather than blocking on it."""
+    postcode = postcodes.parse(raw_postcode)
+    if postcode is None:
+        raise ValueError("This is not a UK household postcode")
+
+    if not getattr(settings, "POSTCODER_API_KEY", None):
+        logger.error("POSTCODER_API_KEY not set.")
+        return []
+
+    if settings.POSTCODER_API_KEY == 'DUMMY':
+        data = _dummy_response()
+
+    else:
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(retries=3), timeout=TIMEOUT
+            ) as client:
+                resp = await client.get(_url(postcode))
+                resp.raise_for_status()
+                data = resp.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Could not reach Postcoder server: {e}")
+            return []
+        except json.JSONDecodeError as e:
+            logger.error(f"Postcoder response was not valid JSON for {postcode}: {e}")
+            return []
+
+    return _addresses(postcode, data)
+
+
+def _url(postcode: str) -> str:
+    return f"{BASE_URL}{settings.POSTCODER_API_KEY}/addressbase/{urllib.parse.quote_plus(postcode)}?lines=3&addtags=uprn&postcodeonly=true"
+
+
+def _dummy_response():
+    # Read in an example response file (for PL2 1BX) to allow local testing without using API credits.
+    with open(path.join(settings.SRC_DIR, 'testutils', 'example_postcoder_response.json')) as f:
+        dummy_response = f.read()
+    return json.loads(dummy_response)
+
+
+def _addresses(postcode: str, data) -> List[AddressData]:
     try:
-        addresses = _process_results(data)
+        return _process_results(data)
     except Exception as e:
         # Guard against unexpected shape changes
         logger.error(f"Postcoder response parse error for {postcode}: {e}")
         return []
-
-    return addresses
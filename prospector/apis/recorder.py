@@ -0,0 +1,299 @@
+"""Record calls to the external APIs, and replay them offline.
+
+The functions that call Postcoder, Data8 and the CRM are wrapped with
+``recorded``.  With the API_RECORDER setting off (the default) the wrapper only
+calls through.  In "record" mode each call is appended to
+``<API_RECORDER_DIR>/<service>.jsonl`` with its duration, the size of its
+response and the request and response, with personal data redacted; the files
+rotate at API_RECORDER_MAX_BYTES.  In "replay" mode calls are answered from
+those files instead of the network, so integration-heavy flows can be
+benchmarked and tested offline; a call that was never recorded raises
+``NotRecorded``.
+
+Recordings are looked up by a hash of the unredacted arguments, so a replayed
+call must have exactly the arguments of the recorded one.  ``api_calls``
+summarises the recordings.
+
+Coroutine functions, such as the async Postcoder lookup, are recorded in the same
+way; as their key doesn't depend on the function, a call recorded from the sync
+function of a service replays for its async one with the same arguments.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+OFF = ""
+RECORD = "record"
+REPLAY = "replay"
+
+REDACTED = "[redacted]"
+# Keys whose values are personal data, wherever they appear in a request or
+# response, e.g. the CRM's pcc_firstname or cr51a_householdincome
+REDACTED_KEYS = re.compile(
+    r"name|email|phone|mobile|salutation|comments|income|savings|housingcosts"
+    r"|benefit|vulnerab|street|uprn",
+    re.IGNORECASE,
+)
+# Keys that are not personal even though they match REDACTED_KEYS
+KEPT_KEYS = {"pcc_name", "logicalname", "schemaname", "displayname"}
+POSTCODE = re.compile(r"\b([A-Z]{1,2}\d[A-Z\d]?) ?\d[A-Z]{2}\b", re.IGNORECASE)
+
+
+class NotRecorded(APIError):
+    """A call was made in replay mode that has no recording."""
+
+
+class ReplayedError(APIError):
+    """A recorded call that raised; replayed with the original message."""
+
+
+def mode() -> str:
+    return getattr(settings, "API_RECORDER", OFF)
+
+
+def _json(value):
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def redact(value, key: str = ""):
+    """A copy of ``value`` with personal data replaced by REDACTED.
+
+    Values under a REDACTED_KEYS key are replaced whole, and the inward part of
+    postcodes in any string is dropped, e.g. "PL2 1BX" becomes "PL2 ***".
+    """
+    if key and key.lower() not in KEPT_KEYS and REDACTED_KEYS.search(key):
+        return REDACTED if value not in (None, "") else value
+    if isinstance(value, dict):
+        return {k: redact(v, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, str):
+        return POSTCODE.sub(r"\1 ***", value)
+    return value
+
+
+def call_key(service: str, arguments: dict) -> str:
+    data = json.dumps([service, arguments], sort_keys=True, default=_json)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class Store:
+    """The recordings of one service, as rotating JSON lines files."""
+
+    def __init__(self, service: str, directory=None):
+        self.service = service
+        self.directory = Path(directory or settings.API_RECORDER_DIR)
+        self.path = self.directory / ("%s.jsonl" % service)
+        self._handler = None
+        self._lock = threading.Lock()
+        self._replays = None
+        self._replays_mtime = None
+
+    def append(self, record: dict):
+        with self._lock:
+            if self._handler is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._handler = RotatingFileHandler(
+                    self.path,
+                    maxBytes=settings.API_RECORDER_MAX_BYTES,
+                    backupCount=settings.API_RECORDER_BACKUPS,
+                    encoding="utf-8",
+                )
+                self._handler.setFormatter(logging.Formatter("%(message)s"))
+            self._handler.emit(
+                logging.makeLogRecord(
+                    {"msg": json.dumps(record, default=_json), "args": None}
+                )
+            )
+
+    def files(self) -> Iterable[Path]:
+        """Oldest first, so later recordings of a call win."""
+        backups = sorted(
+            self.directory.glob("%s.jsonl.*" % self.service),
+            key=lambda path: -int(path.suffix[1:]),
+        )
+        return [*backups, *([self.path] if self.path.exists() else [])]
+
+    def records(self) -> Iterable[dict]:
+        for path in self.files():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def find(self, key: str) -> Optional[dict]:
+        with self._lock:
+            mtime = self.path.stat().st_mtime if self.path.exists() else None
+            if self._replays is None or mtime != self._replays_mtime:
+                self._replays = {record["key"]: record for record in self.records()}
+                self._replays_mtime = mtime
+            return self._replays.get(key)
+
+    def close(self):
+        with self._lock:
+            if self._handler is not None:
+                self._handler.close()
+                self._handler = None
+
+
+_stores: Dict[Tuple[str, str], Store] = {}
+
+
+def store(service: str) -> Store:
+    directory = str(settings.API_RECORDER_DIR)
+    if (service, directory) not in _stores:
+        _stores[service, directory] = Store(service, directory)
+    return _stores[service, directory]
+
+
+def reset():
+    """Close and forget the stores, e.g. after changing API_RECORDER_DIR."""
+    for s in _stores.values():
+        s.close()
+    _stores.clear()
+
+
+def recorded(
+    service: str,
+    ignore: Iterable[str] = ("session",),
+    load: Callable = None,
+    redact_response: bool = True,
+):
+    """Record or replay calls to the decorated function, as API_RECORDER says.
+
+    Arguments named in ``ignore`` (such as an authorised session) aren't part of
+    the recording.  The return value is stored as JSON; ``load`` rebuilds it
+    from that JSON when replaying, e.g. turning dicts back into dataclasses.
+    Responses that hold no personal data, such as the addresses in a postcode,
+    can be stored whole with ``redact_response=False``.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def recording(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {
+                name: value
+                for name, value in bound.arguments.items()
+                if name not in ignore
+            }
+            return call_key(service, arguments), arguments
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                current = mode()
+                if current == OFF:
+                    return await func(*args, **kwargs)
+                key, arguments = recording(args, kwargs)
+                if current == REPLAY:
+                    return replay(service, key, load)
+                entry, started = begin(service, key, arguments, func)
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    failed(service, entry, started, e)
+                    raise
+                return returned(service, entry, started, redact_response, result)
+
+        else:
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                current = mode()
+                if current == OFF:
+                    return func(*args, **kwargs)
+                key, arguments = recording(args, kwargs)
+                if current == REPLAY:
+                    return replay(service, key, load)
+                return record(
+                    service, key, arguments, redact_response, func, args, kwargs
+                )
+
+        wrapper.recorded = service
+        return wrapper
+
+    return decorator
+
+
+def replay(service: str, key: str, load: Optional[Callable]):
+    found = store(service).find(key)
+    if found is None:
+        raise NotRecorded("No recording of this %s call" % service)
+    if "error" in found:
+        raise ReplayedError("%(type)s: %(message)s" % found["error"])
+    response = found["response"]
+    return load(response) if load and response is not None else response
+
+
+def record(service, key, arguments, redact_response, func, args, kwargs):
+    entry, started = begin(service, key, arguments, func)
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        failed(service, entry, started, e)
+        raise
+    return returned(service, entry, started, redact_response, result)
+
+
+def begin(service, key, arguments, func) -> Tuple[dict, float]:
+    """The start of the recording of a call, and when the call started."""
+    entry = {
+        "key": key,
+        "service": service,
+        "function": func.__qualname__,
+        "at": timezone.now().isoformat(),
+        "request": redact(json.loads(json.dumps(arguments, default=_json))),
+    }
+    return entry, time.perf_counter()
+
+
+def failed(service: str, entry: dict, started: float, error: Exception):
+    entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    entry["error"] = {"type": type(error).__name__, "message": str(error)}
+    _append(service, entry)
+
+
+def returned(service: str, entry: dict, started: float, redact_response, result):
+    entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    response = json.loads(json.dumps(result, default=_json))
+    entry["size"] = len(json.dumps(response))
+    entry["response"] = redact(response) if redact_response else response
+    _append(service, entry)
+    return result
+
+
+def _append(service: str, entry: dict):
+    # Recording must never break the call it records
+    try:
+        store(service).append(entry)
+    except Exception:
+        logger.warning("Could not record a %s call", service, exc_info=True)
@@ -0,0 +1,164 @@
+import json
+
+import httpx
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import override_settings
+
+from prospector.apis import data8
+from prospector.apis import postcoder
+from prospector.apis import recorder
+from prospector.apis.crm import crm
+from prospector.management.commands import api_calls
+
+DATA8_URL = "https://webservices.data-8.co.uk/AddressCapture/GetFullAddress.json"
+DATA8_RESPONSE = {
+    "Status": {"Success": True},
+    "Results": [
+        {
+            "Address": {
+                "Lines": ["1 Benbow Street", "", "", "", "Plymouth", "", "PL2 1BX"]
+            },
+            "RawAddress": {"AdditionalData": [{"Name": "UPRN", "Value": "100"}]},
+        }
+    ],
+}
+CRM_SETTINGS = {
+    "TENANT": "tenant",
+    "RESOURCE": "https://crm.example.com/",
+    "CLIENT_ID": "id",
+    "CLIENT_SECRET": "secret",
+}
+
+
+@pytest.fixture
+def recordings(tmp_path, settings):
+    settings.API_RECORDER_DIR = str(tmp_path)
+    settings.DATA8_API_KEY = "KEY"
+    settings.CRM_API = CRM_SETTINGS
+    yield tmp_path
+    recorder.reset()
+
+
+def test_redact():
+    assert recorder.redact(
+        {
+            "pcc_name": "uuid",
+            "pcc_firstname": "Ada",
+            "cr51a_householdincome": 20000,
+            "cr51a_respondentmobile": "",
+            "pcc_postcode": "PL2 1BX",
+            "notes": ["Lives at pl21bx"],
+        }
+    ) == {
+        "pcc_name": "uuid",
+        "pcc_firstname": recorder.REDACTED,
+        "cr51a_householdincome": recorder.REDACTED,
+        "cr51a_respondentmobile": "",
+        "pcc_postcode": "PL2 ***",
+        "notes": ["Lives at pl2 ***"],
+    }
+
+
+def test_off_by_default(requests_mock, recordings):
+    requests_mock.post(DATA8_URL, json=DATA8_RESPONSE)
+    data8.get_for_postcode("PL2 1BX")
+    assert list(recordings.iterdir()) == []
+
+
+def test_record_then_replay(requests_mock, recordings, settings):
+    requests_mock.post(DATA8_URL, json=DATA8_RESPONSE)
+    settings.API_RECORDER = recorder.RECORD
+    addresses = data8.get_for_postcode("PL2 1BX")
+
+    [record] = recorder.Store("data8", recordings).records()
+    assert record["request"] == {"raw_postcode": "PL2 ***"}
+    assert record["size"] > 0 and record["duration_ms"] >= 0
+
+    settings.API_RECORDER = recorder.REPLAY
+    requests_mock.reset()
+    assert data8.get_for_postcode("PL2 1BX") == addresses
+    assert not requests_mock.called
+    with pytest.raises(recorder.NotRecorded):
+        data8.get_for_postcode("PL1 1AA")
+
+
+def test_async_calls_share_recordings(requests_mock, recordings, settings):
+    settings.POSTCODER_API_KEY = "KEY"
+    requests_mock.get(
+        postcoder._url("PL2 1BX"), json=[{"addressline1": "1 Benbow Street"}]
+    )
+    settings.API_RECORDER = recorder.RECORD
+    addresses = postcoder.get_for_postcode("PL2 1BX")
+
+    settings.API_RECORDER = recorder.REPLAY
+    assert async_to_sync(postcoder.aget_for_postcode)("PL2 1BX") == addresses
+    with pytest.raises(recorder.NotRecorded):
+        async_to_sync(postcoder.aget_for_postcode)("PL1 1AA")
+
+
+def test_async_calls_are_recorded(recordings, settings, monkeypatch):
+    settings.POSTCODER_API_KEY = "KEY"
+    response = httpx.Response(200, json=[{"addressline1": "1 Benbow Street"}])
+    monkeypatch.setattr(
+        httpx,
+        "AsyncHTTPTransport",
+        lambda retries: httpx.MockTransport(lambda request: response),
+    )
+    settings.API_RECORDER = recorder.RECORD
+    [address] = async_to_sync(postcoder.aget_for_postcode)("PL2 1BX")
+
+    [record] = recorder.Store("postcoder", recordings).records()
+    assert record["function"] == "aget_for_postcode"
+    assert record["response"][0]["line_1"] == address.line_1 == "1 Benbow Street"
+
+
+def test_crm_requests_are_redacted_and_errors_replayed(requests_mock, recordings):
+    url = "https://crm.example.com/api/data/v9.1/pcc_retrofitintermediates"
+    requests_mock.post(url, json={"pcc_name": "uuid", "pcc_email": "a@example.com"})
+    requests_mock.get(url, status_code=429, headers={"Retry-After": "5"})
+
+    with override_settings(API_RECORDER=recorder.RECORD):
+        crm.crm_request(
+            requests.Session(),
+            "pcc_retrofitintermediates",
+            json={"pcc_email": "a@example.com"},
+            request_method="POST",
+        )
+        with pytest.raises(crm.CrmThrottled):
+            crm.crm_request(requests.Session(), "pcc_retrofitintermediates")
+
+    text = (recordings / "crm.jsonl").read_text()
+    assert "a@example.com" not in text
+    assert json.loads(text.splitlines()[0])["response"]["pcc_name"] == "uuid"
+
+    with override_settings(API_RECORDER=recorder.REPLAY):
+        with pytest.raises(recorder.ReplayedError, match="CrmThrottled"):
+            crm.crm_request(None, "pcc_retrofitintermediates")
+
+
+def test_files_rotate(requests_mock, recordings, settings):
+    requests_mock.post(DATA8_URL, json=DATA8_RESPONSE)
+    settings.API_RECORDER = recorder.RECORD
+    settings.API_RECORDER_MAX_BYTES = 1000
+    settings.API_RECORDER_BACKUPS = 2
+    for postcode in ["PL1 1AA", "PL1 1AB", "PL1 1AD", "PL1 1AE", "PL1 1AF"]:
+        data8.get_for_postcode(postcode)
+
+    assert sorted(path.name for path in recordings.iterdir()) == [
+        "data8.jsonl",
+        "data8.jsonl.1",
+        "data8.jsonl.2",
+    ]
+
+
+def test_api_calls_summary(requests_mock, recordings, settings, capsys):
+    requests_mock.post(DATA8_URL, json=DATA8_RESPONSE)
+    settings.API_RECORDER = recorder.RECORD
+    data8.get_for_postcode("PL2 1BX")
+    data8.get_for_postcode("PL2 1BX")
+
+    call_command(api_calls.Command(), dir=str(recordings))
+    assert "data8 get_for_postcode" in capsys.readouterr().out
@@ -1,11 +1,14 @@
 from django.contrib import admin
-from import_export.admin import ExportMixin
+from django.db import transaction
+from django.utils import timezone
 
 from . import models
+from prospector.apps.exports.admin import BackgroundExportMixin
 
 
 @admin.register(models.CrmResult)
-class QuestionnaireAdmin(ExportMixin, admin.ModelAdmin):
+class QuestionnaireAdmin(BackgroundExportMixin, admin.ModelAdmin):
+    actions = ("export_in_background",)
     list_display = (
         "answers",
         "created_at",
@@ -14,3 +17,28 @@ class QuestionnaireAdmin(ExportMixin, admin.ModelAdmin):
     )
     list_select_related = ("answers",)
     raw_id_admin = ("answers",)
+
+
+@admin.register(models.CrmOutbox)
+class CrmOutboxAdmin(admin.ModelAdmin):
+    list_display = (
+        "answers",
+        "created_at",
+        "available_at",
+        "attempts",
+        "last_error",
+    )
+    list_select_related = ("answers",)
+    raw_id_fields = ("answers",)
+    actions = ("retry",)
+
+    def retry(self, request, queryset):
+        # The dead letter's FAILURE result is superseded by the retry
+        with transaction.atomic():
+            models.CrmResult.objects.filter(
+                answers__crmoutbox__in=queryset, state=models.CrmState.FAILURE
+            ).delete()
+            models.refresh_crm_status(queryset.values_list("answers_id", flat=True))
+            queryset.update(attempts=0, last_error="", available_at=timezone.now())
+
+    retry.short_description = "Retry submission to CRM"
@@ -7,6 +7,7 @@ from uuid import UUID
 from django.core.management.base import BaseCommand
 
 from prospector.apis.crm import crm
+from prospector.apps.crm import outbox
 from prospector.apps.crm.tasks import crm_create
 from prospector.apps.questionnaire.models import Answers
 
@@ -61,6 +62,12 @@ class Command(BaseCommand):
             action="store_true",
             help="CRM create for all pending completed Answers records",
         )
+        create_parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of CRM requests in flight at once (with --all)",
+        )
 
         def uuid4(arg_value):
             try:
@@ -111,10 +118,17 @@ class Command(BaseCommand):
                 result = crm_create.delay(answers_uuid)
                 for value in result.collect():
                     print(value)
-            elif "all" in options:
+            elif options["all"]:
                 # CRM create for all pending completed Answers records
-                __import__("pdb").set_trace()
-                pass
+                # through the outbox, as fast as the CRM will let us
+                enqueued = outbox.enqueue_pending()
+                drainer = outbox.Drainer(concurrency=options["concurrency"])
+                delivered = drainer.run(once=True)
+                self.stdout.write(
+                    "%d enqueued, %d delivered, %.1f req/s"
+                    % (enqueued, delivered, drainer.requests_per_second)
+                )
+                return
             sys.exit(1)
 
         if options["token"]:
@@ -0,0 +1,141 @@
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from .crm_fake_server import add_fake_crm_arguments
+from .crm_fake_server import fake_crm_config
+from prospector.apis.crm import crm
+from prospector.apis.crm.fake_server import FakeCrm
+from prospector.apps.crm import services
+from prospector.apps.crm.ratelimit import TokenBucket
+from prospector.testutils.synthetic import synthetic_answers
+
+MAX_THROTTLED_RETRIES = 5
+
+
+def percentile(values, percent):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+class Command(BaseCommand):
+    help = "Measure CRM submission throughput with synthetic Answers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1,
+            help="Records per $batch request (1 sends individual POSTs)",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="Pace requests with an adaptive limiter starting at this rate",
+        )
+        parser.add_argument(
+            "--fake",
+            action="store_true",
+            default=False,
+            help="Benchmark against an in-process fake CRM, not CRM_API",
+        )
+        add_fake_crm_arguments(parser)
+
+    def handle(self, *args, **options):
+        answers = list(synthetic_answers(options["count"], options["seed"] or 0))
+
+        started = time.perf_counter()
+        payloads = [services.snapshot(crm.map_crm(a)) for a in answers]
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            "map_crm: %d records in %.2fs (%.0f records/s)"
+            % (len(payloads), elapsed, len(payloads) / elapsed)
+        )
+
+        server = None
+        settings_context = nullcontext()
+        if options["fake"]:
+            os.environ.setdefault("OAUTHLIB_INSECURE_TRANSPORT", "1")
+            server = FakeCrm(config=fake_crm_config(options)).start()
+            settings_context = override_settings(CRM_API=server.crm_api_settings())
+
+        try:
+            with settings_context:
+                self.benchmark(payloads, options)
+        finally:
+            if server:
+                server.stop()
+
+    def benchmark(self, payloads, options):
+        batch_size = max(1, options["batch_size"])
+        chunks = [
+            payloads[i : i + batch_size] for i in range(0, len(payloads), batch_size)
+        ]
+        limiter = TokenBucket(options["rate"]) if options["rate"] else None
+        local = threading.local()
+        latencies = []
+        totals = {"ok": 0, "failed": 0, "throttled": 0}
+        lock = threading.Lock()
+
+        def send(chunk):
+            if not hasattr(local, "session"):
+                local.session = crm.get_authorised_session(crm.get_client())
+            for _ in range(MAX_THROTTLED_RETRIES):
+                if limiter:
+                    limiter.acquire()
+                request_started = time.perf_counter()
+                try:
+                    if batch_size == 1:
+                        results = [crm.create_pcc_record(local.session, chunk[0])]
+                    else:
+                        results = crm.create_pcc_records(local.session, chunk)
+                except crm.CrmThrottled as e:
+                    with lock:
+                        totals["throttled"] += 1
+                    if limiter:
+                        limiter.throttled(e.retry_after)
+                    else:
+                        time.sleep(e.retry_after)
+                    continue
+                except Exception:
+                    results = [None] * len(chunk)
+                ok = sum(1 for r in results if r and "error" not in r)
+                with lock:
+                    latencies.append(time.perf_counter() - request_started)
+                    totals["ok"] += ok
+                    totals["failed"] += len(chunk) - ok
+                if limiter and ok:
+                    limiter.succeeded()
+                return
+            with lock:
+                totals["failed"] += len(chunk)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            list(executor.map(send, chunks))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            "transport: %(ok)d ok, %(failed)d failed, %(throttled)d throttled "
+            "responses" % totals
+        )
+        self.stdout.write(
+            "%.2fs, %.1f records/s, %d requests, p50 %.0fms, p99 %.0fms"
+            % (
+                elapsed,
+                totals["ok"] / elapsed,
+                len(latencies),
+                percentile(latencies, 50) * 1000,
+                percentile(latencies, 99) * 1000,
+            )
+        )
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from prospector.apis.crm.fake_server import FakeCrm
+from prospector.apis.crm.fake_server import FakeCrmConfig
+
+
+def add_fake_crm_arguments(parser):
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Mean seconds per CRM request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Standard deviation of latency"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of CRM requests answered 500",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of CRM requests answered 429",
+    )
+    parser.add_argument(
+        "--retry-after", type=int, default=1, help="Retry-After seconds on 429"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def fake_crm_config(options) -> FakeCrmConfig:
+    return FakeCrmConfig(
+        latency=options["latency"],
+        jitter=options["jitter"],
+        error_rate=options["error_rate"],
+        throttle_rate=options["throttle_rate"],
+        retry_after=options["retry_after"],
+        seed=options["seed"],
+    )
+
+
+class Command(BaseCommand):
+    help = "Run a fake Dynamics Web API for load testing CRM submissions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        add_fake_crm_arguments(parser)
+
+    def handle(self, *args, **options):
+        server = FakeCrm((options["host"], options["port"]), fake_crm_config(options))
+        self.stdout.write("Fake CRM listening on %s" % server.url)
+        self.stdout.write(
+            "Use CRM_API_RESOURCE=%s CRM_API_TOKEN_URL=%stoken "
+            "OAUTHLIB_INSECURE_TRANSPORT=1" % (server.url, server.url)
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
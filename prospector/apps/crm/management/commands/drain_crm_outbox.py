@@ -0,0 +1,76 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from prospector.apps.crm import outbox
+
+
+class Command(BaseCommand):
+    help = "Submit completed Answers waiting in the CRM outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="Number of submissions in flight at once",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Number of outbox rows claimed at a time",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=outbox.MAX_ATTEMPTS,
+            help="Attempts before a submission is recorded as failed",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when the outbox is empty",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=10,
+            help="Initial CRM requests per second",
+        )
+        parser.add_argument(
+            "--max-rate",
+            type=float,
+            default=20,
+            help="CRM requests per second never to exceed",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            default=False,
+            help="Exit once nothing is due instead of polling",
+        )
+        parser.add_argument(
+            "--enqueue-pending",
+            action="store_true",
+            default=False,
+            help="First add completed Answers never submitted to the CRM",
+        )
+
+    def handle(self, *args, **options):
+        if options["enqueue_pending"]:
+            outbox.enqueue_pending()
+
+        drainer = outbox.Drainer(
+            concurrency=options["concurrency"],
+            batch_size=options["batch_size"],
+            max_attempts=options["max_attempts"],
+            poll_interval=options["poll_interval"],
+            rate=options["rate"],
+            max_rate=options["max_rate"],
+        )
+        signal.signal(signal.SIGTERM, drainer.stop)
+        signal.signal(signal.SIGINT, drainer.stop)
+
+        drainer.run(once=options["once"])
@@ -1,33 +1,85 @@
 import csv
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
 
 from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.management.color import no_style
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
 
 from ...models import CrmResult
+from ...models import refresh_crm_status
+from prospector import metrics
 from prospector.apps.questionnaire.models import Answers
 
 
+@contextmanager
+def keep_created_at():
+    """Let bulk_create save the CSV's created_at, which auto_now_add would replace."""
+    field = CrmResult._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def parse_row(row: list) -> CrmResult:
+    created_at = datetime.strptime(row[2], "%Y-%m-%d %H:%M:%S")
+    return CrmResult(
+        id=int(row[0]),
+        answers_id=int(row[1]),
+        created_at=timezone.make_aware(created_at),
+        state=row[3],
+        result=row[4],
+    )
+
+
 class Command(BaseCommand):
     help = "Upload CrmResult data from CSV"
 
     def add_arguments(self, parser):
         parser.add_argument("--file", type=str)
+        parser.add_argument("--batch-size", type=int, default=5000)
 
+    @metrics.IMPORT_DURATION.time(command="upload_crm_data")
     def handle(self, *args, **options):
-        temp_data = []
-        with open(f"{options['file']}") as file:
+        imported = 0
+        with open(f"{options['file']}") as file, transaction.atomic():
             reader = csv.reader(file)
             next(reader)  # Skip headers
 
-            for row in reader:
-                csv_data = CrmResult()
-                csv_data.id = row[0]
-                csv_data.answers = Answers.objects.get(id=row[1])
-                csv_data.created_at = datetime.strptime(row[2], "%Y-%m-%d %H:%M:%S")
-                csv_data.state = row[3]
-                csv_data.result = row[4]
+            with keep_created_at():
+                while batch := list(islice(reader, options["batch_size"])):
+                    results = []
+                    for offset, row in enumerate(batch, start=imported + 2):
+                        try:
+                            results.append(parse_row(row))
+                        except (ValueError, IndexError) as e:
+                            raise CommandError(f"Row {offset}: {e}")
+                    self.check_answers(results)
+                    CrmResult.objects.bulk_create(results)
+                    refresh_crm_status({result.answers_id for result in results})
+                    imported += len(results)
+
+            # The ids came from the file, so the sequence must catch up with them
+            sql = connection.ops.sequence_reset_sql(no_style(), [CrmResult])
+            with connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
 
-                temp_data.append(csv_data)
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} CRM results."))
 
-        if len(temp_data) > 0:
-            CrmResult.objects.bulk_create(temp_data)
+    @staticmethod
+    def check_answers(results):
+        """Fail if any of ``results`` are for Answers that don't exist."""
+        ids = {result.answers_id for result in results}
+        found = set(Answers.objects.filter(id__in=ids).values_list("id", flat=True))
+        missing = sorted(ids - found)
+        if missing:
+            raise CommandError(
+                "No Answers with ids: %s" % ", ".join(map(str, missing[:20]))
+            )
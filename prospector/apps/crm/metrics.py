@@ -0,0 +1,44 @@
+from django.db.models import Min
+from django.utils import timezone
+
+from prospector import metrics
+from prospector.apis.crm import crm
+
+
+def pending_answers():
+    return {(): crm.answers_to_submit().count()}
+
+
+def oldest_pending_age():
+    oldest = crm.answers_to_submit().aggregate(oldest=Min("completed_at"))["oldest"]
+    if oldest is None:
+        return {(): 0}
+    return {(): (timezone.now() - oldest).total_seconds()}
+
+
+SUBMISSIONS = metrics.Counter(
+    "prospector_crm_submissions_total",
+    "CRM submissions, by outcome: success, unchanged, failed or throttled",
+    ["outcome"],
+)
+SUBMIT_DURATION = metrics.Histogram(
+    "prospector_crm_submit_duration_seconds",
+    "Time taken to submit one questionnaire to the CRM, by outcome",
+    ["outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+PENDING = metrics.Gauge(
+    "prospector_crm_pending_answers",
+    "Completed questionnaires not yet in the CRM",
+    collect=pending_answers,
+)
+PENDING_AGE = metrics.Gauge(
+    "prospector_crm_pending_oldest_age_seconds",
+    "How long ago the oldest questionnaire not yet in the CRM was completed",
+    collect=oldest_pending_age,
+)
+
+
+def record_submission(outcome: str, seconds: float):
+    SUBMISSIONS.inc(outcome=outcome)
+    SUBMIT_DURATION.observe(seconds, outcome=outcome)
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.15 on 2026-10-18 10:12
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("questionnaire", "0045_auto_20221104_1127"),
+        ("crm", "0002_alter_crmresult_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CrmOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+                (
+                    "answers",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="questionnaire.answers",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "CRM outbox",
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.15 on 2026-10-18 14:37
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crm", "0003_crmoutbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="crmresult",
+            name="payload",
+            field=models.JSONField(editable=False, null=True),
+        ),
+    ]
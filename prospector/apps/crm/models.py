@@ -1,4 +1,13 @@
+from typing import Iterable
+
 from django.db import models
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from prospector.apps.questionnaire.models import Answers
 
@@ -15,3 +24,54 @@ class CrmResult(models.Model):
         max_length=32, choices=CrmState.choices, db_index=True, blank=True
     )
     result = models.JSONField(null=True)
+    # The map_crm payload of a successful push, to send only changes next time.
+    payload = models.JSONField(null=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            # The newest result, so its state is the answers' status
+            Answers.objects.filter(pk=self.answers_id).update(
+                crm_results=F("crm_results") + 1, crm_status=self.state
+            )
+        else:
+            refresh_crm_status([self.answers_id])
+
+    def delete(self, *args, **kwargs):
+        answers_id = self.answers_id
+        deleted = super().delete(*args, **kwargs)
+        refresh_crm_status([answers_id])
+        return deleted
+
+
+def refresh_crm_status(answers_ids: Iterable[int]):
+    """Recount the CRM results of the Answers with ``answers_ids``.
+
+    For results saved or deleted other than one at a time, such as by
+    ``bulk_create`` or a queryset's ``delete``.
+    """
+    results = CrmResult.objects.filter(answers=OuterRef("pk")).order_by()
+    latest = results.order_by("-created_at", "-pk").values("state")[:1]
+    count = results.values("answers").annotate(count=Count("pk")).values("count")
+    Answers.objects.filter(pk__in=list(answers_ids)).update(
+        crm_results=Coalesce(Subquery(count), 0),
+        crm_status=Coalesce(Subquery(latest), Value("")),
+    )
+
+
+class CrmOutbox(models.Model):
+    """Completed Answers waiting to be submitted to the CRM.
+
+    Rows are written in the same transaction that completes the questionnaire and
+    are removed by the ``drain_crm_outbox`` worker once the CRM has accepted them.
+    """
+
+    answers = models.OneToOneField(Answers, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name_plural = "CRM outbox"
@@ -0,0 +1,284 @@
+"""Transactional outbox for CRM submissions.
+
+``close_questionnaire`` calls ``enqueue`` inside the request transaction, so a
+completed questionnaire and its pending CRM submission are committed together.
+The ``drain_crm_outbox`` worker then claims rows with ``SKIP LOCKED`` (several
+workers can drain side by side), submits them with bounded concurrency and
+records a ``CrmResult`` for each.  Failed rows are retried with exponential
+backoff until ``max_attempts`` is reached, after which they are kept as
+dead letters with a FAILURE result.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from django.db import close_old_connections
+from django.db import transaction
+from django.utils import timezone
+
+from prospector.apis.crm import crm
+from prospector.apps.crm import services
+from prospector.apps.crm.models import CrmOutbox
+from prospector.apps.crm.models import CrmState
+from prospector.apps.crm.ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 30
+RETRY_CAP_SECONDS = 60 * 60
+
+
+def enqueue(answers) -> CrmOutbox:
+    entry, _ = CrmOutbox.objects.get_or_create(answers=answers)
+    return entry
+
+
+def enqueue_pending() -> int:
+    """Add completed Answers that were never submitted, returning how many."""
+    pending = crm.answers_to_submit().filter(crmoutbox__isnull=True)
+    count = 0
+    for answers in pending.iterator():
+        enqueue(answers)
+        count += 1
+    return count
+
+
+def claim(limit: int, max_attempts: int = MAX_ATTEMPTS, lease=LEASE) -> List[CrmOutbox]:
+    """Lease up to ``limit`` due rows to the caller.
+
+    Rows locked by another worker are skipped rather than waited on, and the
+    claimed rows are pushed ``lease`` into the future so that a worker which dies
+    mid-submission only delays them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        entries = list(
+            CrmOutbox.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("answers")
+            .filter(available_at__lte=now, attempts__lt=max_attempts)
+            .order_by("available_at")[:limit]
+        )
+        if entries:
+            CrmOutbox.objects.filter(pk__in=[e.pk for e in entries]).update(
+                available_at=now + lease
+            )
+    return entries
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter, so failed rows don't retry in lockstep."""
+    delay = min(RETRY_CAP_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def deliver(entry: CrmOutbox, get_session: Callable, max_attempts: int) -> bool:
+    """Push one outbox row to the CRM; returns True if the row is done with.
+
+    Answers already in the CRM are updated with whatever changed since their last
+    push (see ``services.push``), so re-enqueueing them is how corrections are
+    synced.
+
+    ``get_session(fresh=False)`` returns an authorised CRM session.  A push
+    refused for its token (``crm.AUTH_ERRORS``) is retried once on a fresh
+    session, so an expired token isn't held against the row.  Other failures,
+    such as timeouts and server errors, may come after the CRM created the
+    record, so they count as an attempt and back off rather than repeat the
+    create straight away.  Throttling by the CRM is not
+    the row's fault either, so ``crm.CrmThrottled`` puts the row back without
+    using up an attempt and is re-raised for the caller to slow down.
+    """
+    answers = entry.answers
+
+    try:
+        try:
+            pushed = services.push(get_session(), answers)
+        except crm.AUTH_ERRORS:
+            # Retry with new session
+            pushed = services.push(get_session(fresh=True), answers)
+    except crm.CrmThrottled as e:
+        entry.available_at = timezone.now() + timedelta(seconds=e.retry_after)
+        entry.save(update_fields=["available_at"])
+        raise
+    except Exception as e:
+        record_failure(entry, e, max_attempts)
+        return False
+
+    with transaction.atomic():
+        if pushed is not None:
+            result, payload = pushed
+            answers.crmresult_set.create(
+                result=result, payload=payload, state=CrmState.SUCCESS
+            )
+        entry.delete()
+    return True
+
+
+def record_failure(entry: CrmOutbox, error: Exception, max_attempts: int):
+    entry.attempts += 1
+    entry.last_error = str(error)
+    logger.warning(
+        "CRM submission of %s failed (attempt %d): %s",
+        entry.answers.uuid,
+        entry.attempts,
+        error,
+    )
+
+    with transaction.atomic():
+        if entry.attempts >= max_attempts:
+            entry.answers.crmresult_set.create(
+                result=getattr(error, "result", None), state=CrmState.FAILURE
+            )
+        else:
+            entry.available_at = timezone.now() + retry_delay(entry.attempts)
+        entry.save(update_fields=["attempts", "last_error", "available_at"])
+
+
+class Drainer:
+    """Drain the outbox until stopped.
+
+    Each batch is submitted over a pool of ``concurrency`` threads, with a pool of
+    authorised CRM sessions shared between them.  Requests are paced by a
+    ``TokenBucket`` starting at ``rate`` requests per second, which backs off
+    whenever the CRM answers 429 and creeps back up towards ``max_rate``.  When a
+    whole batch fails the CRM is assumed to be unwell and the drainer pauses,
+    doubling the pause on each consecutive failed batch up to ``max_pause``
+    seconds.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        batch_size: int = 20,
+        max_attempts: int = MAX_ATTEMPTS,
+        poll_interval: float = 5,
+        max_pause: float = 300,
+        rate: float = 10,
+        max_rate: float = 20,
+        report_interval: float = 60,
+    ):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.max_pause = max_pause
+        self.report_interval = report_interval
+        self.limiter = TokenBucket(rate, max_rate=max_rate)
+        self.pause = 0
+        self.stopped = threading.Event()
+        self.stats = {"delivered": 0, "failed": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+        self._sessions = queue.SimpleQueue()
+        self._busy = 0.0
+
+    @property
+    def requests_per_second(self) -> float:
+        """Achieved rate while there was work to do, idle polling excluded."""
+        if not self._busy:
+            return 0.0
+        return sum(self.stats.values()) / self._busy
+
+    def report(self):
+        logger.info(
+            "CRM outbox: %(delivered)d delivered, %(failed)d failed, "
+            "%(throttled)d throttled, %(rate).1f req/s (limit %(limit).1f)",
+            {
+                **self.stats,
+                "rate": self.requests_per_second,
+                "limit": self.limiter.rate,
+            },
+        )
+
+    def stop(self, *args):
+        self.stopped.set()
+
+    def run(self, once: bool = False) -> int:
+        """Drain until stopped, or until nothing is due if ``once``.
+
+        Returns the number of rows successfully delivered.
+        """
+        reported = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while not self.stopped.is_set():
+                entries = claim(self.batch_size, self.max_attempts)
+                if not entries:
+                    if once:
+                        break
+                    self.stopped.wait(self.poll_interval)
+                    continue
+
+                started = time.monotonic()
+                outcomes = list(executor.map(self._deliver, entries))
+                self._busy += time.monotonic() - started
+
+                if started - reported >= self.report_interval:
+                    self.report()
+                    reported = started
+
+                if True in outcomes or None in outcomes:
+                    self.pause = 0
+                    continue
+
+                self.pause = min(
+                    self.max_pause, max(self.poll_interval, self.pause * 2)
+                )
+                logger.warning("CRM outbox batch failed, pausing %.0fs", self.pause)
+                if once:
+                    break
+                self.stopped.wait(random.uniform(self.pause / 2, self.pause))
+        self.report()
+        return self.stats["delivered"]
+
+    def _deliver(self, entry: CrmOutbox) -> Optional[bool]:
+        """Deliver one row; None means the CRM throttled it."""
+        close_old_connections()
+        session = None
+
+        def get_session(fresh=False):
+            nonlocal session
+            session = None
+            if not fresh:
+                try:
+                    session = self._sessions.get_nowait()
+                except queue.Empty:
+                    pass
+            if session is None:
+                session = crm.get_authorised_session(crm.get_client())
+            self.limiter.acquire()
+            return session
+
+        try:
+            ok = deliver(entry, get_session, self.max_attempts)
+        except crm.CrmThrottled as e:
+            self.limiter.throttled(e.retry_after)
+            ok = None
+        except Exception:
+            logger.exception("CRM outbox row %s could not be processed", entry.pk)
+            ok = False
+        finally:
+            close_old_connections()
+
+        if ok:
+            self.limiter.succeeded()
+        with self._stats_lock:
+            self.stats[{True: "delivered", False: "failed", None: "throttled"}[ok]] += 1
+
+        # Sessions that just failed are dropped, as the cause may have been an
+        # expired token.
+        if ok is not False and session is not None:
+            self._sessions.put(session)
+        return ok
+
+
+def drain(**kwargs) -> int:
+    """Deliver everything currently due and return the number delivered."""
+    return Drainer(**kwargs).run(once=True)
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket that adapts to the CRM's service protection limits.
+
+    ``acquire`` blocks until a request may be sent.  When the CRM throttles us,
+    ``throttled`` stops all callers until its Retry-After has passed and halves the
+    rate; each ``succeeded`` call then wins back a little of it, up to ``max_rate``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        max_rate: Optional[float] = None,
+        min_rate: float = 0.1,
+        capacity: Optional[float] = None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.rate = rate
+        self.max_rate = max(rate, max_rate or rate)
+        self.min_rate = min_rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self):
+        # The token is taken straight away, running the bucket into debt if need
+        # be; the caller then sleeps until the debt would have been refilled.
+        # Callers arriving meanwhile add to the debt and so queue up behind it.
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self.tokens -= 1
+            ready_at = max(self._updated, now) + max(0.0, -self.tokens) / self.rate
+        if ready_at > now:
+            self._sleep(ready_at - now)
+
+    def throttled(self, retry_after: float):
+        with self._lock:
+            now = self._clock()
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Nothing accrues until Retry-After has passed, so there is no burst
+            # on release
+            self.tokens = min(self.tokens, 0)
+            self._updated = max(self._updated, now + retry_after)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
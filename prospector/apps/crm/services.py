@@ -0,0 +1,67 @@
+import json
+import time
+from typing import Optional
+from typing import Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from prospector.apis.crm import crm
+from prospector.apps.crm.metrics import record_submission
+from prospector.apps.crm.models import CrmState
+
+
+class CrmSubmissionError(Exception):
+    """The CRM answered, but did not accept the record."""
+
+    def __init__(self, result):
+        super().__init__(result)
+        self.result = result
+
+
+def snapshot(crm_data: dict) -> dict:
+    """``crm_data`` as it will read back from a JSONField, for comparison."""
+    return json.loads(json.dumps(crm_data, cls=DjangoJSONEncoder))
+
+
+def push(session, answers) -> Optional[Tuple[dict, dict]]:
+    """Create or update the CRM record for ``answers``.
+
+    The first push creates the record.  Later pushes PATCH it by its ``pcc_name``
+    alternate key, sending only the fields that changed since the payload stored
+    with the last successful push (or everything, for records pushed before
+    payloads were stored).  Returns the CRM response and the full payload to
+    store, or None if the CRM is already up to date.
+    """
+    started = time.perf_counter()
+    try:
+        pushed = _push(session, answers)
+    except crm.CrmThrottled:
+        record_submission("throttled", time.perf_counter() - started)
+        raise
+    except Exception:
+        record_submission("failed", time.perf_counter() - started)
+        raise
+    outcome = "unchanged" if pushed is None else "success"
+    record_submission(outcome, time.perf_counter() - started)
+    return pushed
+
+
+def _push(session, answers) -> Optional[Tuple[dict, dict]]:
+    payload = snapshot(crm.map_crm(answers))
+    last = (
+        answers.crmresult_set.filter(state=CrmState.SUCCESS)
+        .order_by("-created_at", "-pk")
+        .first()
+    )
+
+    if last is None:
+        result = crm.create_pcc_record(session, payload)
+    else:
+        changes = crm.changed_fields(last.payload or {}, payload)
+        if not changes:
+            return None
+        result = crm.update_pcc_record(session, str(answers.uuid), changes)
+
+    if not result or "error" in result:
+        raise CrmSubmissionError(result)
+    return result, payload
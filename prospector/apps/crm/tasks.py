@@ -5,6 +5,7 @@ from celery import shared_task
 from celery_singleton import Singleton
 
 from prospector.apis.crm import crm
+from prospector.apps.crm import services
 from prospector.apps.crm.models import Answers
 from prospector.apps.crm.models import CrmState
 
@@ -29,21 +30,23 @@ class CRMApiRequestTask(Singleton):
 
 @shared_task(base=CRMApiRequestTask, bind=True, raise_on_duplicate=True)
 def crm_create(self, answers_uuid: uuid.uuid4) -> Optional[dict]:
-    result = None
+    """Create the CRM record for the answers, or update it if already submitted."""
     answers = Answers.objects.get(uuid=answers_uuid)
 
-    # TODO: Updates not yet supported
-    if answers.crmresult_set.exists():
-        raise Exception("{0} already submitted".format(answers_uuid))
-
     try:
-        result = crm.create_pcc_record(crm_create.session, crm.map_crm(answers))
+        pushed = services.push(crm_create.session, answers)
     except Exception:
         try:
             # Retry with new session
-            result = crm.create_pcc_record(crm_create.new_session, crm.map_crm(answers))
+            pushed = services.push(crm_create.new_session, answers)
         except Exception as e:
-            answers.crmresult_set.create(result=result, state=CrmState.FAILURE)
+            answers.crmresult_set.create(
+                result=getattr(e, "result", None), state=CrmState.FAILURE
+            )
             raise e  # re-raise for celery
-    answers.crmresult_set.create(result=result, state=CrmState.SUCCESS)
+
+    if pushed is None:
+        return None
+    result, payload = pushed
+    answers.crmresult_set.create(result=result, payload=payload, state=CrmState.SUCCESS)
     return result
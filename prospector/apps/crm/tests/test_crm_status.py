@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from prospector.apps.crm.models import CrmResult
+from prospector.apps.crm.models import CrmState
+from prospector.apps.crm.models import refresh_crm_status
+from prospector.apps.questionnaire.admin import EstimatedCountPaginator
+from prospector.apps.questionnaire.models import Answers
+from prospector.apps.questionnaire.tests.factories import AnswersFactory
+
+
+def status(answers):
+    answers.refresh_from_db()
+    return answers.crm_results, answers.crm_status
+
+
+@pytest.mark.django_db
+def test_results_keep_status_up_to_date():
+    answers = AnswersFactory()
+    assert status(answers) == (0, "")
+
+    failure = CrmResult.objects.create(answers=answers, state=CrmState.FAILURE)
+    assert status(answers) == (1, CrmState.FAILURE)
+    success = CrmResult.objects.create(answers=answers, state=CrmState.SUCCESS)
+    assert status(answers) == (2, CrmState.SUCCESS)
+
+    success.delete()
+    assert status(answers) == (1, CrmState.FAILURE)
+    failure.state = CrmState.SUCCESS
+    failure.save()
+    assert status(answers) == (1, CrmState.SUCCESS)
+
+
+@pytest.mark.django_db
+def test_saving_answers_keeps_status():
+    answers = AnswersFactory()
+    stale = Answers.objects.get(pk=answers.pk)
+    CrmResult.objects.create(answers=answers, state=CrmState.SUCCESS)
+    stale.first_name = "Changed"
+    stale.save()
+    assert status(answers) == (1, CrmState.SUCCESS)
+
+
+@pytest.mark.django_db
+def test_refresh_after_bulk_changes():
+    answers = AnswersFactory.create_batch(2)
+    CrmResult.objects.bulk_create(
+        CrmResult(answers=answers[0], state=CrmState.SUCCESS) for _ in range(3)
+    )
+    refresh_crm_status(a.pk for a in answers)
+    assert [status(a) for a in answers] == [(3, CrmState.SUCCESS), (0, "")]
+
+    CrmResult.objects.all().delete()
+    refresh_crm_status([answers[0].pk])
+    assert status(answers[0]) == (0, "")
+
+
+@pytest.mark.django_db
+def test_admin_filters_on_status(admin_client):
+    submitted, _ = AnswersFactory.create_batch(2)
+    CrmResult.objects.create(answers=submitted, state=CrmState.SUCCESS)
+    url = reverse("admin:questionnaire_answers_changelist")
+
+    response = admin_client.get(url, {"crmresult_count": "submitted"})
+    assert response.status_code == 200
+    assert [a.pk for a in response.context["cl"].result_list] == [submitted.pk]
+    response = admin_client.get(url, {"crmresult_count": "not_submitted"})
+    assert submitted not in response.context["cl"].result_list
+
+
+@pytest.mark.django_db
+def test_paginator_estimates_large_unfiltered_lists(monkeypatch):
+    AnswersFactory.create_batch(3)
+    monkeypatch.setattr(EstimatedCountPaginator, "exact_below", 2)
+    # The planner's estimate is only as fresh as the last ANALYZE
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE questionnaire_answers")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert EstimatedCountPaginator(Answers.objects.all(), 10).count == 3
+    assert "pg_class" in queries[0]["sql"]
+    assert not any("COUNT(" in query["sql"] for query in queries)
+
+    filtered = Answers.objects.filter(pk__in=[0])
+    assert EstimatedCountPaginator(filtered, 10).count == 0
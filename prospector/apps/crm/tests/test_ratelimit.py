@@ -0,0 +1,63 @@
+import pytest
+
+from prospector.apps.crm.ratelimit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_paces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(2, capacity=1, clock=clock, sleep=clock.sleep)
+
+    for _ in range(0, 5):
+        bucket.acquire()
+
+    # One token up front, then one every half second
+    assert clock.now == 2.0
+
+
+def test_token_bucket_obeys_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+
+    bucket.throttled(30)
+    assert bucket.rate == 5
+
+    bucket.acquire()
+    # Retry-After, then a token at the halved rate
+    assert clock.now == pytest.approx(30.2)
+
+
+def test_token_bucket_acquire_returns_after_throttle():
+    clock = FakeClock()
+    bucket = TokenBucket(10, clock=clock, sleep=clock.sleep)
+
+    for _ in range(0, 3):
+        bucket.acquire()
+    bucket.throttled(30)
+    for _ in range(0, 50):
+        bucket.acquire()
+
+    assert clock.now == pytest.approx(30 + 50 / 5)
+    assert len(clock.slept) == 50
+
+
+def test_token_bucket_recovers_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(10, max_rate=20, clock=clock, sleep=clock.sleep)
+
+    bucket.throttled(1)
+    for _ in range(0, 100):
+        bucket.succeeded()
+    assert bucket.rate == 20
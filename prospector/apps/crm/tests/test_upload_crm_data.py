@@ -0,0 +1,72 @@
+import csv
+import io
+from datetime import datetime
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from prospector.apps.crm.management.commands import upload_crm_data
+from prospector.apps.crm.models import CrmResult
+from prospector.apps.crm.models import CrmState
+from prospector.apps.questionnaire.tests.factories import AnswersFactory
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "answers_id", "created_at", "state", "result"])
+        writer.writerows(rows)
+
+
+@pytest.mark.django_db
+def test_restores_results(tmp_path, django_assert_max_num_queries):
+    answers = AnswersFactory.create_batch(3)
+    rows = [
+        [100 + i, answers[i % 3].id, "2024-03-0%d 12:30:00" % (i + 1), "SUCCESS", ""]
+        for i in range(7)
+    ]
+    path = tmp_path / "crm.csv"
+    write_csv(path, rows)
+
+    # Per batch: one check, one insert and one recount, whatever the batch size
+    with django_assert_max_num_queries(15):
+        call_command(
+            upload_crm_data.Command(),
+            file=str(path),
+            batch_size=3,
+            stdout=io.StringIO(),
+        )
+
+    restored = CrmResult.objects.order_by("id")
+    assert [r.id for r in restored] == [row[0] for row in rows]
+    assert restored[1].answers == answers[1]
+    assert restored[1].created_at == timezone.make_aware(datetime(2024, 3, 2, 12, 30))
+    for instance in answers:
+        instance.refresh_from_db()
+    assert [(a.crm_results, a.crm_status) for a in answers] == [
+        (3, "SUCCESS"),
+        (2, "SUCCESS"),
+        (2, "SUCCESS"),
+    ]
+    # New results carry on after the restored ids
+    assert CrmResult.objects.create(answers=answers[0], state=CrmState.SUCCESS).id > 106
+
+
+@pytest.mark.django_db
+def test_rejects_unknown_answers(tmp_path):
+    answers = AnswersFactory()
+    path = tmp_path / "crm.csv"
+    write_csv(
+        path,
+        [
+            [1, answers.id, "2024-03-01 12:30:00", "SUCCESS", ""],
+            [2, answers.id + 1000, "2024-03-01 12:30:00", "SUCCESS", ""],
+        ],
+    )
+    with pytest.raises(
+        CommandError, match="No Answers with ids: %d" % (answers.id + 1000)
+    ):
+        call_command(upload_crm_data.Command(), file=str(path), batch_size=1)
+    assert not CrmResult.objects.exists()
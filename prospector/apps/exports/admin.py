@@ -0,0 +1,92 @@
+from django.contrib import admin
+from django.contrib import messages
+from django.http import FileResponse
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path
+from django.urls import reverse
+from django.utils.html import format_html
+
+from . import models
+from . import tasks
+
+
+class BackgroundExportMixin:
+    """Provides ``export_in_background``, an action for the admin's ``actions``.
+
+    The selected rows are written to a gzipped CSV in media storage by an RQ
+    job rather than in the request, so large selections don't tie up a web
+    worker.
+    """
+
+    @admin.action(description="Export selected to CSV", permissions=["view"])
+    def export_in_background(self, request, queryset):
+        export = models.Export.objects.create(
+            user=request.user, model=queryset.model._meta.label
+        )
+        link = request.build_absolute_uri(
+            reverse("admin:exports_export_change", args=[export.pk])
+        )
+        tasks.export.delay(export.pk, queryset.query, link)
+        self.message_user(
+            request,
+            format_html(
+                'The export was queued; you will be emailed when it is <a href="{}">'
+                "ready</a>.",
+                link,
+            ),
+            messages.SUCCESS,
+        )
+
+
+@admin.register(models.Export)
+class ExportAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "user", "state", "rows", "finished_at", "download")
+    list_filter = ("state", "model")
+    list_select_related = ("user",)
+    readonly_fields = (
+        "user",
+        "model",
+        "created_at",
+        "finished_at",
+        "state",
+        "rows",
+        "download",
+        "error",
+    )
+    exclude = ("file",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.user.is_superuser:
+            return queryset
+        return queryset.filter(user=request.user)
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="exports_export_download",
+            ),
+            *super().get_urls(),
+        ]
+
+    def download(self, instance):
+        if not instance.file:
+            return "-"
+        url = reverse("admin:exports_export_download", args=[instance.pk])
+        return format_html('<a href="{}">{}</a>', url, instance.file.name)
+
+    def download_view(self, request, pk):
+        instance = get_object_or_404(self.get_queryset(request), pk=pk)
+        if not self.has_view_permission(request, instance) or not instance.file:
+            raise Http404
+        return FileResponse(
+            instance.file.open("rb"),
+            as_attachment=True,
+            filename=instance.file.name.rsplit("/", 1)[-1],
+        )
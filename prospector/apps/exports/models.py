@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import models
+
+
+class ExportState(models.TextChoices):
+    PENDING = "PENDING", "Pending"
+    RUNNING = "RUNNING", "Running"
+    DONE = "DONE", "Done"
+    FAILED = "FAILED", "Failed"
+
+
+class Export(models.Model):
+    """A gzipped CSV of admin rows, written by the ``export`` job."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    # The exported model's label, e.g. "questionnaire.Answers"
+    model = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    state = models.CharField(
+        max_length=32, choices=ExportState.choices, default=ExportState.PENDING
+    )
+    rows = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to="exports/", blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return "%s export %s" % (self.model, self.created_at.strftime("%Y-%m-%d %H:%M"))
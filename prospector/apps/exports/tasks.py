@@ -0,0 +1,77 @@
+import csv
+import gzip
+import io
+import tempfile
+from typing import Optional
+
+from django.apps import apps
+from django.core.files import File
+from django.core.mail import send_mail
+from django.utils import timezone
+from django_rq import job
+from import_export.resources import modelresource_factory
+
+from .models import Export
+from .models import ExportState
+
+CHUNK_SIZE = 2000
+
+
+@job
+def export(export_id: int, query, link: Optional[str] = None):
+    """Write the rows of ``query`` to the export's file, a chunk at a time.
+
+    ``query`` is a queryset's ``query``, which unlike the queryset can be
+    pickled, so the worker runs exactly what the admin selected.  The user is
+    emailed ``link`` when the file is ready.
+    """
+    Export.objects.filter(pk=export_id).update(state=ExportState.RUNNING)
+    instance = Export.objects.select_related("user").get(pk=export_id)
+    model = apps.get_model(instance.model)
+    queryset = model._default_manager.all()
+    queryset.query = query
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            instance.rows = write_csv(queryset, tmp)
+            tmp.seek(0)
+            name = "%s-%s.csv.gz" % (
+                model._meta.model_name,
+                timezone.now().strftime("%Y%m%d-%H%M%S"),
+            )
+            instance.file.save(name, File(tmp), save=False)
+    except Exception as e:
+        instance.state = ExportState.FAILED
+        instance.error = str(e)
+        instance.finished_at = timezone.now()
+        instance.save()
+        raise
+
+    instance.state = ExportState.DONE
+    instance.finished_at = timezone.now()
+    instance.save()
+
+    if instance.user and instance.user.email:
+        send_mail(
+            "Your export is ready",
+            "%d rows of %s were exported: %s"
+            % (instance.rows, model._meta.verbose_name_plural, link or ""),
+            None,
+            [instance.user.email],
+        )
+    return instance.rows
+
+
+def write_csv(queryset, file) -> int:
+    """Write ``queryset`` to ``file`` as gzipped CSV, as the admin would export it."""
+    resource = modelresource_factory(queryset.model)()
+    rows = 0
+    with io.TextIOWrapper(
+        gzip.GzipFile(fileobj=file, mode="wb"), encoding="utf-8", newline=""
+    ) as text:
+        writer = csv.writer(text)
+        writer.writerow(resource.get_export_headers())
+        for obj in queryset.iterator(chunk_size=CHUNK_SIZE):
+            writer.writerow(resource.export_resource(obj))
+            rows += 1
+    return rows
@@ -0,0 +1,117 @@
+import csv
+import gzip
+import io
+import pickle
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.urls import reverse
+
+from prospector.apps.crm.models import CrmResult
+from prospector.apps.crm.models import CrmState
+from prospector.apps.exports import tasks
+from prospector.apps.exports.models import Export
+from prospector.apps.exports.models import ExportState
+from prospector.apps.questionnaire.models import Answers
+from prospector.apps.questionnaire.tests.factories import AnswersFactory
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+def read(export):
+    with export.file.open("rb") as f:
+        return list(csv.reader(io.TextIOWrapper(gzip.open(f), encoding="utf-8")))
+
+
+@pytest.fixture
+def queued(admin_client, monkeypatch):
+    """Select ``answers`` in the admin and return what was queued."""
+    calls = []
+    monkeypatch.setattr(tasks.export, "delay", lambda *args: calls.append(args))
+
+    def select(answers):
+        response = admin_client.post(
+            reverse("admin:questionnaire_answers_changelist"),
+            {
+                "action": "export_in_background",
+                "_selected_action": [a.pk for a in answers],
+            },
+        )
+        assert response.status_code == 302
+        # As the queue would store them
+        return pickle.loads(pickle.dumps(calls.pop()))
+
+    return select
+
+
+@pytest.mark.django_db
+def test_export_writes_selected_rows(queued, mailoutbox, admin_user):
+    answers = AnswersFactory.create_batch(3)
+    export_id, query, link = queued(answers[:2])
+    export = Export.objects.get(pk=export_id)
+    assert (export.user, export.model) == (admin_user, "questionnaire.Answers")
+    assert export.state == ExportState.PENDING
+
+    assert tasks.export(export_id, query, link) == 2
+
+    export.refresh_from_db()
+    assert export.state == ExportState.DONE
+    assert export.file.name.endswith(".csv.gz")
+    header, *rows = read(export)
+    assert "first_name" in header
+    ids = {int(row[header.index("id")]) for row in rows}
+    assert ids == {answers[0].pk, answers[1].pk}
+    assert mailoutbox[0].to == [admin_user.email]
+    assert link in mailoutbox[0].body
+
+
+@pytest.mark.django_db
+def test_export_queries_dont_grow_with_rows(django_assert_max_num_queries):
+    answers = AnswersFactory.create_batch(20)
+    CrmResult.objects.bulk_create(
+        CrmResult(answers=a, state=CrmState.SUCCESS) for a in answers
+    )
+    export = Export.objects.create(model="crm.CrmResult")
+    with django_assert_max_num_queries(6):
+        tasks.export(export.pk, CrmResult.objects.all().query)
+    header, *rows = read(Export.objects.get(pk=export.pk))
+    assert {row[header.index("answers")] for row in rows} == {
+        str(a.pk) for a in answers
+    }
+
+
+@pytest.mark.django_db
+def test_failed_export_is_recorded(monkeypatch):
+    def fail(queryset, file):
+        raise OSError("Disk full")
+
+    monkeypatch.setattr(tasks, "write_csv", fail)
+    export = Export.objects.create(model="questionnaire.Answers")
+    with pytest.raises(OSError):
+        tasks.export(export.pk, Answers.objects.all().query)
+    export.refresh_from_db()
+    assert export.state == ExportState.FAILED
+    assert export.error == "Disk full"
+
+
+@pytest.mark.django_db
+def test_download(admin_client, client, django_user_model):
+    AnswersFactory()
+    export = Export.objects.create(model="questionnaire.Answers")
+    tasks.export(export.pk, Answers.objects.all().query)
+    url = reverse("admin:exports_export_download", args=[export.pk])
+
+    response = admin_client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Disposition"].endswith('.csv.gz"')
+
+    # Staff who can view exports only see their own
+    staff = django_user_model.objects.create_user("staff", is_staff=True)
+    staff.user_permissions.add(Permission.objects.get(codename="view_export"))
+    client.force_login(staff)
+    response = client.get(reverse("admin:exports_export_changelist"))
+    assert response.status_code == 200
+    assert not response.context["cl"].result_list
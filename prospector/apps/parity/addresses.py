@@ -0,0 +1,35 @@
+"""Parity addresses, in the form the CRM and the address lookups use.
+
+Parity gives addresses in capitals, often with the whole address in the first
+line and the town in the second: "12 BENBOW STREET, STOKE" and "PLYMOUTH".
+"""
+
+from .models import ParityData
+from prospector.dataformats import postcodes
+
+
+def normalise(parity: ParityData) -> bool:
+    """Title-case the address lines of ``parity``, as the CRM has them.
+
+    Anything after a comma in the first line becomes the second line; otherwise
+    Parity's "PLYMOUTH" is dropped from the second.  The postcode is put in
+    canonical form.  Returns whether anything changed.
+    """
+    address_1, address_2, postcode = parity.address_1, parity.address_2, parity.postcode
+    titled = address_1.title()
+    if "," in titled:
+        lines = titled.split(",")
+        parity.address_1 = lines[0].strip()
+        parity.address_2 = lines[1].strip()
+    else:
+        parity.address_1 = titled.strip()
+        if address_2 == "PLYMOUTH":
+            parity.address_2 = ""
+        else:
+            parity.address_2 = address_2.replace(", PLYMOUTH", "").strip().title()
+    parity.postcode = postcodes.normalise(parity.postcode)
+    return (parity.address_1, parity.address_2, parity.postcode) != (
+        address_1,
+        address_2,
+        postcode,
+    )
@@ -3,7 +3,12 @@ from decimal import Decimal, InvalidOperation
 
 from django.core.management.base import BaseCommand, CommandError
 
+from ... import addresses
+from ... import snapshot
+from ... import spatial
+from ...fields import EnumCodeField
 from ...models import ParityData
+from prospector import metrics
 
 
 def parse_uprn(value: str) -> str | None:
@@ -37,6 +42,88 @@ def parse_uprn(value: str) -> str | None:
     return format(uprn, "f").split(".")[0]
 
 
+def parse_pounds(value: str) -> int | None:
+    """Parse an amount such as ``"£1,234.50"`` to whole pounds.
+
+    Raises:
+        InvalidOperation: If ``value`` isn't an amount.
+    """
+    value = value.replace("£", "").replace(",", "").strip()
+    if not value:
+        return None
+    return int(Decimal(value).to_integral_value())
+
+
+def parse_row(row: list) -> ParityData:
+    """Build an unsaved ``ParityData`` from one row of the Parity CSV.
+
+    Raises:
+        ValueError, InvalidOperation: If a numeric column can't be parsed, or a
+            fabric column has a value the questionnaire doesn't know.
+        CommandError: If the UPRN can't be parsed.
+    """
+    parity = ParityData(
+        org_ref=row[0],
+        address_link=row[1],
+        googlemaps=row[2],
+        address_1=row[3],
+        address_2=row[4],
+        address_3=row[5],
+        postcode=row[6],
+        sap_score=float(row[7] or 0),
+        sap_band=row[8],
+        lodged_epc_score=int(row[9]) if row[9] else None,
+        lodged_epc_band=row[10] or None,
+        tco2_current=Decimal(row[15] or 0),
+        realistic_fuel_bill=parse_pounds(row[19]),
+        type=row[20],
+        attachment=row[21],
+        construction_years=row[22],
+        heated_rooms=int(row[23] or 0),
+        wall_construction=row[25],
+        wall_insulation=row[26],
+        roof_construction=row[27],
+        roof_insulation=row[28],
+        floor_construction=row[29],
+        floor_insulation=row[30],
+        glazing=row[31],
+        heating=row[32],
+        boiler_efficiency=row[33],
+        main_fuel=row[34],
+        controls_adequacy=row[35],
+        local_authority=row[36],
+        ward=row[37],
+        parliamentary_constituency=row[38],
+        region_name=row[39],
+        tenure=row[40],
+        uprn=parse_uprn(row[41]),
+        lat_coordinate=Decimal(row[42]) if row[42] else None,
+        long_coordinate=Decimal(row[43]) if row[43] else None,
+        lower_super_output_area_code=row[45],
+        multiple_deprivation_index=int(row[48] or 0),
+        income_decile=int(row[47] or 0),
+        total_floor_area=int(row[46] or 0),
+    )
+    # Encoded now, rather than on saving, so errors point at the row
+    for field in ParityData._meta.fields:
+        if isinstance(field, EnumCodeField):
+            field.encode(getattr(parity, field.attname))
+    return parity
+
+
+def unique_uprns(rows: list) -> list:
+    """``rows`` without any but the last of those sharing a UPRN.
+
+    Answers are linked to the Parity row of their property by its UPRN.
+    """
+    last = {parity.uprn: i for i, parity in enumerate(rows) if parity.uprn}
+    return [
+        parity
+        for i, parity in enumerate(rows)
+        if not parity.uprn or last[parity.uprn] == i
+    ]
+
+
 class Command(BaseCommand):
     help = "Upload Parity data from CSV"
 
@@ -44,12 +131,13 @@ class Command(BaseCommand):
         parser.add_argument("--file", type=str, required=True)
 
     # ──────────────────────────────────────────────────────────────────────────
+    @metrics.IMPORT_DURATION.time(command="data_upload")
     def handle(self, *args, **options):
         ParityData.objects.all().delete()
 
         temp_data = []
         csv_path = options["file"]
-        expected_cols = 46                       # highest index used is 45
+        expected_cols = 49                       # highest index used is 48
 
         try:
             with open(csv_path, newline="", encoding="utf-8") as f:
@@ -64,54 +152,9 @@ class Command(BaseCommand):
                         )
 
                     try:
-                        pd = ParityData(
-                            org_ref=row[0],
-                            address_link=row[1],
-                            googlemaps=row[2],
-                            address_1=row[3],
-                            address_2=row[4],
-                            address_3=row[5],
-                            postcode=row[6],
-                            sap_score=Decimal(row[7] or 0),
-                            sap_band=row[8],
-                            lodged_epc_score=int(row[9]) if row[9] else None,
-                            lodged_epc_band=row[10] or None,
-                            tco2_current=Decimal(row[15] or 0),
-                            realistic_fuel_bill=row[19],
-                            type=row[20],
-                            attachment=row[21],
-                            construction_years=row[22],
-                            heated_rooms=int(row[23] or 0),
-                            wall_construction=row[25],
-                            wall_insulation=row[26],
-                            roof_construction=row[27],
-                            roof_insulation=row[28],
-                            floor_construction=row[29],
-                            floor_insulation=row[30],
-                            glazing=row[31],
-                            heating=row[32],
-                            boiler_efficiency=row[33],
-                            main_fuel=row[34],
-                            controls_adequacy=row[35],
-                            local_authority=row[36],
-                            ward=row[37],
-                            parliamentary_constituency=row[38],
-                            region_name=row[39],
-                            tenure=row[40],
-                            uprn=parse_uprn(row[41]),
-                            lat_coordinate=(
-                                Decimal(row[42]) if row[42] else None
-                            ),
-                            long_coordinate=(
-                                Decimal(row[43]) if row[43] else None
-                            ),
-                            lower_super_output_area_code=row[45],
-                            multiple_deprivation_index=int(row[48] or 0),
-                            income_decile=int(row[47] or 0),
-                            total_floor_area=int(row[46] or 0),
-                        )
-
-                        temp_data.append(pd)
+                        parity = parse_row(row)
+                        addresses.normalise(parity)
+                        temp_data.append(parity)
 
                     except (ValueError, InvalidOperation) as e:
                         raise CommandError(f"Row {idx} value error: {e}")
@@ -119,10 +162,22 @@ class Command(BaseCommand):
         except FileNotFoundError:
             raise CommandError(f"CSV file not found: {csv_path}")
 
+        unique = unique_uprns(temp_data)
+        if len(unique) < len(temp_data):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Skipped {len(temp_data) - len(unique)} rows with the UPRN "
+                    "of a later row."
+                )
+            )
+            temp_data = unique
+
         if temp_data:
+            spatial.index(temp_data)
             ParityData.objects.bulk_create(temp_data, batch_size=500)
             self.stdout.write(
                 self.style.SUCCESS(f"Imported {len(temp_data)} rows successfully.")
             )
+            snapshot.refresh()
         else:
             self.stdout.write(self.style.WARNING("No data rows imported."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from ... import snapshot
+from ... import spatial
+from ...models import ParityData
+from prospector import metrics
+
+
+class Command(BaseCommand):
+    help = "Set the geohash and measure and eligibility flags of every Parity row"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    @metrics.IMPORT_DURATION.time(command="index_parity")
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = 0
+        indexed = 0
+        while True:
+            batch = list(
+                ParityData.objects.filter(id__gt=last_id).order_by("id")[:batch_size]
+            )
+            if not batch:
+                break
+            ParityData.objects.bulk_update(
+                spatial.index(batch), ["geohash", "flags"], batch_size=500
+            )
+            indexed += len(batch)
+            last_id = batch[-1].id
+        snapshot.refresh()
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} rows."))
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from ... import snapshot
+from prospector import metrics
+
+
+class Command(BaseCommand):
+    help = "Write a columnar snapshot of the Parity data for reports to read"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=settings.PARITY_SNAPSHOT_DIR,
+            help="Directory to keep snapshots in (default PARITY_SNAPSHOT_DIR)",
+        )
+
+    @metrics.IMPORT_DURATION.time(command="parity_snapshot")
+    def handle(self, *args, **options):
+        if not options["dir"]:
+            raise CommandError("Set PARITY_SNAPSHOT_DIR or give --dir")
+        path = snapshot.write(options["dir"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(snapshot.load(options['dir']))} rows to {path}."
+            )
+        )
@@ -3,7 +3,10 @@ import csv
 from django.core.management.base import BaseCommand
 from django.core.management.base import CommandError
 
+from ... import snapshot
+from ... import stock
 from ...models import ParityData
+from prospector import metrics
 
 
 class Command(BaseCommand):
@@ -14,6 +17,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--file", type=str)
 
+    @metrics.IMPORT_DURATION.time(command="tax_band")
     def handle(self, *args, **options):
         temp_data = []
 
@@ -26,10 +30,15 @@ class Command(BaseCommand):
                         item = ParityData.objects.filter(uprn=row[3]).first()
                         if item:
                             item.tax_band = row[2]
+                            # Some eligibility depends on the tax band
+                            item.flags = stock.flags(item)
                             temp_data.append(item)
 
             except Exception:
                 raise CommandError("Operation aborted due to data error.")
 
         if len(temp_data) > 0:
-            ParityData.objects.bulk_update(temp_data, ["tax_band"], batch_size=500)
+            ParityData.objects.bulk_update(
+                temp_data, ["tax_band", "flags"], batch_size=500
+            )
+            snapshot.refresh()
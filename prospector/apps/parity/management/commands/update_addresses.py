@@ -1,41 +1,47 @@
 from django.core.management.base import BaseCommand
-from django.core.management.base import CommandError
 
+from ... import addresses
 from ...models import ParityData
+from prospector import metrics
 
 
 class Command(BaseCommand):
-    help = "Update address lines to match the CRM needs"
+    help = (
+        "Update address lines and postcodes to match the CRM needs, for Parity "
+        "data imported before data_upload did it"
+    )
 
-    def handle(self, *args, **options):
-        temp_data = []
-        objects = ParityData.objects.all()
-
-        for object in objects:
-            try:
-                address_titled = object.address_1.title()
-
-                if "," in address_titled:
-                    two_address_lines_list = address_titled.split(",")
-                    object.address_1 = two_address_lines_list[0].strip()
-                    object.address_2 = two_address_lines_list[1].strip()
-                else:
-                    object.address_1 = address_titled.strip()
-
-                    if object.address_2 == "PLYMOUTH":
-                        object.address_2 = ""
-                    elif ", PLYMOUTH" in object.address_2:
-                        new_address_2 = object.address_2.replace(", PLYMOUTH", "")
-                        object.address_2 = new_address_2.strip().title()
-                    else:
-                        object.address_2 = object.address_2.strip().title()
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
 
-                temp_data.append(object)
-
-            except Exception:
-                raise CommandError("Internal error while reformatting addresses")
-
-        if len(temp_data) > 0:
+    @metrics.IMPORT_DURATION.time(command="update_addresses")
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        rows = (
+            ParityData.objects.only("id", "address_1", "address_2", "postcode")
+            .order_by("id")
+            .iterator(chunk_size=batch_size)
+        )
+        changed = []
+        checked = updated = 0
+        for parity in rows:
+            checked += 1
+            if addresses.normalise(parity):
+                changed.append(parity)
+            if len(changed) >= batch_size:
+                updated += self.save(changed)
+        updated += self.save(changed)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {updated} of {checked} addresses.")
+        )
+
+    @staticmethod
+    def save(changed: list) -> int:
+        count = len(changed)
+        if changed:
             ParityData.objects.bulk_update(
-                temp_data, ["address_1", "address_2"], batch_size=500
+                changed, ["address_1", "address_2", "postcode"], batch_size=500
             )
+            changed.clear()
+        return count
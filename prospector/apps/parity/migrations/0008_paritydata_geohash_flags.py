@@ -0,0 +1,22 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parity", "0007_paritydata_income_decile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="paritydata",
+            name="geohash",
+            field=models.CharField(blank=True, db_index=True, default="", max_length=9),
+        ),
+        migrations.AddField(
+            model_name="paritydata",
+            name="flags",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,383 @@
+"""Store the Parity fabric columns as EnumCodeField codes, and numbers as numbers.
+
+The codes are the positions of the values in these codebooks, frozen as they were
+when the columns were converted, after 0 for the blank value.  Existing rows are
+converted in place; any value the questionnaire doesn't know stops the migration,
+as it couldn't be stored, so fix it or re-import the data.
+"""
+
+from django.db import migrations
+from django.db import models
+
+import prospector.apps.parity.fields
+import prospector.apps.questionnaire.enums
+
+# Column -> (old max_length, codebook)
+CODEBOOKS = {
+    "sap_band": (1, ["A", "B", "C", "D", "E", "F", "G"]),
+    "lodged_epc_band": (1, ["A", "B", "C", "D", "E", "F", "G"]),
+    "type": (128, ["Flat", "House", "Bungalow", "ParkHome", "Maisonette"]),
+    "attachment": (
+        128,
+        [
+            "Detached",
+            "SemiDetached",
+            "MidTerrace",
+            "EndTerrace",
+            "EnclosedEndTerrace",
+            "EnclosedMidTerrace",
+        ],
+    ),
+    "construction_years": (
+        12,
+        [
+            "Before 1900",
+            "1900-1929",
+            "1930-1949",
+            "1950-1966",
+            "1967-1975",
+            "1976-1982",
+            "1983-1990",
+            "1991-1995",
+            "1996-2002",
+            "2003-2006",
+            "2007-2011",
+            "2012 onwards",
+        ],
+    ),
+    "wall_construction": (
+        128,
+        [
+            "Cavity",
+            "Cob",
+            "Granite",
+            "Park Home",
+            "Sandstone",
+            "Solid Brick",
+            "System",
+            "Timber Frame",
+        ],
+    ),
+    "wall_insulation": (
+        128,
+        [
+            "AsBuilt",
+            "External",
+            "FilledCavity",
+            "FilledCavityPlusExternal",
+            "FilledCavityPlusInternal",
+            "Internal",
+        ],
+    ),
+    "floor_construction": (
+        128,
+        ["Solid", "SuspendedNotTimber", "SuspendedTimber", "Unknown"],
+    ),
+    "floor_insulation": (128, ["AsBuilt", "RetroFitted", "Unknown"]),
+    "roof_construction": (
+        128,
+        [
+            "AnotherDwellingAbove",
+            "Flat",
+            "PitchedNormalLoftAccess",
+            "PitchedNormalNoLoftAccess",
+            "PitchedThatched",
+            "PitchedWithSlopingCeiling",
+        ],
+    ),
+    "roof_insulation": (
+        128,
+        [
+            "Another Dwelling Above",
+            "AsBuilt",
+            "mm100",
+            "mm12",
+            "mm150",
+            "mm200",
+            "mm25",
+            "mm250",
+            "mm270",
+            "mm300",
+            "mm350",
+            "mm400",
+            "mm50",
+            "mm75",
+            "None",
+            "Unknown",
+        ],
+    ),
+    "glazing": (
+        128,
+        [
+            "Double 2002 or later",
+            "Double before 2002",
+            "Double but age unknown",
+            "NotDefined",
+            "Secondary",
+            "Single",
+            "Triple",
+        ],
+    ),
+    "heating": (
+        128,
+        [
+            "Boilers",
+            "Community",
+            "Electric underfloor",
+            "Heat pumps (warm air)",
+            "Heat pumps (wet)",
+            "Other systems",
+            "Room heaters",
+            "Storage heaters",
+            "Warm Air (not heat pump)",
+        ],
+    ),
+    "boiler_efficiency": (1, ["A", "B", "C", "D", "E", "F", "G"]),
+    "main_fuel": (
+        128,
+        [
+            "Anthracite",
+            "BulkWoodPellets",
+            "DualFuelMineralWood",
+            "ElectricityCommunity",
+            "ElectricityNotCommunity",
+            "GasBottledLPG",
+            "HouseCoalNotCommunity",
+            "LPGCommunity",
+            "LPGNotCommunity",
+            "LPGSpecialCondition",
+            "MainsGasCommunity",
+            "MainsGasNotCommunity",
+            "OilCommunity",
+            "OilNotCommunity",
+            "SmokelessCoal",
+            "WoodChips",
+            "WoodLogs",
+        ],
+    ),
+    "controls_adequacy": (128, ["Optimal", "Sub Optimal", "Top Spec"]),
+    "tax_band": (1, ["A", "B", "C", "D", "E", "F", "G", "H"]),
+}
+
+
+def _quote(value):
+    return "'%s'" % value.replace("'", "''")
+
+
+def forwards(apps, schema_editor):
+    table = schema_editor.quote_name("parity_paritydata")
+    with schema_editor.connection.cursor() as cursor:
+        for column, (_, codebook) in CODEBOOKS.items():
+            name = schema_editor.quote_name(column)
+            cursor.execute(f"SELECT DISTINCT {name} FROM {table}")
+            known = {"", *codebook}
+            unknown = sorted(
+                v for (v,) in cursor.fetchall() if v is not None and v not in known
+            )
+            if unknown:
+                raise ValueError(f"Unknown {column} values: {unknown}")
+
+    for column, (_, codebook) in CODEBOOKS.items():
+        name = schema_editor.quote_name(column)
+        cases = " ".join(
+            f"WHEN {_quote(value)} THEN {code}"
+            for code, value in enumerate(["", *codebook])
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {name} TYPE smallint "
+            f"USING (CASE {name} {cases} END)"
+        )
+    schema_editor.execute(
+        f"ALTER TABLE {table} "
+        "ALTER COLUMN sap_score TYPE double precision, "
+        "ALTER COLUMN lodged_epc_score TYPE smallint, "
+        "ALTER COLUMN heated_rooms TYPE smallint, "
+        "ALTER COLUMN realistic_fuel_bill DROP NOT NULL, "
+        "ALTER COLUMN realistic_fuel_bill TYPE integer USING round(NULLIF("
+        "regexp_replace(realistic_fuel_bill, '[^0-9.]', '', 'g'), '')::numeric)"
+    )
+
+
+def backwards(apps, schema_editor):
+    table = schema_editor.quote_name("parity_paritydata")
+    for column, (max_length, codebook) in CODEBOOKS.items():
+        name = schema_editor.quote_name(column)
+        cases = " ".join(
+            f"WHEN {code} THEN {_quote(value)}"
+            for code, value in enumerate(["", *codebook])
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {name} TYPE varchar({max_length}) "
+            f"USING (CASE {name} {cases} END)"
+        )
+    schema_editor.execute(
+        f"ALTER TABLE {table} "
+        "ALTER COLUMN sap_score TYPE numeric(5, 2), "
+        "ALTER COLUMN lodged_epc_score TYPE integer, "
+        "ALTER COLUMN heated_rooms TYPE integer, "
+        "ALTER COLUMN realistic_fuel_bill TYPE varchar(8) "
+        "USING coalesce(realistic_fuel_bill::text, ''), "
+        "ALTER COLUMN realistic_fuel_bill SET NOT NULL"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parity", "0008_paritydata_geohash_flags"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(forwards, backwards)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="sap_band",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.EfficiencyBand
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="lodged_epc_band",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.EfficiencyBand,
+                        blank=True,
+                        null=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="type",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.PropertyType
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="attachment",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.PropertyAttachment
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="construction_years",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.PropertyConstructionYears
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="wall_construction",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.WallConstruction
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="wall_insulation",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.WallInsulation
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="floor_construction",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.FloorConstruction,
+                        blank=True,
+                        null=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="floor_insulation",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.FloorInsulation,
+                        blank=True,
+                        null=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="roof_construction",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.RoofConstruction
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="roof_insulation",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.RoofInsulation
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="glazing",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.Glazing
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="heating",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.Heating
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="boiler_efficiency",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.EfficiencyBand
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="main_fuel",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.MainFuel
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="controls_adequacy",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.ControlsAdequacy
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="tax_band",
+                    field=prospector.apps.parity.fields.EnumCodeField(
+                        enum=prospector.apps.questionnaire.enums.CouncilTaxBand,
+                        blank=True,
+                        null=True,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="sap_score",
+                    field=models.FloatField(),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="lodged_epc_score",
+                    field=models.SmallIntegerField(blank=True, null=True),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="heated_rooms",
+                    field=models.SmallIntegerField(),
+                ),
+                migrations.AlterField(
+                    model_name="paritydata",
+                    name="realistic_fuel_bill",
+                    field=models.IntegerField(blank=True, null=True),
+                ),
+            ],
+        ),
+    ]
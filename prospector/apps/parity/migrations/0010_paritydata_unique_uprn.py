@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db import models
+
+
+def drop_duplicate_uprns(apps, schema_editor):
+    """Keep only the last imported row for each UPRN, as data_upload now does."""
+    ParityData = apps.get_model("parity", "ParityData")
+    ParityData.objects.filter(uprn="").update(uprn=None)
+    duplicates = (
+        ParityData.objects.filter(uprn__isnull=False)
+        .values("uprn")
+        .annotate(last=models.Max("id"), count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        ParityData.objects.filter(
+            uprn=duplicate["uprn"], id__lt=duplicate["last"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parity", "0009_compact_schema"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_uprns, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="paritydata",
+            name="uprn",
+            field=models.CharField(blank=True, max_length=120, null=True, unique=True),
+        ),
+    ]
@@ -1,7 +1,12 @@
 from django.db import models
 
+from .fields import EnumCodeField
+from prospector.apps.questionnaire import enums
+
 
 class ParityData(models.Model):
+    # The fabric columns take the values of the matching Answers fields, which
+    # are kept as small integer codes; see EnumCodeField
     org_ref = models.CharField(max_length=120)
     address_link = models.CharField(max_length=80)
     googlemaps = models.CharField(max_length=120)
@@ -9,33 +14,36 @@ class ParityData(models.Model):
     address_2 = models.CharField(max_length=120)
     address_3 = models.CharField(max_length=120, blank=True, null=True)
     postcode = models.CharField(max_length=8)
-    sap_score = models.DecimalField(max_digits=5, decimal_places=2)
-    sap_band = models.CharField(max_length=1)
-    lodged_epc_score = models.IntegerField(blank=True, null=True)
-    lodged_epc_band = models.CharField(max_length=1, blank=True, null=True)
+    sap_score = models.FloatField()
+    sap_band = EnumCodeField(enum=enums.EfficiencyBand)
+    lodged_epc_score = models.SmallIntegerField(blank=True, null=True)
+    lodged_epc_band = EnumCodeField(enum=enums.EfficiencyBand, blank=True, null=True)
     tco2_current = models.DecimalField(max_digits=5, decimal_places=1)
-    realistic_fuel_bill = models.CharField(max_length=8)
-    type = models.CharField(max_length=128)
-    attachment = models.CharField(max_length=128)
-    construction_years = models.CharField(max_length=12)
-    heated_rooms = models.IntegerField()
-    wall_construction = models.CharField(max_length=128)
-    wall_insulation = models.CharField(max_length=128)
-    floor_construction = models.CharField(max_length=128, blank=True, null=True)
-    floor_insulation = models.CharField(max_length=128, blank=True, null=True)
-    roof_construction = models.CharField(max_length=128)
-    roof_insulation = models.CharField(max_length=128)
-    glazing = models.CharField(max_length=128)
-    heating = models.CharField(max_length=128)
-    boiler_efficiency = models.CharField(max_length=1)
-    main_fuel = models.CharField(max_length=128)
-    controls_adequacy = models.CharField(max_length=128)
+    # Pounds a year
+    realistic_fuel_bill = models.IntegerField(blank=True, null=True)
+    type = EnumCodeField(enum=enums.PropertyType)
+    attachment = EnumCodeField(enum=enums.PropertyAttachment)
+    construction_years = EnumCodeField(enum=enums.PropertyConstructionYears)
+    heated_rooms = models.SmallIntegerField()
+    wall_construction = EnumCodeField(enum=enums.WallConstruction)
+    wall_insulation = EnumCodeField(enum=enums.WallInsulation)
+    floor_construction = EnumCodeField(
+        enum=enums.FloorConstruction, blank=True, null=True
+    )
+    floor_insulation = EnumCodeField(enum=enums.FloorInsulation, blank=True, null=True)
+    roof_construction = EnumCodeField(enum=enums.RoofConstruction)
+    roof_insulation = EnumCodeField(enum=enums.RoofInsulation)
+    glazing = EnumCodeField(enum=enums.Glazing)
+    heating = EnumCodeField(enum=enums.Heating)
+    boiler_efficiency = EnumCodeField(enum=enums.EfficiencyBand)
+    main_fuel = EnumCodeField(enum=enums.MainFuel)
+    controls_adequacy = EnumCodeField(enum=enums.ControlsAdequacy)
     local_authority = models.CharField(max_length=128)
     ward = models.CharField(max_length=128)
     parliamentary_constituency = models.CharField(max_length=128)
     region_name = models.CharField(max_length=128)
     tenure = models.CharField(max_length=128)
-    uprn = models.CharField(max_length=120, blank=True, null=True)
+    uprn = models.CharField(max_length=120, blank=True, null=True, unique=True)
     lat_coordinate = models.DecimalField(
         max_digits=10, decimal_places=8, blank=True, null=True
     )
@@ -45,8 +53,12 @@ class ParityData(models.Model):
     lower_super_output_area_code = models.CharField(max_length=50)
     multiple_deprivation_index = models.SmallIntegerField()
     income_decile = models.SmallIntegerField()
-    tax_band = models.CharField(max_length=1, blank=True, null=True)
+    tax_band = EnumCodeField(enum=enums.CouncilTaxBand, blank=True, null=True)
     total_floor_area = models.SmallIntegerField()
+    # Set by spatial.index: the geohash of the coordinates, for area searches,
+    # and the stock.FLAGS the home counts towards
+    geohash = models.CharField(max_length=9, blank=True, default="", db_index=True)
+    flags = models.IntegerField(default=0)
 
     class Meta:
         verbose_name_plural = "Parity data"
@@ -0,0 +1,203 @@
+"""A read-only, columnar copy of the Parity data for analytics.
+
+Reports over the whole housing stock don't need Django model instances, or the
+database: ``write`` saves each column as a NumPy array in its own ``.npy`` file,
+with text columns such as the fabric enums dictionary-encoded as integer codes
+into a list of their values.  ``load`` maps the files into memory rather than
+reading them, so it's instant, and processes reading the same snapshot share
+its pages.
+
+Each write goes to a new directory and then ``current`` is pointed at it, so
+readers never see a half-written snapshot.
+"""
+
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+
+from .models import ParityData
+
+logger = logging.getLogger(__name__)
+
+# Number columns and their dtypes; missing values of nullable ones are NaN
+NUMBERS = {
+    "id": np.int64,
+    "sap_score": np.float32,
+    "lodged_epc_score": np.float32,
+    "tco2_current": np.float32,
+    "heated_rooms": np.int16,
+    "lat_coordinate": np.float64,
+    "long_coordinate": np.float64,
+    "multiple_deprivation_index": np.int8,
+    "income_decile": np.int8,
+    "total_floor_area": np.int16,
+    "flags": np.int32,
+}
+# Text columns with few distinct values, kept as codes into their values
+CATEGORIES = [
+    "postcode",
+    "sap_band",
+    "lodged_epc_band",
+    "type",
+    "attachment",
+    "construction_years",
+    "wall_construction",
+    "wall_insulation",
+    "floor_construction",
+    "floor_insulation",
+    "roof_construction",
+    "roof_insulation",
+    "glazing",
+    "heating",
+    "boiler_efficiency",
+    "main_fuel",
+    "controls_adequacy",
+    "local_authority",
+    "ward",
+    "parliamentary_constituency",
+    "region_name",
+    "tenure",
+    "lower_super_output_area_code",
+    "tax_band",
+]
+# Text columns with a value per home
+TEXT = ["uprn"]
+COLUMNS = [*NUMBERS, *CATEGORIES, *TEXT]
+
+# Snapshots kept besides the current one, for readers that still have them open
+KEEP = 1
+
+
+class Snapshot:
+    """An open snapshot; columns are read-only arrays mapped from its files."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / "manifest.json") as f:
+            manifest = json.load(f)
+        self.rows: int = manifest["rows"]
+        self.created: float = manifest["created"]
+        self.categories: Dict[str, list] = manifest["categories"]
+        # Mapped up front, which costs nothing, so the snapshot stays readable
+        # after a newer one replaces it and its files are removed
+        self.columns = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r") for name in COLUMNS
+        }
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """The column ``name``; for CATEGORIES, the codes into ``categories[name]``."""
+        return self.columns[name]
+
+    def code(self, name: str, value) -> int:
+        """The code of ``value`` in category ``name``, or -1 if no home has it."""
+        try:
+            return self.categories[name].index(value)
+        except ValueError:
+            return -1
+
+    def isin(self, name: str, values) -> np.ndarray:
+        """Which homes have one of ``values`` in category ``name``."""
+        codes = [self.code(name, value) for value in values]
+        return np.isin(self[name], [code for code in codes if code >= 0])
+
+    def decode(self, name: str) -> np.ndarray:
+        """Category ``name`` as its values."""
+        return np.asarray(self.categories[name], dtype=object)[self[name]]
+
+
+def _code_dtype(count: int):
+    return np.uint16 if count <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+def write(directory: str, batch_size: int = 5000) -> Path:
+    """Snapshot every ParityData row into ``directory``, as its current snapshot."""
+    root = Path(directory)
+    path = root / time.strftime("%Y%m%d-%H%M%S")
+    while path.exists():
+        path = path.with_name(path.name + "_")
+    path.mkdir(parents=True)
+
+    values: Dict[str, list] = {name: [] for name in COLUMNS}
+    codes: Dict[str, dict] = {name: {} for name in CATEGORIES}
+    rows = ParityData.objects.order_by("id").values_list(*COLUMNS)
+    for row in rows.iterator(chunk_size=batch_size):
+        for name, value in zip(COLUMNS, row):
+            if name in codes:
+                value = codes[name].setdefault(value, len(codes[name]))
+            values[name].append(value)
+
+    count = len(values["id"])
+    for name, dtype in NUMBERS.items():
+        column = values.pop(name)
+        if np.issubdtype(dtype, np.floating):
+            column = [np.nan if value is None else float(value) for value in column]
+        np.save(path / f"{name}.npy", np.asarray(column, dtype=dtype))
+    for name in CATEGORIES:
+        column = values.pop(name)
+        np.save(
+            path / f"{name}.npy",
+            np.asarray(column, dtype=_code_dtype(len(codes[name]))),
+        )
+    for name in TEXT:
+        column = [value or "" for value in values.pop(name)]
+        np.save(path / f"{name}.npy", np.asarray(column, dtype=np.str_))
+
+    manifest = {
+        "rows": count,
+        "created": time.time(),
+        "categories": {name: list(codes[name]) for name in CATEGORIES},
+    }
+    with open(path / "manifest.json", "w") as f:
+        json.dump(manifest, f)
+
+    # Swap ``current`` over in one step
+    link = root / f"current.{os.getpid()}"
+    link.unlink(missing_ok=True)
+    link.symlink_to(path.name)
+    os.replace(link, root / "current")
+
+    old = sorted(
+        p
+        for p in root.iterdir()
+        if not p.is_symlink() and (p / "manifest.json").exists()
+    )
+    for stale in old[: -(KEEP + 1)]:
+        shutil.rmtree(stale)
+    return path
+
+
+def refresh() -> Optional[Path]:
+    """
+    Rewrite the snapshot in PARITY_SNAPSHOT_DIR, if snapshots are on.
+
+    The import has already been saved by the time this runs, so a snapshot that
+    can't be written is logged, and the old one kept, rather than failing it.
+    """
+    if settings.PARITY_SNAPSHOT_DIR:
+        try:
+            return write(settings.PARITY_SNAPSHOT_DIR)
+        except OSError:
+            logger.warning(
+                "Could not write the Parity snapshot to %s",
+                settings.PARITY_SNAPSHOT_DIR,
+                exc_info=True,
+            )
+
+
+def load(directory: Optional[str] = None) -> Snapshot:
+    """The current snapshot in ``directory``, PARITY_SNAPSHOT_DIR by default."""
+    path = Path(directory or settings.PARITY_SNAPSHOT_DIR) / "current"
+    if not path.exists():
+        raise FileNotFoundError(f"No Parity snapshot in {path.parent}")
+    return Snapshot(path.resolve())
@@ -0,0 +1,96 @@
+"""Find Parity homes by area, without PostGIS.
+
+Each home's coordinates are kept as a geohash in an indexed column, so an area
+is searched by looking up the few geohash prefixes covering it, then checking
+each candidate's exact distance or position here.  Homes can also be filtered on
+their ``stock.FLAGS``, e.g. only those where cavity wall insulation is
+recommended, which are stored as a bitmask alongside.
+"""
+
+from functools import reduce
+from operator import or_
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import QuerySet
+
+from . import stock
+from .models import ParityData
+from prospector.apps.questionnaire.models import Answers
+from prospector.dataformats import geohash
+
+# Most homes a search returns
+MAX_RESULTS = 5000
+
+
+def index(rows: Iterable[ParityData]) -> List[ParityData]:
+    """Set the geohash and flags of each of ``rows``; they aren't saved."""
+    answers = Answers()
+    rows = list(rows)
+    for parity in rows:
+        if parity.lat_coordinate is not None and parity.long_coordinate is not None:
+            parity.geohash = geohash.encode(
+                float(parity.lat_coordinate), float(parity.long_coordinate)
+            )
+        else:
+            parity.geohash = ""
+        parity.flags = stock.flags(parity, answers)
+    return rows
+
+
+def flag_mask(flags: Iterable[str]) -> int:
+    unknown = set(flags) - set(stock.FLAGS)
+    if unknown:
+        raise ValueError("Unknown flags: %s" % ", ".join(sorted(unknown)))
+    return sum(stock.FLAGS[name] for name in set(flags))
+
+
+def candidates(box: geohash.Box, flags: Iterable[str] = ()) -> QuerySet:
+    """Homes in ``box`` with all of ``flags``."""
+    south, west, north, east = box
+    cells = geohash.cover(box)
+    rows = ParityData.objects.filter(
+        reduce(or_, (Q(geohash__startswith=cell) for cell in cells)),
+        lat_coordinate__range=(south, north),
+        long_coordinate__range=(west, east),
+    )
+    mask = flag_mask(flags)
+    if mask:
+        rows = rows.alias(masked=F("flags").bitand(mask)).filter(masked=mask)
+    return rows
+
+
+def _position(parity: ParityData) -> Tuple[float, float]:
+    return float(parity.lat_coordinate), float(parity.long_coordinate)
+
+
+def near(
+    lat: float, lon: float, metres: float, flags: Iterable[str] = ()
+) -> List[Tuple[ParityData, float]]:
+    """Homes within ``metres`` of (lat, lon), nearest first, with their distance."""
+    found = []
+    for parity in candidates(geohash.radius_box(lat, lon, metres), flags):
+        distance = geohash.distance(lat, lon, *_position(parity))
+        if distance <= metres:
+            found.append((parity, distance))
+    found.sort(key=lambda found: found[1])
+    return found[:MAX_RESULTS]
+
+
+def in_box(box: geohash.Box, flags: Iterable[str] = ()) -> List[ParityData]:
+    return list(candidates(box, flags).order_by("id")[:MAX_RESULTS])
+
+
+def in_polygon(
+    polygon: List[Tuple[float, float]], flags: Iterable[str] = ()
+) -> List[ParityData]:
+    """Homes inside ``polygon``, a list of (lat, lon) corners."""
+    found = [
+        parity
+        for parity in candidates(geohash.polygon_box(polygon), flags).order_by("id")
+        if geohash.in_polygon(*_position(parity), polygon)
+    ]
+    return found[:MAX_RESULTS]
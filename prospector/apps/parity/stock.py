@@ -0,0 +1,273 @@
+"""Counts of homes, measures and eligibility across the Parity housing stock.
+
+Each home is evaluated with the questionnaire's own rules, on an unsaved
+``Answers`` filled from its Parity row as ``prepopulate_from_parity`` would.
+Only the rules that depend on the property alone are counted; anything needing
+the household's income or benefits can't be known from the stock data.  The
+table is split into id ranges that are counted in parallel by a process pool and
+merged, or counted from a ``snapshot`` without touching the database.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+import django
+import numpy as np
+from django.db import connections
+from django.db.models import Case
+from django.db.models import Count
+from django.db.models import Max
+from django.db.models import Min
+from django.db.models import Value
+from django.db.models import When
+
+from . import snapshot
+from .models import ParityData
+from prospector.apps.questionnaire import enums
+from prospector.apps.questionnaire import models
+from prospector.apps.questionnaire import utils
+
+# Report column -> ParityData field that homes can be grouped by
+DIMENSIONS = {
+    "local_authority": "local_authority",
+    "ward": "ward",
+    "lsoa": "lower_super_output_area_code",
+    "constituency": "parliamentary_constituency",
+    "tenure": "tenure",
+    "sap_band": "sap_band",
+    "property_type": "type",
+    "wall_construction": "wall_construction",
+    "main_fuel": "main_fuel",
+}
+
+
+def _tenure_key(value: str) -> str:
+    return re.sub("[^a-z]", "", (value or "").lower())
+
+
+# Parity's tenures ("Owner-occupied", "Rented (private)", ...) as Answers'
+PARITY_TENURES = {_tenure_key(choice.value): choice for choice in enums.Tenure}
+
+
+def _measure(name: str):
+    return lambda answers: getattr(answers, name)
+
+
+# Report column -> whether it counts a home, for each measure and each
+# eligibility rule that depends only on the property
+MEASURES = {
+    measure.value.lower(): _measure(recommended)
+    for recommended, measure in utils.MEASURE_RECOMMENDATIONS
+}
+ELIGIBILITY = {
+    "epc_d_to_g": lambda a: a.is_property_in_lower_band,
+    "off_mains_gas": lambda a: a.is_property_not_heated_by_mains_gas,
+    "bus": lambda a: a.is_bus_eligible,
+    "gbis_route_1": lambda a: a.is_gbis_eligible_route_1,
+    "connected_for_warmth": lambda a: a.is_connected_for_warmth_eligible,
+    # WHLG homes that qualify by area alone (postcode or IMD decile 1-2)
+    "whlg_by_area": lambda a: bool(
+        a.sap_band in models.SAP_BANDS
+        and a.tenure in [enums.Tenure.RENTED_PRIVATE, enums.Tenure.OWNER_OCCUPIED]
+        and (
+            a.is_property_among_whlg_eligible_postcodes
+            or a.multiple_deprivation_index in [1, 2]
+        )
+    ),
+}
+COUNTS = {**MEASURES, **ELIGIBILITY}
+# Each of COUNTS as a bit of ParityData.flags.  Stored flags depend on this
+# order, so new counts must be added at the end and the rows re-indexed.
+FLAGS = {name: 1 << i for i, name in enumerate(COUNTS)}
+# Postcodes only matter to the rules as members of WHLG_ELIGIBLE_POSTCODES or
+# not, so any member stands in for all of them
+WHLG_POSTCODE = min(models.WHLG_ELIGIBLE_POSTCODES, default="")
+
+
+# The ParityData fields the counted rules read, by the Answers field
+# ``services.copy_from_parity`` copies them to
+RULE_INPUTS = {
+    "property_type": "type",
+    "property_attachment": "attachment",
+    "property_construction_years": "construction_years",
+    "wall_construction": "wall_construction",
+    "walls_insulation": "wall_insulation",
+    "roof_construction": "roof_construction",
+    "roof_insulation": "roof_insulation",
+    "floor_construction": "floor_construction",
+    "floor_insulation": "floor_insulation",
+    "heating": "heating",
+    "main_fuel": "main_fuel",
+    "sap_band": "sap_band",
+    "lodged_epc_band": "lodged_epc_band",
+    "boiler_efficiency": "boiler_efficiency",
+    "council_tax_band": "tax_band",
+    "multiple_deprivation_index": "multiple_deprivation_index",
+}
+
+
+def evaluate(answers: models.Answers, inputs: dict, whlg_postcode: bool) -> List[int]:
+    """Which of COUNTS a home with these RULE_INPUTS and Parity tenure counts towards."""
+    for answers_field, parity_field in RULE_INPUTS.items():
+        setattr(answers, answers_field, inputs[parity_field])
+    answers.tenure = PARITY_TENURES.get(_tenure_key(inputs["tenure"]))
+    answers.property_postcode = WHLG_POSTCODE if whlg_postcode else ""
+    return [int(bool(count(answers))) for count in COUNTS.values()]
+
+
+def flags(parity: ParityData, answers: models.Answers = None) -> int:
+    """The FLAGS of the home in ``parity``, as a bitmask."""
+    inputs = {
+        field: getattr(parity, field) for field in (*RULE_INPUTS.values(), "tenure")
+    }
+    whlg_postcode = parity.postcode in models.WHLG_ELIGIBLE_POSTCODES
+    counted = evaluate(answers or models.Answers(), inputs, whlg_postcode)
+    return sum(bit for bit, count in zip(FLAGS.values(), counted) if count)
+
+
+def flag_names(mask: int) -> List[str]:
+    return [name for name, bit in FLAGS.items() if mask & bit]
+
+
+def count_range(id_range: Tuple[int, int], group_by: List[str]) -> Dict[tuple, list]:
+    """Homes and COUNTS per group, for the rows with ids in [start, stop).
+
+    Homes with the same rule inputs count the same, so the database groups the
+    rows by group and inputs and each distinct set of inputs is evaluated once.
+    """
+    start, stop = id_range
+    group_fields = [DIMENSIONS[name] for name in group_by]
+    input_fields = sorted({*RULE_INPUTS.values(), "tenure"})
+    if models.WHLG_ELIGIBLE_POSTCODES:
+        whlg_postcodes = sorted(models.WHLG_ELIGIBLE_POSTCODES)
+        whlg_postcode = Case(
+            When(postcode__in=whlg_postcodes, then=Value(True)),
+            default=Value(False),
+        )
+    else:
+        whlg_postcode = Value(False)
+
+    rows = (
+        ParityData.objects.filter(id__gte=start, id__lt=stop)
+        .annotate(whlg_postcode=whlg_postcode)
+        .values(*group_fields, *input_fields, "whlg_postcode")
+        .annotate(homes=Count("id"))
+        .order_by()
+    )
+
+    answers = models.Answers()
+    evaluated = {}
+    totals = {}
+    for row in rows:
+        inputs = tuple(row[field] for field in input_fields)
+        key = (inputs, row["whlg_postcode"])
+        if key not in evaluated:
+            evaluated[key] = evaluate(answers, row, row["whlg_postcode"])
+
+        group = tuple(row[field] for field in group_fields)
+        counts = totals.setdefault(group, [0] * (len(COUNTS) + 1))
+        counts[0] += row["homes"]
+        for i, counted in enumerate(evaluated[key], start=1):
+            counts[i] += counted * row["homes"]
+    return totals
+
+
+def count_snapshot(snap: snapshot.Snapshot, group_by: List[str]) -> Dict[tuple, list]:
+    """Homes and COUNTS per group, from ``snap`` rather than the database.
+
+    The homes' stored ``flags`` say which COUNTS they count towards, so nothing
+    is evaluated: the groups and their totals are worked out with NumPy.
+    """
+    if not len(snap):
+        return {}
+    group_fields = [DIMENSIONS[name] for name in group_by]
+    if group_fields:
+        keys = np.column_stack(
+            [np.asarray(snap[field], dtype=np.int64) for field in group_fields]
+        )
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+    else:
+        groups, inverse = np.empty((1, 0), dtype=np.int64), np.zeros(len(snap), int)
+
+    flags = snap["flags"]
+    columns = [np.bincount(inverse, minlength=len(groups))]
+    for bit in FLAGS.values():
+        columns.append(
+            np.bincount(inverse, weights=(flags & bit) != 0, minlength=len(groups))
+        )
+    totals = np.column_stack(columns).astype(np.int64).tolist()
+
+    return {
+        tuple(
+            snap.categories[field][code] for field, code in zip(group_fields, group)
+        ): counts
+        for group, counts in zip(groups.tolist(), totals)
+    }
+
+
+def _count_range(args):
+    return count_range(*args)
+
+
+def _init_worker():
+    # Workers must not share the parent's database connections
+    django.setup()
+    connections.close_all()
+
+
+def id_ranges(chunk_size: int) -> Iterable[Tuple[int, int]]:
+    bounds = ParityData.objects.aggregate(first=Min("id"), last=Max("id"))
+    if bounds["first"] is None:
+        return []
+    return [
+        (start, start + chunk_size)
+        for start in range(bounds["first"], bounds["last"] + 1, chunk_size)
+    ]
+
+
+def count_ranges(group_by: List[str], workers: int, chunk_size: int) -> List[dict]:
+    jobs = [(id_range, group_by) for id_range in id_ranges(chunk_size)]
+    if workers > 1 and len(jobs) > 1:
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=_init_worker) as executor:
+            results = list(executor.map(_count_range, jobs))
+    else:
+        results = [_count_range(job) for job in jobs]
+    return results
+
+
+def report(
+    group_by: List[str],
+    workers: int = 1,
+    chunk_size: int = 20000,
+    snap: snapshot.Snapshot = None,
+) -> Tuple[List[str], List[list]]:
+    """The report's header and rows, sorted by group.
+
+    With ``snap``, the homes are counted from that snapshot instead of the
+    database.  Otherwise, with more than one worker, ranges of ``chunk_size`` ids
+    are counted in separate processes, each with its own database connection.
+    """
+    if snap is not None:
+        results = [count_snapshot(snap, group_by)]
+    else:
+        results = count_ranges(group_by, workers, chunk_size)
+
+    totals = {}
+    for result in results:
+        for group, counts in result.items():
+            merged = totals.setdefault(group, [0] * len(counts))
+            for i, count in enumerate(counts):
+                merged[i] += count
+
+    header = [*group_by, "homes", *COUNTS]
+    rows = [
+        [*group, *totals[group]]
+        for group in sorted(totals, key=lambda group: [str(g) for g in group])
+    ]
+    return header, rows
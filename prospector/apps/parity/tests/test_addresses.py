@@ -0,0 +1,73 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from prospector.apps.parity import addresses
+from prospector.apps.parity.management.commands import data_upload
+from prospector.apps.parity.management.commands import update_addresses
+from prospector.apps.parity.models import ParityData
+from prospector.testutils import synthetic
+
+
+@pytest.mark.parametrize(
+    "lines, normalised",
+    [
+        (("12 BENBOW STREET, STOKE", "PLYMOUTH"), ("12 Benbow Street", "Stoke")),
+        (("12 BENBOW STREET", "PLYMOUTH"), ("12 Benbow Street", "")),
+        (("FLAT 2", "12 ALMA ROAD, PLYMOUTH"), ("Flat 2", "12 Alma Road")),
+        (("12 Benbow Street", "Stoke"), ("12 Benbow Street", "Stoke")),
+    ],
+)
+def test_normalise(lines, normalised):
+    parity = ParityData(address_1=lines[0], address_2=lines[1], postcode="PL1 2AB")
+    assert addresses.normalise(parity) == (lines != normalised)
+    assert (parity.address_1, parity.address_2) == normalised
+    assert not addresses.normalise(parity)
+
+
+def test_normalise_postcode():
+    parity = ParityData(address_1="1 Alma Road", address_2="", postcode="pl12ab")
+    assert addresses.normalise(parity)
+    assert parity.postcode == "PL1 2AB"
+
+
+def capitalised_rows(count):
+    for row in synthetic.parity_rows(count):
+        row[3] = row[3].upper() + ", STOKE"
+        row[4] = "PLYMOUTH"
+        yield row
+
+
+@pytest.mark.django_db
+def test_command_updates_only_changed_rows():
+    parity = ParityData.objects.bulk_create(
+        data_upload.parse_row(row) for row in capitalised_rows(5)
+    )
+    ParityData.objects.filter(id=parity[0].id).update(
+        address_1="1 Benbow Street", address_2="Stoke"
+    )
+
+    stdout = io.StringIO()
+    call_command(update_addresses.Command(), batch_size=2, stdout=stdout)
+    assert "Updated 4 of 5 addresses" in stdout.getvalue()
+    assert set(ParityData.objects.values_list("address_2", flat=True)) == {"Stoke"}
+
+    stdout = io.StringIO()
+    call_command(update_addresses.Command(), stdout=stdout)
+    assert "Updated 0 of 5 addresses" in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_upload_normalises_addresses(tmp_path):
+    path = tmp_path / "parity.csv"
+    with open(path, "w") as f:
+        f.write(",".join(synthetic.PARITY_COLUMNS) + "\n")
+        for row in capitalised_rows(3):
+            f.write(",".join('"%s"' % value for value in row) + "\n")
+    call_command(data_upload.Command(), file=str(path), stdout=io.StringIO())
+
+    row = next(capitalised_rows(1))
+    saved = ParityData.objects.get(uprn=row[41])
+    assert saved.address_1 == row[3].split(",")[0].title()
+    assert saved.address_2 == "Stoke"
@@ -0,0 +1,53 @@
+import importlib
+
+import pytest
+from django.db import connection
+
+from prospector.apps.parity.fields import EnumCodeField
+from prospector.apps.parity.management.commands.data_upload import parse_pounds
+from prospector.apps.parity.management.commands.data_upload import parse_row
+from prospector.apps.parity.models import ParityData
+from prospector.apps.questionnaire import enums
+from prospector.testutils import synthetic
+
+CODEBOOKS = importlib.import_module(
+    "prospector.apps.parity.migrations.0009_compact_schema"
+).CODEBOOKS
+
+
+def test_codes_are_stable():
+    # Stored codes are positions in the enums, so values may only be appended
+    for field in ParityData._meta.fields:
+        if isinstance(field, EnumCodeField):
+            _, codebook = CODEBOOKS[field.name]
+            assert field.codebook[1 : len(codebook) + 1] == codebook
+
+
+@pytest.mark.django_db
+def test_values_are_stored_as_codes():
+    parity = ParityData.objects.bulk_create(
+        parse_row(row) for row in synthetic.parity_rows(20)
+    )
+    field = ParityData._meta.get_field("wall_construction")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id, wall_construction FROM parity_paritydata")
+        stored = dict(cursor.fetchall())
+    assert {p.id: field.codes[p.wall_construction] for p in parity} == stored
+
+    cavity = [p.id for p in parity if p.wall_construction == "Cavity"]
+    query = ParityData.objects.filter(wall_construction=enums.WallConstruction.CAVITY)
+    assert sorted(query.values_list("id", flat=True)) == cavity
+    assert ParityData.objects.get(id=parity[0].id).type == parity[0].type
+
+
+def test_import_rejects_unknown_values():
+    row = synthetic.parity_row(0, 0)
+    row[25] = "Mud"
+    with pytest.raises(ValueError, match="wall_construction: unknown value 'Mud'"):
+        parse_row(row)
+
+
+def test_parse_pounds():
+    assert parse_pounds("£1,234.60") == 1235
+    assert parse_pounds("876") == 876
+    assert parse_pounds("") is None
@@ -0,0 +1,84 @@
+import io
+import math
+
+import pytest
+from django.core.management import call_command
+
+from prospector.apps.parity import snapshot
+from prospector.apps.parity import spatial
+from prospector.apps.parity import stock
+from prospector.apps.parity.management.commands import data_upload
+from prospector.apps.parity.management.commands import parity_snapshot
+from prospector.apps.parity.management.commands import stock_report
+from prospector.apps.parity.models import ParityData
+from prospector.testutils import synthetic
+
+
+@pytest.fixture
+def parity():
+    return ParityData.objects.bulk_create(
+        spatial.index(data_upload.parse_row(row) for row in synthetic.parity_rows(200))
+    )
+
+
+@pytest.mark.django_db
+def test_snapshot_has_every_row(parity, tmp_path):
+    snapshot.write(str(tmp_path))
+    snap = snapshot.load(str(tmp_path))
+    assert len(snap) == 200
+    assert list(snap["id"]) == [p.id for p in parity]
+    assert list(snap["uprn"]) == [p.uprn for p in parity]
+    assert list(snap.decode("wall_construction")) == [
+        p.wall_construction for p in parity
+    ]
+    for p, score in zip(parity, snap["lodged_epc_score"]):
+        if p.lodged_epc_score is None:
+            assert math.isnan(score)
+        else:
+            assert score == p.lodged_epc_score
+    assert snap["ward"].dtype.name == "uint16"
+    assert snap.isin("ward", [parity[0].ward, "Nowhere"]).sum() == sum(
+        p.ward == parity[0].ward for p in parity
+    )
+
+
+@pytest.mark.django_db
+def test_rewriting_swaps_the_current_snapshot(parity, tmp_path):
+    snapshot.write(str(tmp_path))
+    first = snapshot.load(str(tmp_path))
+    ParityData.objects.filter(id=parity[0].id).delete()
+    snapshot.write(str(tmp_path))
+    snapshot.write(str(tmp_path))
+
+    assert len(snapshot.load(str(tmp_path))) == 199
+    assert len([p for p in tmp_path.iterdir() if not p.is_symlink()]) == 2
+    # Readers of a removed snapshot keep the pages they have mapped
+    assert len(first["id"]) == 200
+
+
+@pytest.mark.django_db
+def test_report_from_snapshot_matches_the_database(parity, tmp_path, settings):
+    settings.PARITY_SNAPSHOT_DIR = str(tmp_path)
+    call_command(parity_snapshot.Command(), stdout=io.StringIO())
+    group_by = ["ward", "tenure", "sap_band"]
+    assert stock.report(group_by, snap=snapshot.load()) == stock.report(group_by)
+    assert stock.report([], snap=snapshot.load()) == stock.report([])
+
+    output = tmp_path / "report.csv"
+    call_command(
+        stock_report.Command(),
+        group_by="lsoa",
+        output=str(output),
+        snapshot=True,
+        stderr=io.StringIO(),
+    )
+    assert output.read_text().count("\n") == len(stock.report(["lsoa"])[1]) + 1
+
+
+@pytest.mark.django_db
+def test_failed_refresh_is_logged(parity, tmp_path, settings, caplog):
+    # A file where the directory should be, so the snapshot can't be written
+    (tmp_path / "parity").write_text("")
+    settings.PARITY_SNAPSHOT_DIR = str(tmp_path / "parity")
+    assert snapshot.refresh() is None
+    assert "Could not write the Parity snapshot" in caplog.text
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from prospector.apps.parity import spatial
+from prospector.apps.parity import stock
+from prospector.apps.parity.management.commands import index_parity
+from prospector.apps.parity.management.commands.data_upload import parse_row
+from prospector.apps.parity.models import ParityData
+from prospector.dataformats import geohash
+from prospector.testutils import synthetic
+
+URL = reverse("questionnaire:property-search")
+
+
+@pytest.fixture
+def parity():
+    return ParityData.objects.bulk_create(
+        spatial.index(parse_row(row) for row in synthetic.parity_rows(300))
+    )
+
+
+def position(p):
+    return float(p.lat_coordinate), float(p.long_coordinate)
+
+
+@pytest.mark.django_db
+def test_near_matches_every_distance(parity):
+    flagged = [p for p in parity if p.flags & stock.FLAGS["bus"]]
+    assert flagged
+
+    found = spatial.near(50.4, -4.12, 2000, ["bus"])
+    expected = sorted(
+        (geohash.distance(50.4, -4.12, *position(p)), p.uprn)
+        for p in flagged
+        if geohash.distance(50.4, -4.12, *position(p)) <= 2000
+    )
+    assert [(round(d, 3), p.uprn) for p, d in found] == [
+        (round(d, 3), uprn) for d, uprn in expected
+    ]
+
+
+@pytest.mark.django_db
+def test_in_polygon(parity):
+    triangle = [(50.35, -4.2), (50.44, -4.2), (50.35, -4.05)]
+    found = spatial.in_polygon(triangle)
+    assert {p.uprn for p in found} == {
+        p.uprn for p in parity if geohash.in_polygon(*position(p), triangle)
+    }
+
+
+@pytest.mark.django_db
+def test_index_command_backfills(parity):
+    ParityData.objects.update(geohash="", flags=0)
+    call_command(index_parity.Command(), batch_size=64, stdout=io.StringIO())
+    assert {(p.uprn, p.geohash, p.flags) for p in ParityData.objects.all()} == {
+        (p.uprn, p.geohash, p.flags) for p in parity
+    }
+
+
+@pytest.mark.django_db
+def test_api(client, parity, settings):
+    settings.PARTNER_API_KEYS = {"council": "secret"}
+    auth = {"HTTP_AUTHORIZATION": "Bearer secret"}
+    assert client.get(URL, {"near": "50.4,-4.12"}).status_code == 401
+    assert client.get(URL, {"near": "50.4"}, **auth).status_code == 400
+    assert client.get(URL, {"bbox": "1,2,3,4", "flags": "x"}, **auth).status_code == 400
+
+    response = client.get(URL, {"near": "50.4,-4.12", "radius": "1000"}, **auth)
+    assert response.status_code == 200
+    properties = response.json()["properties"]
+    assert [p["uprn"] for p in properties] == [
+        p.uprn for p, _ in spatial.near(50.4, -4.12, 1000)
+    ]
+    assert all(p["distance_m"] <= 1000 for p in properties)
@@ -1,20 +1,17 @@
 from django.contrib import admin
 from django.contrib import messages
-from django.db.models import BooleanField
-from django.db.models import Case
-from django.db.models import Count
-from django.db.models import Q
-from django.db.models import Value
-from django.db.models import When
+from django.core.paginator import Paginator
+from django.db import connections
 from django.urls import reverse
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 from django.utils.http import urlencode
 from django.utils.translation import ngettext
-from import_export.admin import ExportMixin
 
 from . import models
 from prospector.apps.crm.models import CrmResult
 from prospector.apps.crm.tasks import crm_create
+from prospector.apps.exports.admin import BackgroundExportMixin
 
 
 class CrmResultInline(admin.TabularInline):
@@ -27,21 +24,11 @@ class CrmResultFilter(admin.SimpleListFilter):
 
     def queryset(self, request, queryset):
         value = self.value()
-        if value is None:
-            return queryset
-
-        crmresult_qs = queryset.annotate(
-            crmresult_count=Count("crmresult"),
-            has_crmresult=Case(
-                When(Q(crmresult_count__gt=0), then=Value(True)),
-                default=Value(False),
-                output_field=BooleanField(),
-            ),
-        )
         if value == "submitted":
-            return crmresult_qs.filter(has_crmresult=True)
+            return queryset.exclude(crm_status="")
         elif value == "not_submitted":
-            return crmresult_qs.filter(has_crmresult=False)
+            return queryset.filter(crm_status="")
+        return queryset
 
     def lookups(self, request, model_admin):
         return (
@@ -50,35 +37,50 @@ class CrmResultFilter(admin.SimpleListFilter):
         )
 
 
+class EstimatedCountPaginator(Paginator):
+    """Counts unfiltered lists of more than ``exact_below`` rows from the
+    planner's estimate, as counting every row of a large table is slow.
+    """
+
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            table = query.model._meta.db_table
+            with connections[self.object_list.db].cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                    [table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.exact_below:
+                return row[0]
+        return super().count
+
+
 @admin.register(models.Answers)
-class QuestionnaireAdmin(ExportMixin, admin.ModelAdmin):
+class QuestionnaireAdmin(BackgroundExportMixin, admin.ModelAdmin):
     inlines = (CrmResultInline,)
-    actions = ("crm_create",)
+    actions = ("crm_create", "export_in_background")
     list_display = (
         "id",
         "full_name",
         "property_postcode",
         "updated_at",
         "completed_at",
+        "crm_status",
         "crmresults",
     )
     readonly_fields = [
         "uuid",
         "parity_object_id",
+        "parity",
     ]
     list_filter = (CrmResultFilter,)
-
-    def get_queryset(self, request):
-        return (
-            super(QuestionnaireAdmin, self)
-            .get_queryset(request)
-            .annotate(crmresult_count=Count("crmresult"))
-        )
-
-    def crmresult_count(self, obj):
-        return obj.crmresult_count
-
-    crmresult_count.short_description = "CrmResult(s)"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def crmresults(self, instance):
         info = (CrmResult._meta.app_label, CrmResult._meta.model_name)
@@ -88,7 +90,7 @@ class QuestionnaireAdmin(ExportMixin, admin.ModelAdmin):
         qs = {"answers_id__exact": instance.pk}
         return format_html(
             '<a href="{url}?{qs}">{text}</a>'.format(
-                url=url, qs=urlencode(qs), text=instance.crmresult_count
+                url=url, qs=urlencode(qs), text=instance.crm_results
             )
         )
 
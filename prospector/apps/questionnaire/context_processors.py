@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def page_cache(request):
+    """How long the templates' {% cache %} blocks keep their fragments."""
+    return {"PAGE_CACHE_TIMEOUT": settings.PAGE_CACHE_TIMEOUT}
@@ -0,0 +1,186 @@
+"""Scheme eligibility and measure recommendations for many properties at once.
+
+Each property is looked up in the Parity data by UPRN, or by its address and
+postcode, as ``services.prepopulate_from_parity`` does, and the questionnaire's
+rules are evaluated on unsaved ``Answers``.  Household details the rules need,
+such as tenure and income, can be given with each property; rules whose inputs
+are missing evaluate to None, as they do part way through the questionnaire.
+"""
+
+import json
+from collections import Counter
+from functools import reduce
+from operator import or_
+from typing import Iterable
+from typing import Iterator
+from typing import List
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+from . import metrics
+from . import models
+from . import services
+from . import utils
+from prospector.apps.parity.models import ParityData
+from prospector.dataformats import postcodes
+
+# Answers fields a property may give, for the rules that depend on the household
+HOUSEHOLD_FIELDS = [
+    "tenure",
+    "respondent_role",
+    "nmt4properties",
+    "adults",
+    "children",
+    "seniors",
+    "household_income",
+    "household_income_after_tax",
+    "housing_costs",
+    "means_tested_benefits",
+]
+ADDRESS_FIELDS = ["address_1", "address_2", "postcode"]
+
+# Answers property for each scheme reported
+SCHEMES = {
+    "bus": "is_bus_eligible",
+    "whlg": "is_whlg_eligible",
+    "eco4": "is_eco4_eligible",
+    "eco4_flex": "is_eco4_flex_eligible",
+    "gbis": "is_gbis_eligible",
+    "connected_for_warmth": "is_connected_for_warmth_eligible",
+    "any_scheme": "is_any_scheme_eligible",
+}
+
+
+class InvalidProperty(ValueError):
+    pass
+
+
+def parse(item: dict) -> models.Answers:
+    """Unsaved Answers for one requested property, before the Parity lookup."""
+    if not isinstance(item, dict):
+        raise InvalidProperty("Each property must be an object")
+    unknown = set(item) - {"id", "uprn", *ADDRESS_FIELDS, *HOUSEHOLD_FIELDS}
+    if unknown:
+        raise InvalidProperty("Unknown fields: %s" % ", ".join(sorted(unknown)))
+
+    answers = models.Answers(uprn=str(item.get("uprn") or ""))
+    if all(item.get(field) for field in ("address_1", "postcode")):
+        answers.property_address_1 = str(item["address_1"])
+        answers.property_address_2 = str(item.get("address_2") or "")
+        answers.property_postcode = postcodes.normalise(str(item["postcode"]))
+    elif not answers.uprn:
+        raise InvalidProperty("Give a uprn, or an address_1 and postcode")
+
+    for name in HOUSEHOLD_FIELDS:
+        if item.get(name) is None:
+            continue
+        try:
+            value = models.Answers._meta.get_field(name).clean(item[name], answers)
+        except ValidationError as e:
+            raise InvalidProperty("%s: %s" % (name, " ".join(e.messages)))
+        setattr(answers, name, value)
+    return answers
+
+
+def _address(answers: models.Answers) -> tuple:
+    return (
+        answers.property_address_1,
+        answers.property_address_2,
+        answers.property_postcode,
+    )
+
+
+def resolve(chunk: List[models.Answers]):
+    """Copy each Answers' Parity data onto it, in two queries for the chunk.
+
+    As with ``prepopulate_from_parity``, a UPRN match wins over an address match
+    and the first row (by id) wins where several match.
+    """
+    by_uprn = {}
+    uprns = {answers.uprn for answers in chunk if answers.uprn}
+    if uprns:
+        for parity in ParityData.objects.filter(uprn__in=uprns).order_by("-id"):
+            by_uprn[parity.uprn] = parity
+
+    by_address = {}
+    addresses = {
+        _address(answers)
+        for answers in chunk
+        if answers.uprn not in by_uprn and answers.property_address_1
+    }
+    if addresses:
+        query = reduce(
+            or_,
+            (
+                Q(address_1=address_1, address_2=address_2, postcode=postcode)
+                for address_1, address_2, postcode in addresses
+            ),
+        )
+        for parity in ParityData.objects.filter(query).order_by("-id"):
+            by_address[parity.address_1, parity.address_2, parity.postcode] = parity
+
+    for answers in chunk:
+        parity = by_uprn.get(answers.uprn) or by_address.get(_address(answers))
+        if parity is not None:
+            services.copy_from_parity(answers, parity)
+            answers.uprn = parity.uprn or answers.uprn
+
+
+def assessment(answers: models.Answers) -> dict:
+    if not answers.parity_object_id:
+        return {"matched": False}
+    return {
+        "matched": True,
+        "uprn": answers.uprn or None,
+        "sap_score": answers.sap_score,
+        "sap_band": answers.sap_band,
+        "eligibility": {
+            scheme: getattr(answers, name) for scheme, name in SCHEMES.items()
+        },
+        "whlg_routes": answers.whlg_all_eligibility_routes,
+        "measures": [measure.value for measure in utils.recommended_measures(answers)],
+    }
+
+
+def assess(items: Iterable, partner: str = "") -> Iterator[dict]:
+    """One result per item, in order, resolving BULK_ELIGIBILITY_CHUNK_SIZE at a time.
+
+    Each result has the item's ``id`` (or its position if it has none) and either
+    its ``assessment`` or an ``error``.
+    """
+    chunk_size = settings.BULK_ELIGIBILITY_CHUNK_SIZE
+    chunk = []
+
+    def flush():
+        resolve(
+            [answers for _, answers in chunk if isinstance(answers, models.Answers)]
+        )
+        outcomes = Counter()
+        for item_id, answers in chunk:
+            if isinstance(answers, InvalidProperty):
+                outcomes["invalid"] += 1
+                yield {"id": item_id, "error": str(answers)}
+                continue
+            result = assessment(answers)
+            outcomes["matched" if result["matched"] else "unmatched"] += 1
+            yield {"id": item_id, **result}
+        chunk.clear()
+        for outcome, count in outcomes.items():
+            metrics.ELIGIBILITY_ASSESSMENTS.inc(count, partner=partner, outcome=outcome)
+
+    for index, item in enumerate(items):
+        item_id = item.get("id", index) if isinstance(item, dict) else index
+        try:
+            chunk.append((item_id, parse(item)))
+        except InvalidProperty as e:
+            chunk.append((item_id, e))
+        if len(chunk) >= chunk_size:
+            yield from flush()
+    yield from flush()
+
+
+def ndjson(results: Iterable[dict]) -> Iterator[str]:
+    for result in results:
+        yield json.dumps(result) + "\n"
@@ -37,14 +37,15 @@ class Command(BaseCommand):
         else:
             answers = (Answers.objects.filter(created_at__gte=filter_from_date).order_by("created_at"))
 
-        field_names = [field.name for field in Answers._meta.get_fields() if isinstance(field, models.Field)]
+        fields = [field for field in Answers._meta.get_fields() if isinstance(field, models.Field)]
+        field_names = [field.name for field in fields]
 
         try:
             with open('answers_dump.csv', 'w', newline='') as csv_file:
                 dump_writer = csv.writer(csv_file)
                 dump_writer.writerow(field_names)
                 for answer in answers:
-                     dump_writer.writerow([getattr(answer, field_name) for field_name in field_names])
+                     dump_writer.writerow([getattr(answer, field.attname) for field in fields])
 
             print('Successfully dumped filtered answers to answers_dump.csv.')
 
@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand
 from django.core.management.base import CommandError
 
 from ...models import Answers
+from prospector import metrics
 
 
 class Command(BaseCommand):
@@ -14,6 +15,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("--file", type=str)
 
+    @metrics.IMPORT_DURATION.time(command="income_decile")
     def handle(self, *args, **options):
         temp_data = []
 
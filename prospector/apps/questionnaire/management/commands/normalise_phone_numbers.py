@@ -0,0 +1,63 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from ...models import Answers
+from prospector import metrics
+from prospector.dataformats import phone_numbers
+
+FIELDS = ["contact_phone", "contact_mobile"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalise the phone numbers of Answers saved before the questionnaire "
+        "did it, leaving those that can't be parsed as they are"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    @metrics.IMPORT_DURATION.time(command="normalise_phone_numbers")
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        rows = (
+            Answers.objects.only("id", *FIELDS)
+            .exclude(contact_phone="", contact_mobile="")
+            .order_by("id")
+            .iterator(chunk_size=batch_size)
+        )
+        checked = updated = unparsed = 0
+        while batch := list(islice(rows, batch_size)):
+            changed, failed = self.normalise(batch)
+            checked += len(batch)
+            updated += changed
+            unparsed += failed
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {updated} of {checked} answers.")
+        )
+        if unparsed:
+            self.stdout.write(
+                self.style.WARNING(f"{unparsed} phone numbers could not be parsed.")
+            )
+
+    @staticmethod
+    def normalise(batch: list):
+        """Normalise and save ``batch``; the numbers changed and not parsed."""
+        changed = set()
+        unparsed = 0
+        for field in FIELDS:
+            max_length = Answers._meta.get_field(field).max_length
+            numbers = [getattr(answers, field) for answers in batch]
+            for answers, number, normalised in zip(
+                batch, numbers, phone_numbers.normalise_all(numbers)
+            ):
+                if normalised is None or len(normalised) > max_length:
+                    unparsed += 1
+                elif normalised != number:
+                    setattr(answers, field, normalised)
+                    changed.add(answers)
+        if changed:
+            Answers.objects.bulk_update(changed, FIELDS, batch_size=500)
+        return len(changed), unparsed
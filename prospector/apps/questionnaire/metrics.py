@@ -0,0 +1,13 @@
+from prospector import metrics
+
+CLEANUP_DELETED = metrics.Counter(
+    "prospector_cleanup_deleted_total",
+    "Answers deleted by the cleanup job, by reason",
+    ["reason"],
+)
+
+ELIGIBILITY_ASSESSMENTS = metrics.Counter(
+    "prospector_eligibility_assessments_total",
+    "Properties assessed through the bulk eligibility API, by partner and outcome",
+    ["partner", "outcome"],
+)
@@ -0,0 +1,39 @@
+import django.db.models.deletion
+from django.db import migrations
+from django.db import models
+
+
+def link_parity(apps, schema_editor):
+    """Link answers prepopulated from Parity to their row's UPRN."""
+    schema_editor.execute(
+        "UPDATE questionnaire_answers a SET parity_id = p.uprn "
+        "FROM parity_paritydata p "
+        "WHERE a.parity_object_id ~ '^[0-9]+$' AND p.id = a.parity_object_id::integer"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parity", "0010_paritydata_unique_uprn"),
+        ("questionnaire", "0089_remove_answers_willing_to_contribute"),
+        ("questionnaire", "0090_remove_council_tax_and_free_school_meals"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answers",
+            name="parity",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="answers",
+                to="parity.paritydata",
+                to_field="uprn",
+            ),
+        ),
+        migrations.RunPython(link_parity, migrations.RunPython.noop),
+    ]
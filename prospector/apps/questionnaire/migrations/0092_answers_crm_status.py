@@ -0,0 +1,38 @@
+from django.db import migrations
+from django.db import models
+
+
+def count_crm_results(apps, schema_editor):
+    """Fill in each answers' number of CRM results and its latest state."""
+    schema_editor.execute(
+        "UPDATE questionnaire_answers a SET crm_results = r.count, crm_status = r.state "
+        "FROM ("
+        "  SELECT DISTINCT ON (answers_id) answers_id, state, "
+        "    count(*) OVER (PARTITION BY answers_id) AS count "
+        "  FROM crm_crmresult ORDER BY answers_id, created_at DESC, id DESC"
+        ") r WHERE a.id = r.answers_id"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("crm", "0004_crmresult_payload"),
+        ("questionnaire", "0091_answers_parity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answers",
+            name="crm_results",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="answers",
+            name="crm_status",
+            field=models.CharField(
+                blank=True, db_index=True, default="", editable=False, max_length=32
+            ),
+        ),
+        migrations.RunPython(count_crm_results, migrations.RunPython.noop),
+    ]
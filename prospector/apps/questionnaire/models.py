@@ -36,6 +36,9 @@ TENURES = [
 WHLG_ELIGIBLE_POSTCODES = get_whlg_eligible_postcodes()
 
 
+CRM_STATUS_FIELDS = ("crm_results", "crm_status")
+
+
 class Answers(models.Model):
     class Meta:
         verbose_name_plural = "answers"
@@ -59,6 +62,24 @@ class Answers(models.Model):
     parity_object_id = models.CharField(
         max_length=20, editable=False, blank=True, null=True
     )
+    # The Parity record of the property, by UPRN so that it survives the Parity
+    # data being re-imported.  Unconstrained, as the import replaces every row.
+    parity = models.ForeignKey(
+        "parity.ParityData",
+        to_field="uprn",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="answers",
+        editable=False,
+        blank=True,
+        null=True,
+    )
+    # The number of CRM results and the state of the latest, kept up to date by
+    # CrmResult so that the admin's list of answers needn't count them
+    crm_results = models.PositiveIntegerField(default=0, editable=False)
+    crm_status = models.CharField(
+        max_length=32, blank=True, default="", editable=False, db_index=True
+    )
 
     """
     # "YOUR DETAILS"
@@ -395,6 +416,13 @@ class Answers(models.Model):
             while Answers.objects.filter(short_uid=self.short_uid).exists():
                 self.short_uid = utils.generate_id()  # noqa
         self.full_clean()
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # Leave the CRM fields to CrmResult, which updates them in place
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in CRM_STATUS_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     @property
@@ -1,9 +1,10 @@
 import logging
 
+from django.db import transaction
 from django.utils import timezone
 
 from . import models
-from prospector.apps.crm.tasks import crm_create
+from prospector.apps.crm import outbox
 from prospector.apps.parity.models import ParityData
 
 logger = logging.getLogger(__name__)
@@ -21,52 +22,70 @@ def prepopulate_from_parity(answers: models.Answers) -> models.Answers:
         ).first()
 
     if parity_object:
-        """Parse Parity contents to populate initial values for property energy data."""
-        po = parity_object
-
-        answers.property_type = po.type
-        answers.property_attachment = po.attachment
-        answers.property_construction_years = po.construction_years
-        answers.wall_construction = po.wall_construction
-        answers.walls_insulation = po.wall_insulation
-        answers.roof_construction = po.roof_construction
-        answers.roof_insulation = po.roof_insulation
-        answers.floor_construction = po.floor_construction
-        answers.floor_insulation = po.floor_insulation
-        answers.heating = po.heating
-        answers.main_fuel = po.main_fuel
-        answers.sap_score = int(po.sap_score)
-        answers.sap_band = po.sap_band
-        answers.lodged_epc_score = po.lodged_epc_score
-        answers.lodged_epc_band = po.lodged_epc_band
-        answers.glazing = po.glazing
-        answers.boiler_efficiency = po.boiler_efficiency
-        answers.controls_adequacy = po.controls_adequacy
-        answers.heated_rooms = po.heated_rooms
-        answers.t_co2_current = po.tco2_current
-        answers.realistic_fuel_bill = po.realistic_fuel_bill
-        answers.multiple_deprivation_index = po.multiple_deprivation_index
-        answers.income_decile = po.income_decile
-        answers.council_tax_band = po.tax_band
-        answers.parity_object_id = str(po.id)
-        answers.total_floor_area = po.total_floor_area
-
-        return answers
-
-    else:
-        return answers
-
-
-def close_questionnaire(answers: models.Answers):
+        copy_from_parity(answers, parity_object)
+    return answers
+
+
+def copy_from_parity(answers: models.Answers, po: ParityData) -> models.Answers:
+    """Parse Parity contents to populate initial values for property energy data."""
+    answers.property_type = po.type
+    answers.property_attachment = po.attachment
+    answers.property_construction_years = po.construction_years
+    answers.wall_construction = po.wall_construction
+    answers.walls_insulation = po.wall_insulation
+    answers.roof_construction = po.roof_construction
+    answers.roof_insulation = po.roof_insulation
+    answers.floor_construction = po.floor_construction
+    answers.floor_insulation = po.floor_insulation
+    answers.heating = po.heating
+    answers.main_fuel = po.main_fuel
+    answers.sap_score = int(po.sap_score)
+    answers.sap_band = po.sap_band
+    answers.lodged_epc_score = po.lodged_epc_score
+    answers.lodged_epc_band = po.lodged_epc_band
+    answers.glazing = po.glazing
+    answers.boiler_efficiency = po.boiler_efficiency
+    answers.controls_adequacy = po.controls_adequacy
+    answers.heated_rooms = po.heated_rooms
+    answers.t_co2_current = po.tco2_current
+    answers.realistic_fuel_bill = (
+        None if po.realistic_fuel_bill is None else str(po.realistic_fuel_bill)
+    )
+    answers.multiple_deprivation_index = po.multiple_deprivation_index
+    answers.income_decile = po.income_decile
+    answers.council_tax_band = po.tax_band
+    answers.parity_object_id = str(po.id)
+    answers.parity_id = po.uprn
+    answers.total_floor_area = po.total_floor_area
+
+    return answers
+
+
+def close_questionnaire(answers: models.Answers) -> bool:
     """Set the questionnaire as completed.
 
     Prevents any part of it being edited through the questionnaire views.
+
+    Completion is a conditional UPDATE on ``completed_at IS NULL``, so however many
+    times the terminal pages are rendered only one caller wins.  That caller adds the
+    answers to the CRM outbox in the same transaction, so the submission can't be
+    lost between the two.  Returns True if this call completed the questionnaire,
+    False if it was already complete.
     """
 
-    answers.completed_at = timezone.now()
-    answers.save()
+    if answers.completed_at is not None:
+        return False
+
+    now = timezone.now()
+    with transaction.atomic():
+        completed = models.Answers.objects.filter(
+            pk=answers.pk, completed_at__isnull=True
+        ).update(completed_at=now, updated_at=now)
+
+        if not completed:
+            return False
+
+        outbox.enqueue(answers)
 
-    try:
-        crm_create.delay(str(answers.uuid))
-    except Exception as e:
-        logger.error("close_questionnaire_func exception %s", str(e))
+    answers.completed_at = answers.updated_at = now
+    return True
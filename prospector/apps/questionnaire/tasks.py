@@ -1,6 +1,7 @@
 from django_rq import job
 
 from . import models
+from .metrics import CLEANUP_DELETED
 
 
 def schedule(scheduler):
@@ -13,4 +14,7 @@ def cleanup():
     """Clean up abandoned and incomplete responses."""
 
     # Anything that didn't accept the terms can go straight away with no ill effects
-    models.Answers.objects.filter(terms_accepted_at__isnull=True).delete()
+    _, deleted = models.Answers.objects.filter(terms_accepted_at__isnull=True).delete()
+    CLEANUP_DELETED.inc(
+        deleted.get(models.Answers._meta.label, 0), reason="terms_not_accepted"
+    )
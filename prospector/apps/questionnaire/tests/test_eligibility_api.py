@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from django.urls import reverse
+
+from prospector.apps.parity.management.commands.data_upload import parse_row
+from prospector.apps.parity.models import ParityData
+from prospector.apps.questionnaire import enums
+from prospector.apps.questionnaire import services
+from prospector.apps.questionnaire import utils
+from prospector.apps.questionnaire.models import Answers
+from prospector.testutils import synthetic
+
+URL = reverse("questionnaire:bulk-eligibility")
+
+
+@pytest.fixture
+def parity(settings):
+    settings.PARTNER_API_KEYS = {"council": "secret"}
+    settings.BULK_ELIGIBILITY_CHUNK_SIZE = 3
+    return ParityData.objects.bulk_create(
+        parse_row(row) for row in synthetic.parity_rows(5)
+    )
+
+
+def post(client, properties, key="secret"):
+    return client.post(
+        URL,
+        {"properties": properties},
+        content_type="application/json",
+        HTTP_AUTHORIZATION="Bearer %s" % key,
+    )
+
+
+def lines(response):
+    assert response["Content-Type"] == "application/x-ndjson"
+    return [
+        json.loads(line) for line in b"".join(response.streaming_content).splitlines()
+    ]
+
+
+@pytest.mark.django_db
+def test_requires_a_partner_key(client, parity):
+    response = client.post(URL, {"properties": []}, content_type="application/json")
+    assert response.status_code == 401
+    response = post(client, [], key="wrong")
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_matches_the_questionnaire(client, parity):
+    household = {"tenure": enums.Tenure.OWNER_OCCUPIED, "household_income": 30000}
+    properties = [{"id": p.uprn, "uprn": p.uprn, **household} for p in parity]
+    # Looked up by address instead
+    properties.append(
+        {
+            "id": "by-address",
+            "address_1": parity[0].address_1,
+            "address_2": parity[0].address_2,
+            "postcode": parity[0].postcode.replace(" ", "").lower(),
+            **household,
+        }
+    )
+
+    results = lines(post(client, properties))
+    assert [r["id"] for r in results] == [p["id"] for p in properties]
+    assert results[-1]["uprn"] == parity[0].uprn
+
+    for p, result in zip(parity, results):
+        answers = services.prepopulate_from_parity(Answers(uprn=p.uprn, **household))
+        assert result["matched"]
+        assert result["eligibility"]["bus"] is True
+        assert result["eligibility"]["whlg"] == answers.is_whlg_eligible
+        assert result["eligibility"]["gbis"] == answers.is_gbis_eligible
+        assert result["measures"] == [
+            m.value for m in utils.recommended_measures(answers)
+        ]
+
+
+@pytest.mark.django_db
+def test_reports_each_property_it_cannot_assess(client, parity):
+    results = lines(
+        post(
+            client,
+            [
+                {"uprn": "missing"},
+                {"address_1": "1 Nowhere"},
+                {"uprn": parity[0].uprn, "tenure": "castle"},
+                {"uprn": parity[0].uprn, "colour": "red"},
+            ],
+        )
+    )
+    assert results[0] == {"id": 0, "matched": False}
+    assert "address_1 and postcode" in results[1]["error"]
+    assert results[2]["error"].startswith("tenure:")
+    assert results[3]["error"] == "Unknown fields: colour"
+
+
+@pytest.mark.django_db
+def test_accepts_ndjson(client, parity):
+    body = "\n".join(json.dumps({"uprn": p.uprn}) for p in parity[:2])
+    response = client.post(
+        URL,
+        body,
+        content_type="application/x-ndjson",
+        HTTP_AUTHORIZATION="Bearer secret",
+    )
+    assert [r["uprn"] for r in lines(response)] == [p.uprn for p in parity[:2]]
+
+
+@pytest.mark.django_db
+def test_limits_the_batch_size(client, parity, settings):
+    settings.BULK_ELIGIBILITY_MAX_PROPERTIES = 2
+    assert post(client, [{"uprn": p.uprn} for p in parity]).status_code == 413
+    assert post(client, "not a list").status_code == 400
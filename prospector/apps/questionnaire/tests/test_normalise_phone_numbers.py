@@ -0,0 +1,39 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from prospector.apps.questionnaire.management.commands import normalise_phone_numbers
+from prospector.apps.questionnaire.models import Answers
+from prospector.apps.questionnaire.tests.factories import AnswersFactory
+
+
+@pytest.mark.django_db
+def test_normalises_saved_numbers():
+    numbers = [
+        ("0161 783 6911", ""),
+        ("", "07968 499121"),
+        ("+441617836911", ""),
+        ("FREDDO", "(07968) 499 121"),
+        ("", ""),
+    ]
+    answers = [
+        AnswersFactory(contact_phone=phone, contact_mobile=mobile)
+        for phone, mobile in numbers
+    ]
+
+    stdout = io.StringIO()
+    call_command(normalise_phone_numbers.Command(), batch_size=2, stdout=stdout)
+    assert "Updated 3 of 4 answers" in stdout.getvalue()
+    assert "1 phone numbers could not be parsed" in stdout.getvalue()
+
+    saved = Answers.objects.in_bulk([a.pk for a in answers])
+    assert [
+        (saved[a.pk].contact_phone, saved[a.pk].contact_mobile) for a in answers
+    ] == [
+        ("+441617836911", ""),
+        ("", "+447968499121"),
+        ("+441617836911", ""),
+        ("FREDDO", "+447968499121"),
+        ("", ""),
+    ]
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from prospector.apps.questionnaire.models import Answers
+from prospector.apps.questionnaire.views import trail as views
+
+
+@pytest.fixture(autouse=True)
+def pages():
+    cache = caches["pages"]
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def test_home_is_cached_for_every_visitor(client, pages, settings, monkeypatch):
+    url = reverse("questionnaire:home")
+    first = client.get(url)
+    assert first.status_code == 200
+    assert "csrftoken" not in first.cookies
+    assert "sessionid" not in first.cookies
+    assert first["Cache-Control"] == "max-age=%d" % settings.PAGE_CACHE_TIMEOUT
+
+    # Served from the cache, without running the view again
+    monkeypatch.setattr(
+        views.Home,
+        "get_context_data",
+        lambda self, **kwargs: pytest.fail("Home was rendered again"),
+    )
+    second = client.get(url)
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_start_is_not_cached(client):
+    url = reverse("questionnaire:start")
+    for visitor in range(2):
+        client.cookies.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        assert b"csrfmiddlewaretoken" in response.content
+    assert Answers.objects.count() == 2
+
+
+def test_static_fragments_are_cached(pages, rf, settings):
+    html = render_to_string(
+        "questionnaire/base_question.html",
+        {"question_icon": "house"},
+        request=rf.get("/"),
+    )
+    assert pages.get(make_template_fragment_key("base_footer")) in html
+    assert pages.get(make_template_fragment_key("question_icon", ["house"])) in html
+    assert pages.get(make_template_fragment_key("question_icon", ["sun"])) is None
+
+    # Fragments expire with the rest of the cache
+    key = pages.make_key(make_template_fragment_key("base_footer"))
+    assert 0 < pages._expire_info[key] - time.time() <= settings.PAGE_CACHE_TIMEOUT
+
+
+def test_deploys_start_afresh(pages, settings):
+    assert pages.version == settings.PAGE_CACHE_VERSION
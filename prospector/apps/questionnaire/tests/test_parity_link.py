@@ -0,0 +1,54 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from prospector.apps.parity.management.commands import data_upload
+from prospector.apps.parity.models import ParityData
+from prospector.apps.questionnaire import services
+from prospector.apps.questionnaire.models import Answers
+from prospector.management.commands import generate_synthetic_data
+from prospector.testutils import synthetic
+
+
+@pytest.fixture
+def parity():
+    return ParityData.objects.bulk_create(
+        data_upload.parse_row(row) for row in synthetic.parity_rows(5)
+    )
+
+
+@pytest.mark.django_db
+def test_prepopulating_links_the_parity_row(parity):
+    answers = services.prepopulate_from_parity(Answers(uprn=parity[2].uprn))
+    answers.save()
+    assert Answers.objects.get(id=answers.id).parity == parity[2]
+    assert list(parity[2].answers.all()) == [answers]
+
+
+@pytest.mark.django_db
+def test_link_survives_a_reimport(tmp_path, django_assert_num_queries):
+    path = tmp_path / "parity.csv"
+    call_command(
+        generate_synthetic_data.Command(),
+        "--parity-rows=10",
+        "--parity-csv=%s" % path,
+    )
+    call_command(data_upload.Command(), "--file=%s" % path, stdout=io.StringIO())
+    uprn = ParityData.objects.first().uprn
+    answers = services.prepopulate_from_parity(Answers(uprn=uprn))
+    answers.save()
+
+    call_command(data_upload.Command(), "--file=%s" % path, stdout=io.StringIO())
+    with django_assert_num_queries(1):
+        linked = Answers.objects.select_related("parity").get(id=answers.id)
+        assert linked.parity.uprn == uprn
+    # The row it was prepopulated from was replaced
+    assert str(linked.parity.id) != answers.parity_object_id
+
+
+def test_import_keeps_the_last_row_for_a_uprn():
+    rows = [data_upload.parse_row(row) for row in synthetic.parity_rows(4)]
+    rows[3].uprn = rows[1].uprn
+    rows[2].uprn = None
+    assert data_upload.unique_uprns(rows) == [rows[0], rows[2], rows[3]]
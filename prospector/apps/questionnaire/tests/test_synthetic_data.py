@@ -0,0 +1,71 @@
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from prospector.apps.crm.models import CrmResult
+from prospector.apps.parity.management.commands import data_upload
+from prospector.apps.parity.models import ParityData
+from prospector.apps.questionnaire.models import Answers
+from prospector.apps.questionnaire.services import prepopulate_from_parity
+from prospector.management.commands import generate_synthetic_data
+from prospector.testutils import synthetic
+
+
+def test_parity_rows_are_deterministic():
+    assert list(synthetic.parity_rows(5, seed=1)) == list(
+        synthetic.parity_rows(5, seed=1)
+    )
+    assert synthetic.parity_row(1, 3) == list(synthetic.parity_rows(5, seed=1))[3]
+    assert synthetic.parity_row(1, 3) != synthetic.parity_row(2, 3)
+
+
+@pytest.mark.django_db
+def test_parity_csv_loads_with_data_upload(tmp_path):
+    path = tmp_path / "parity.csv"
+
+    call_command(
+        generate_synthetic_data.Command(),
+        "--parity-rows=20",
+        "--parity-csv=%s" % path,
+    )
+    call_command(data_upload.Command(), "--file=%s" % path)
+
+    assert ParityData.objects.count() == 20
+
+
+@pytest.mark.django_db
+def test_answers_history():
+    call_command(
+        generate_synthetic_data.Command(),
+        "--parity-rows=50",
+        "--load-parity",
+        "--answers=40",
+        "--batch-size=15",
+        "--days=30",
+    )
+
+    assert ParityData.objects.count() == 50
+    assert Answers.objects.count() == 40
+    completed = Answers.objects.filter(completed_at__isnull=False)
+    assert completed.exists()
+    assert not CrmResult.objects.exclude(answers__in=completed).exists()
+    assert Answers.objects.filter(uprn__in=ParityData.objects.values("uprn")).exists()
+    for result in CrmResult.objects.select_related("answers"):
+        assert result.created_at > result.answers.completed_at
+
+
+@pytest.mark.django_db
+def test_unmatched_answers_do_not_prepopulate():
+    # Answers 3 isn't for a property in the Parity data, although Parity row 3 is
+    ParityData.objects.bulk_create(
+        data_upload.parse_row(row) for row in synthetic.parity_rows(20)
+    )
+    answers = synthetic.make_answers(0, 3)
+
+    with mock.patch(
+        "prospector.apps.questionnaire.services.copy_from_parity"
+    ) as copy_from_parity:
+        prepopulate_from_parity(answers)
+
+    copy_from_parity.assert_not_called()
@@ -8,7 +8,9 @@ from django.urls import reverse
 from django.utils import timezone
 
 from . import factories
+from prospector.apis.recorder import NotRecorded
 from prospector.apps.questionnaire import enums
+from prospector.apps.questionnaire.views import abstract
 from prospector.apps.questionnaire.views import trail as views
 from prospector.testutils import add_middleware_to_request
 from prospector.trail.mixin import snake_case
@@ -194,6 +196,19 @@ class SpecialCases(TrailTest):
         assert response.status_code == 302
         assert response.url == reverse("questionnaire:start")
 
+    def test_thank_you_rerender_uses_completed_answers(self):
+        self.answers.completed_at = timezone.now()
+        self.answers.save()
+        response = self._get_trail_view("ThankYou")
+
+        assert response.status_code == 200
+        assert response.context_data["view"].answers == self.answers
+
+    def test_cant_post_to_thank_you(self):
+        response = self._post_trail_data("ThankYou", {})
+
+        assert response.status_code == 405
+
     # TODO test postcode caching - should be in test_services tho'
 
 
@@ -214,3 +229,61 @@ class TestPropertyPostcode(TrailTest):
             },
         )
         assert response.status_code == 302
+
+
+@override_settings(POSTCODER_API_KEY="DUMMY")
+class TestAddressLookup(TestCase):
+    """The address pages look the postcode up before handling the request."""
+
+    url = reverse("questionnaire:property-address")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.answers = factories.AnswersFactory(property_postcode="PL2 1BX")
+
+    async def _start_trail(self):
+        session = await self.async_client.asession()
+        await session.aset(views.SESSION_ANSWERS_ID, self.answers.id)
+        await session.aset(views.SESSION_TRAIL_ID, ["Start", "PropertyAddress"])
+        await session.asave()
+
+    @mock.patch("prospector.apps.questionnaire.views.abstract.get_for_postcode")
+    async def test_property_address_awaits_lookup(self, get_for_postcode):
+        await self._start_trail()
+
+        response = await self.async_client.get(self.url)
+
+        assert response.status_code == 200
+        assert "7A Benbow Street" in response.content.decode("utf-8")
+        get_for_postcode.assert_not_called()
+
+    @mock.patch("prospector.apps.questionnaire.views.abstract.get_for_postcode")
+    @mock.patch("prospector.apps.questionnaire.views.abstract.aget_for_postcode")
+    async def test_failed_lookup_is_not_repeated(
+        self, aget_for_postcode, get_for_postcode
+    ):
+        aget_for_postcode.side_effect = NotRecorded("No recording")
+        await self._start_trail()
+
+        with self.assertLogs(abstract.logger, "WARNING"):
+            response = await self.async_client.get(self.url)
+
+        assert response.status_code == 200
+        assert response.context["all_postcode_addresses"] == {}
+        get_for_postcode.assert_not_called()
+
+    async def test_property_address_saves_chosen_address(self):
+        await self._start_trail()
+        response = await self.async_client.get(self.url)
+        [uprn] = [
+            key
+            for key, address in response.context["all_postcode_addresses"].items()
+            if address["address1"] == "7A Benbow Street"
+        ]
+
+        response = await self.async_client.post(self.url, {"chosen_address": uprn})
+
+        assert response.status_code == 302
+        await self.answers.arefresh_from_db()
+        assert self.answers.property_address_1 == "7A Benbow Street"
+        assert self.answers.uprn == uprn
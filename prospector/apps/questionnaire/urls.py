@@ -1,11 +1,14 @@
 from django.urls import path
 
+from .views import api
 from .views import trail as views
 
 app_name = "questionnaire"
 
 urlpatterns = [
     path("", views.Home.as_view(), name="home"),
+    path("api/eligibility", api.BulkEligibility.as_view(), name="bulk-eligibility"),
+    path("api/properties", api.PropertySearch.as_view(), name="property-search"),
     path("start", views.Start.as_view(), name="start"),
     path("name", views.RespondentName.as_view(), name="respondent-name"),
     path("role", views.RespondentRole.as_view(), name="respondent-role"),
@@ -18,14 +21,22 @@ urlpatterns = [
     path(
         "your-postcode", views.RespondentPostcode.as_view(), name="respondent-postcode"
     ),
-    path("your-address", views.RespondentAddress.as_view(), name="respondent-address"),
+    path(
+        "your-address",
+        views.RespondentAddress.as_async_view(),
+        name="respondent-address",
+    ),
     path("your-email", views.Email.as_view(), name="email"),
     path("phone-numbers", views.ContactPhone.as_view(), name="contact-phone"),
     path("occupant-name", views.OccupantName.as_view(), name="occupant-name"),
     path(
         "property-postcode", views.PropertyPostcode.as_view(), name="property-postcode"
     ),
-    path("property-address", views.PropertyAddress.as_view(), name="property-address"),
+    path(
+        "property-address",
+        views.PropertyAddress.as_async_view(),
+        name="property-address",
+    ),
     path("address-unknown", views.AddressUnknown.as_view(), name="address-unknown"),
     path("thank-you", views.ThankYou.as_view(), name="thank-you"),
     path("property-tenure", views.Tenure.as_view(), name="tenure"),
@@ -6,6 +6,7 @@ import os
 from django.core.management.base import CommandError
 
 from . import enums
+from prospector.dataformats import postcodes
 
 logger = logging.getLogger(__name__)
 
@@ -76,22 +77,66 @@ def get_bill_impact(measure: enums.PossibleMeasures) -> str:
         return "High"
 
 
-def get_whlg_eligible_postcodes():
+# The Answers property recommending each measure, in the order they are shown
+MEASURE_RECOMMENDATIONS = [
+    (
+        "is_cavity_wall_insulation_recommended",
+        enums.PossibleMeasures.CAVITY_WALL_INSULATION,
+    ),
+    (
+        "is_solid_wall_insulation_recommended",
+        enums.PossibleMeasures.SOLID_WALL_INSULATION,
+    ),
+    (
+        "is_underfloor_insulation_recommended",
+        enums.PossibleMeasures.UNDERFLOOR_INSULATION,
+    ),
+    ("is_loft_insulation_recommended", enums.PossibleMeasures.LOFT_INSULATION),
+    ("is_rir_insulation_recommended", enums.PossibleMeasures.RIR_INSULATION),
+    ("is_boiler_upgrade_recommended", enums.PossibleMeasures.BOILER_UPGRADE),
+    (
+        "is_heatpump_installation_recommended",
+        enums.PossibleMeasures.HEAT_PUMP_INSTALLATION,
+    ),
+    (
+        "is_solar_pv_installation_recommended",
+        enums.PossibleMeasures.SOLAR_PV_INSTALLATION,
+    ),
+    # Battery storage is recommended alongside solar PV
+    ("is_solar_pv_installation_recommended", enums.PossibleMeasures.BATTERY_STORAGE),
+    (
+        "is_heating_controls_installation_recommended",
+        enums.PossibleMeasures.HEATING_CONTROLS,
+    ),
+]
+
+
+def recommended_measures(answers) -> list:
+    """The measures recommended for the property in ``answers``."""
+    return [
+        measure
+        for recommended, measure in MEASURE_RECOMMENDATIONS
+        if getattr(answers, recommended)
+    ]
+
+
+def get_whlg_eligible_postcodes() -> frozenset:
     path = "external_data/WHLG-eligible-postcodes.csv"
 
     if not os.path.exists(path):
         print("⚠️ Skipping postcode loading: file not found")
-        return []
+        return frozenset()
 
-    postcodes = []
+    codes = []
     with open(path, "r") as file:
         reader = csv.reader(file)
         for row in reader:
             try:
-                postcodes.append(row[0])
+                codes.append(row[0])
             except Exception:
                 raise CommandError("Operation aborted due to data error.")
-    return postcodes
+    # In canonical form, to compare with the postcodes of answers and Parity data
+    return frozenset(postcodes.normalise_all(codes)) - {""}
 
 
 def is_valid_64_bit_integer(data):
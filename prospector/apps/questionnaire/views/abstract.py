@@ -4,13 +4,20 @@ from enum import auto
 from enum import Enum
 from typing import Optional
 
+import httpx
+from asgiref.sync import sync_to_async
 from crispy_forms_gds.helper import FormHelper
 from crispy_forms_gds.layout import Field
 from crispy_forms_gds.layout import Layout
 from crispy_forms_gds.layout import Size
 from django import forms
+from django.conf import settings
+from django.db import transaction
 from django.views.generic.edit import FormView
 
+from prospector.apis.exceptions import APIError
+from prospector.apis.postcoder import aget_for_postcode
+from prospector.apis.postcoder import get_for_postcode
 from prospector.apps.questionnaire import forms as questionnaire_forms
 from prospector.apps.questionnaire import models
 from prospector.trail import mixin
@@ -40,6 +47,10 @@ class Question(mixin.TrailMixin, FormView):
     trail_url_prefix = "questionnaire:"
     form_class = questionnaire_forms.DummyForm
 
+    # Terminal pages are shown once the questionnaire is complete, so they may load
+    # completed answers; they must never be able to change them.
+    terminal = False
+
     def _init_answers(self):
         # Don't let us get called more than once.
         if hasattr(self, "answers"):
@@ -47,11 +58,13 @@ class Question(mixin.TrailMixin, FormView):
 
         self.answers = None
         if SESSION_ANSWERS_ID in self.request.session:
+            answers = models.Answers.objects.filter(
+                id=self.request.session[SESSION_ANSWERS_ID]
+            )
+            if not self.terminal:
+                answers = answers.filter(completed_at__isnull=True)
             with contextlib.suppress(models.Answers.DoesNotExist):
-                self.answers = models.Answers.objects.filter(
-                    id=self.request.session[SESSION_ANSWERS_ID],
-                    completed_at__isnull=True,
-                ).first()
+                self.answers = answers.first()
 
         if not self.answers:
             self.answers = models.Answers.objects.create()
@@ -130,6 +143,84 @@ class NoQuestion(Question):
     next: str
 
 
+class AddressQuestion(Question):
+    """
+    Choose an address from those in a postcode answered earlier.
+
+    Looking the postcode up takes most of the time these pages take, and it's
+    spent waiting on Postcoder, so route to ``as_async_view``.  That finds the
+    postcode and awaits the lookup without holding a thread, then handles the
+    request like any other question, in a thread, with the addresses found.
+    """
+
+    postcode_field: str
+    prefilled_addresses = {}
+
+    @classmethod
+    def as_async_view(cls, **initkwargs):
+        handle = cls.as_view(**initkwargs)
+        # As ATOMIC_REQUESTS would, which can't wrap an async view itself
+        for alias, database in settings.DATABASES.items():
+            if database.get("ATOMIC_REQUESTS"):
+                handle = transaction.atomic(using=alias)(handle)
+        handle = sync_to_async(handle)
+
+        async def view(request, *args, **kwargs):
+            postcode = await cls.apostcode(request)
+            if postcode:
+                # A lookup that fails shows no addresses, rather than being
+                # tried again, and waited on again, by the view
+                try:
+                    addresses = await aget_for_postcode(postcode)
+                except (ValueError, APIError, httpx.HTTPError) as e:
+                    logger.warning("Could not look up addresses in %s: %s", postcode, e)
+                    addresses = []
+                request.postcode_addresses = (postcode, addresses)
+            return await handle(request, *args, **kwargs)
+
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        return transaction.non_atomic_requests(view)
+
+    @classmethod
+    async def apostcode(cls, request) -> Optional[str]:
+        """The postcode in the answers that ``_init_answers`` will find, if any."""
+        answers_id = await request.session.aget(SESSION_ANSWERS_ID)
+        if answers_id is None:
+            return None
+        return (
+            await models.Answers.objects.filter(
+                id=answers_id, completed_at__isnull=True
+            )
+            .values_list(cls.postcode_field, flat=True)
+            .afirst()
+        )
+
+    def get_addresses(self, postcode: str):
+        """The addresses in ``postcode``, as looked up by ``as_async_view`` if it was."""
+        looked_up = getattr(self.request, "postcode_addresses", None)
+        if looked_up is not None and looked_up[0] == postcode:
+            return looked_up[1]
+        return get_for_postcode(postcode)
+
+    # Perform the API call to provide the choices for the address
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+
+        try:
+            self.prefilled_addresses = {
+                (address.uprn or address.id or f"addr-{i}"): address
+                for i, address in enumerate(
+                    self.get_addresses(getattr(self.answers, self.postcode_field))
+                )
+            }
+        except Exception:
+            pass
+
+        kwargs["prefilled_addresses"] = self.prefilled_addresses
+        return kwargs
+
+
 class SingleQuestion(Question):
     """
     Produces a 'standard' single question view.
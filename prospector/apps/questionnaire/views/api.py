@@ -0,0 +1,153 @@
+import json
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.http import StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from prospector.apps.parity import spatial
+from prospector.apps.parity import stock
+from prospector.apps.questionnaire import eligibility
+
+logger = logging.getLogger(__name__)
+
+NDJSON = "application/x-ndjson"
+
+
+def partner_for(request) -> Optional[str]:
+    """The partner in PARTNER_API_KEYS whose key the request bears, if any."""
+    authorization = request.headers.get("Authorization", "")
+    for partner, key in settings.PARTNER_API_KEYS.items():
+        if key and constant_time_compare(authorization, "Bearer %s" % key):
+            return partner
+    return None
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class BulkEligibility(View):
+    """
+    Assess scheme eligibility and recommended measures for a list of properties.
+
+    Partners POST ``{"properties": [...]}``, or one property per line as NDJSON,
+    with ``Authorization: Bearer <key>``.  Each property is an object with an
+    optional ``id``, a ``uprn`` or an ``address_1``, ``address_2`` and
+    ``postcode``, and optionally the household details in
+    ``eligibility.HOUSEHOLD_FIELDS``.  Results stream back as NDJSON, one line
+    per property in the order given; see ``eligibility.assess``.
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request):
+        partner = partner_for(request)
+        if partner is None:
+            return JsonResponse({"error": "Unauthorized"}, status=401)
+
+        try:
+            properties = self.parse(request)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        limit = settings.BULK_ELIGIBILITY_MAX_PROPERTIES
+        if len(properties) > limit:
+            return JsonResponse(
+                {"error": "At most %d properties can be assessed at once" % limit},
+                status=413,
+            )
+
+        logger.info("%s requested %d assessments", partner, len(properties))
+        return StreamingHttpResponse(
+            eligibility.ndjson(eligibility.assess(properties, partner)),
+            content_type=NDJSON,
+        )
+
+    @staticmethod
+    def parse(request) -> list:
+        if request.content_type == NDJSON:
+            return [
+                json.loads(line)
+                for line in request.body.decode("utf-8").splitlines()
+                if line.strip()
+            ]
+        data = json.loads(request.body or b"null")
+        if not isinstance(data, dict) or not isinstance(data.get("properties"), list):
+            raise ValueError('Expected {"properties": [...]}')
+        return data["properties"]
+
+
+def _floats(value: str, count: int = None) -> list:
+    numbers = [float(number) for number in value.split(",")]
+    if count is not None and len(numbers) != count:
+        raise ValueError("Expected %d numbers, got %s" % (count, value))
+    return numbers
+
+
+class PropertySearch(View):
+    """
+    Find Parity homes in an area, e.g. for a door-knocking campaign.
+
+    Partners GET one of ``near=<lat>,<lon>&radius=<metres>``,
+    ``bbox=<south>,<west>,<north>,<east>`` or
+    ``polygon=<lat>,<lon>;<lat>,<lon>;...``, optionally with
+    ``flags=<flag>,<flag>`` to keep only homes with all of those
+    ``stock.FLAGS``, such as ``cavity_wall_insulation`` or ``bus``.
+    """
+
+    http_method_names = ["get"]
+    max_radius = 5000
+
+    def get(self, request):
+        if partner_for(request) is None:
+            return JsonResponse({"error": "Unauthorized"}, status=401)
+
+        params = request.GET
+        flags = [name for name in params.get("flags", "").split(",") if name]
+        try:
+            if "near" in params:
+                lat, lon = _floats(params["near"], 2)
+                radius = float(params.get("radius", 500))
+                if not 0 < radius <= self.max_radius:
+                    raise ValueError("radius must be up to %d m" % self.max_radius)
+                found = spatial.near(lat, lon, radius, flags)
+            elif "bbox" in params:
+                found = [
+                    (p, None) for p in spatial.in_box(_floats(params["bbox"], 4), flags)
+                ]
+            elif "polygon" in params:
+                polygon = [
+                    _floats(corner, 2) for corner in params["polygon"].split(";")
+                ]
+                if len(polygon) < 3:
+                    raise ValueError("A polygon needs at least 3 corners")
+                found = [(p, None) for p in spatial.in_polygon(polygon, flags)]
+            else:
+                raise ValueError("Give near and radius, bbox or polygon")
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        return JsonResponse(
+            {
+                "properties": [self.serialise(p, distance) for p, distance in found],
+                "truncated": len(found) >= spatial.MAX_RESULTS,
+            }
+        )
+
+    @staticmethod
+    def serialise(parity, distance) -> dict:
+        result = {
+            "uprn": parity.uprn,
+            "address_1": parity.address_1,
+            "address_2": parity.address_2,
+            "postcode": parity.postcode,
+            "lat": float(parity.lat_coordinate),
+            "lon": float(parity.long_coordinate),
+            "flags": stock.flag_names(parity.flags),
+        }
+        if distance is not None:
+            result["distance_m"] = round(distance, 1)
+        return result
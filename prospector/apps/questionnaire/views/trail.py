@@ -1,13 +1,15 @@
 import logging
 import re
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from django.db import transaction
 from django.utils import timezone
+from django.views.decorators.cache import cache_page
 from django.views.generic.base import TemplateView
 
 from . import abstract as abstract_views
-from prospector.apis.postcoder import get_for_postcode
 from prospector.apps.questionnaire import enums
 from prospector.apps.questionnaire import forms as questionnaire_forms
 from prospector.apps.questionnaire import services
@@ -24,6 +26,16 @@ SESSION_TRAIL_ID = "questionnaire:trail_id"
 class Home(TemplateView):
     template_name = "questionnaire/home.html"
 
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # The same for every visitor: it has no form, so no CSRF token, and
+        # doesn't touch the session or the database.  Start can't be cached like
+        # this, as it starts each visitor's answers.
+        view = cache_page(settings.PAGE_CACHE_TIMEOUT, cache="pages")(
+            super().as_view(**initkwargs)
+        )
+        return transaction.non_atomic_requests(view)
+
 
 class Start(abstract_views.SingleQuestion):
     template_name = "questionnaire/start.html"
@@ -152,36 +164,19 @@ class RespondentPostcode(abstract_views.SingleQuestion):
 
     @staticmethod
     def validate_answer(value):
-        if not postcodes.validate_household_postcode(value):
+        if postcodes.parse(value) is None:
             raise ValidationError(
                 "This does not appear to be a valid UK domestic postcode. Please check and re-enter"
             )
 
 
-class RespondentAddress(abstract_views.Question):
+class RespondentAddress(abstract_views.AddressQuestion):
     title = "Your address"
     form_class = questionnaire_forms.RespondentAddress
     template_name = "questionnaire/respondent_address.html"
     next = "PropertyPostcode"
     percent_complete = 27
-    prefilled_addresses = {}
-
-    # Perform the API call to provide the choices for the address
-    def get_form_kwargs(self):
-        kwargs = super().get_form_kwargs()
-
-        try:
-            self.prefilled_addresses = {
-                (address.uprn or address.id or f"addr-{i}"): address
-                for i, address in enumerate(
-                    get_for_postcode(self.answers.respondent_postcode)
-                )
-            }
-        except Exception:
-            pass
-
-        kwargs["prefilled_addresses"] = self.prefilled_addresses
-        return kwargs
+    postcode_field = "respondent_postcode"
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
@@ -249,40 +244,23 @@ class PropertyPostcode(abstract_views.SingleQuestion):
 
     @staticmethod
     def validate_answer(value):
-        if not postcodes.validate_household_postcode(value):
+        postcode = postcodes.parse(value)
+        if postcode is None:
             raise ValidationError(
                 "This does not appear to be a valid UK domestic postcode. Please check and re-enter"
             )
-        postcode = postcodes.normalise(value)
         if postcode[0:2] != "PL":
             raise ValidationError(
                 "This tool is only available to properties within the Plymouth Council area."
             )
 
 
-class PropertyAddress(abstract_views.Question):
+class PropertyAddress(abstract_views.AddressQuestion):
     title = "Address"
     form_class = questionnaire_forms.PropertyAddress
     template_name = "questionnaire/property_address.html"
     percent_complete = 39
-    prefilled_addresses = {}
-
-    # Perform the API call to provide the choices for the address
-    def get_form_kwargs(self):
-        kwargs = super().get_form_kwargs()
-
-        try:
-            self.prefilled_addresses = {
-                (address.uprn or address.id or f"addr-{i}"): address
-                for i, address in enumerate(
-                    get_for_postcode(self.answers.property_postcode)
-                )
-            }
-        except Exception:
-            pass
-
-        kwargs["prefilled_addresses"] = self.prefilled_addresses
-        return kwargs
+    postcode_field = "property_postcode"
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
@@ -340,6 +318,8 @@ class ThankYou(abstract_views.NoQuestion):
     icon = "house"
     template_name = "questionnaire/thank_you.html"
     percent_complete = 100
+    terminal = True
+    http_method_names = ["get", "head", "options"]
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
@@ -680,78 +660,14 @@ class RecommendedMeasures(abstract_views.Question):
     template_name = "questionnaire/final_recommendations.html"
     title = "Recommendations for this property"
     percent_complete = 100
+    terminal = True
+    http_method_names = ["get", "head", "options"]
 
     def determine_recommended_measures(self):
-        measures = []
-        if self.answers.is_cavity_wall_insulation_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.CAVITY_WALL_INSULATION,
-                    "label": enums.PossibleMeasures.CAVITY_WALL_INSULATION.label,
-                }
-            )
-        if self.answers.is_solid_wall_insulation_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.SOLID_WALL_INSULATION,
-                    "label": enums.PossibleMeasures.SOLID_WALL_INSULATION.label,
-                }
-            )
-        if self.answers.is_underfloor_insulation_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.UNDERFLOOR_INSULATION,
-                    "label": enums.PossibleMeasures.UNDERFLOOR_INSULATION.label,
-                }
-            )
-        if self.answers.is_loft_insulation_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.LOFT_INSULATION,
-                    "label": enums.PossibleMeasures.LOFT_INSULATION.label,
-                }
-            )
-        if self.answers.is_rir_insulation_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.RIR_INSULATION,
-                    "label": enums.PossibleMeasures.RIR_INSULATION.label,
-                }
-            )
-        if self.answers.is_boiler_upgrade_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.BOILER_UPGRADE,
-                    "label": enums.PossibleMeasures.BOILER_UPGRADE.label,
-                }
-            )
-        if self.answers.is_heatpump_installation_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.HEAT_PUMP_INSTALLATION,
-                    "label": enums.PossibleMeasures.HEAT_PUMP_INSTALLATION.label,
-                }
-            )
-        if self.answers.is_solar_pv_installation_recommended:
-            measures.extend(
-                [
-                    {
-                        "type": enums.PossibleMeasures.SOLAR_PV_INSTALLATION,
-                        "label": enums.PossibleMeasures.SOLAR_PV_INSTALLATION.label,
-                    },
-                    {
-                        "type": enums.PossibleMeasures.BATTERY_STORAGE,
-                        "label": enums.PossibleMeasures.BATTERY_STORAGE.label,
-                    },
-                ]
-            )
-        if self.answers.is_heating_controls_installation_recommended:
-            measures.append(
-                {
-                    "type": enums.PossibleMeasures.HEATING_CONTROLS,
-                    "label": enums.PossibleMeasures.HEATING_CONTROLS.label,
-                }
-            )
+        measures = [
+            {"type": measure, "label": measure.label}
+            for measure in utils.recommended_measures(self.answers)
+        ]
         if len(measures) == 0:
             return None
         return measures
@@ -0,0 +1,82 @@
+"""Benchmarks for the questionnaire hot paths.
+
+Each case is registered with ``@case`` on a setup function, which prepares its
+data and returns the zero-argument callable to be timed.  ``run`` times it with
+``timeit`` and reports seconds per operation, where a case that processes a
+batch of items per call says so with ``ops``.  Run them with
+``python manage.py benchmark``, which compares the results to the committed
+``baselines.json``.
+"""
+
+import json
+import statistics
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import List
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+CASES: Dict[str, "Case"] = {}
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    ops: int = 1
+
+
+@dataclass
+class Result:
+    name: str
+    number: int  # Calls per timing
+    timings: List[float]  # Seconds per operation, one per repeat
+
+    @property
+    def best(self) -> float:
+        return min(self.timings)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+
+def case(name: str, ops: int = 1):
+    """Register a benchmark setup function under ``name``."""
+
+    def register(setup):
+        CASES[name] = Case(name, setup, ops)
+        return setup
+
+    return register
+
+
+def run(bench: Case, repeat: int = 5) -> Result:
+    timer = timeit.Timer(bench.setup())
+    # Enough calls per timing to take at least 0.2s, so timer resolution and
+    # one-off costs don't dominate
+    number, _ = timer.autorange()
+    per_op = number * bench.ops
+    return Result(
+        bench.name,
+        number,
+        [total / per_op for total in timer.repeat(repeat=repeat, number=number)],
+    )
+
+
+def load_baselines(path: Path = BASELINES) -> Dict[str, float]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(baselines: Dict[str, float], path: Path = BASELINES):
+    rounded = {name: float("%.3g" % seconds) for name, seconds in baselines.items()}
+    with open(path, "w") as f:
+        json.dump(rounded, f, indent=2, sort_keys=True)
+        f.write("\n")
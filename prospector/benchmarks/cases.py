@@ -0,0 +1,196 @@
+"""The benchmark cases.
+
+Cases that touch the database expect to be run inside a transaction that is
+rolled back afterwards, as the ``benchmark`` command does.
+"""
+
+import random
+from unittest import mock
+
+from django.test import Client
+from django.test import override_settings
+from django.urls import reverse
+from sass_processor.processor import SassProcessor
+
+from . import case
+from prospector.apis.crm import crm
+from prospector.apps.parity.management.commands.data_upload import parse_row
+from prospector.apps.parity.models import ParityData
+from prospector.apps.questionnaire import enums
+from prospector.apps.questionnaire import services
+from prospector.apps.questionnaire.models import Answers
+from prospector.dataformats import phone_numbers
+from prospector.dataformats import postcodes
+from prospector.testutils import synthetic
+
+SAMPLE = 100
+SEED = 0
+
+# The postcode and first address of the example Postcoder response used when
+# POSTCODER_API_KEY is "DUMMY"
+TRAIL_POSTCODE = "PL2 1BX"
+TRAIL_UPRN = "10000798552"
+
+ANSWERS_PROPERTY_PREFIXES = ("is_", "does_", "if_", "whlg_")
+
+
+def sample_answers():
+    return list(synthetic.synthetic_answers(SAMPLE, SEED))
+
+
+def sample_parity(count=SAMPLE):
+    return [parse_row(row) for row in synthetic.parity_rows(count, SEED)]
+
+
+@case("crm.map_crm", ops=SAMPLE)
+def map_crm():
+    answers = sample_answers()
+    return lambda: [crm.map_crm(a) for a in answers]
+
+
+def answers_property(name):
+    getter = getattr(Answers, name).fget
+
+    def setup():
+        answers = sample_answers()
+        return lambda: [getter(a) for a in answers]
+
+    return setup
+
+
+for name in sorted(vars(Answers)):
+    if name.startswith(ANSWERS_PROPERTY_PREFIXES) and isinstance(
+        getattr(Answers, name), property
+    ):
+        case("answers.%s" % name, ops=SAMPLE)(answers_property(name))
+
+
+@case("postcodes.normalise", ops=SAMPLE)
+def postcodes_normalise():
+    rng = random.Random(SEED)
+    codes = [
+        rng.choice([str.lower, str.upper])(synthetic.postcode(rng)).replace(
+            " ", rng.choice(["", " ", "  "])
+        )
+        for _ in range(SAMPLE)
+    ]
+    return lambda: [postcodes.normalise(c) for c in codes]
+
+
+@case("postcodes.normalise_all", ops=SAMPLE)
+def postcodes_normalise_all():
+    # A column of an import, where many rows share a postcode
+    rng = random.Random(SEED)
+    distinct = [synthetic.postcode(rng).replace(" ", "") for _ in range(SAMPLE // 20)]
+    codes = [rng.choice(distinct) for _ in range(SAMPLE)]
+    return lambda: postcodes.normalise_all(codes)
+
+
+@case("postcodes.validate_household_postcode", ops=SAMPLE)
+def postcodes_validate():
+    rng = random.Random(SEED)
+    codes = [synthetic.postcode(rng) for _ in range(SAMPLE)]
+    return lambda: [postcodes.validate_household_postcode(c) for c in codes]
+
+
+@case("phone_numbers.normalise", ops=SAMPLE)
+def phone_numbers_normalise():
+    rng = random.Random(SEED)
+    numbers = [synthetic.phone_number(rng) for _ in range(SAMPLE)]
+    return lambda: [phone_numbers.normalise(n) for n in numbers]
+
+
+@case("phone_numbers.normalise_all", ops=SAMPLE)
+def phone_numbers_normalise_all():
+    rng = random.Random(SEED)
+    numbers = [synthetic.phone_number(rng) for _ in range(SAMPLE)]
+    return lambda: phone_numbers.normalise_all(numbers)
+
+
+@case("phone_numbers.format", ops=SAMPLE)
+def phone_numbers_format():
+    rng = random.Random(SEED)
+    numbers = [synthetic.phone_number(rng) for _ in range(SAMPLE)]
+    return lambda: [phone_numbers.format(n) for n in numbers]
+
+
+@case("data_upload.parse_row", ops=SAMPLE)
+def data_upload_parse_row():
+    rows = list(synthetic.parity_rows(SAMPLE, SEED))
+    return lambda: [parse_row(row) for row in rows]
+
+
+def prepopulate(by_uprn):
+    def setup():
+        parity = ParityData.objects.bulk_create(sample_parity(1000))
+        answers = []
+        for a, p in zip(sample_answers(), random.Random(SEED).sample(parity, SAMPLE)):
+            a.uprn = p.uprn if by_uprn else ""
+            a.property_address_1 = p.address_1
+            a.property_address_2 = p.address_2
+            a.property_postcode = p.postcode
+            answers.append(a)
+        return lambda: [services.prepopulate_from_parity(a) for a in answers]
+
+    return setup
+
+
+case("questionnaire.prepopulate_from_parity[uprn]", ops=SAMPLE)(prepopulate(True))
+case("questionnaire.prepopulate_from_parity[address]", ops=SAMPLE)(prepopulate(False))
+
+
+# (view, data) for each page of the owner-occupier route through the trail
+TRAIL = [
+    ("start", {"field": True}),
+    ("consents", {"consented_callback": True}),
+    ("respondent-name", {"first_name": "Test", "last_name": "Respondent"}),
+    ("email", {"field": "respondent@example.com"}),
+    ("contact-phone", {"contact_phone": "01752 123456"}),
+    ("respondent-role", {"respondent_role": enums.RespondentRole.OWNER_OCCUPIER}),
+    ("property-postcode", {"field": TRAIL_POSTCODE}),
+    ("property-address", {"chosen_address": TRAIL_UPRN}),
+    ("tenure", {"field": enums.Tenure.OWNER_OCCUPIED}),
+    ("property-measures-summary", {"respondent_comments": ""}),
+    ("occupants", {"adults": 2, "children": 1, "seniors": 0}),
+    ("means-tested-benefits", {"field": False}),
+    ("vulnerabilities-general", {"field": False}),
+    ("household-income", {"field": "24000"}),
+    ("household-income-after-tax", {"field": "21000"}),
+    ("housing-costs", {"field": "600"}),
+    (
+        "answers-summary",
+        {"source_of_info_about_pec": enums.HowDidYouHearAboutPEC.FLYER},
+    ),
+]
+
+
+def walk_trail():
+    """Complete the questionnaire once, as a fresh visitor, and check the route."""
+    client = Client()
+    for view, data in TRAIL:
+        response = client.post(reverse("questionnaire:%s" % view), data)
+        if response.status_code != 302:
+            raise AssertionError("%s did not accept its answer" % view)
+        response = client.get(response["Location"])
+    if response.request["PATH_INFO"] != reverse("questionnaire:recommended-measures"):
+        raise AssertionError("The trail ended at %s" % response.request["PATH_INFO"])
+    if response.status_code != 200:
+        raise AssertionError("recommended-measures returned %d" % response.status_code)
+
+
+@case("questionnaire.trail")
+def trail():
+    parity = sample_parity(1)[0]
+    parity.uprn = TRAIL_UPRN
+    parity.save()
+    settings = override_settings(
+        ALLOWED_HOSTS=["testserver"], POSTCODER_API_KEY="DUMMY", DEBUG=False
+    )
+    # Stylesheets are compiled ahead of time in production, as they should be here
+    sass = mock.patch.object(SassProcessor, "processor_enabled", False)
+
+    def run():
+        with settings, sass:
+            walk_trail()
+
+    return run
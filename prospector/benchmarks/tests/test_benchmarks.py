@@ -0,0 +1,36 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from prospector import benchmarks
+from prospector.benchmarks import cases  # noqa: F401 registers the cases
+from prospector.management.commands import benchmark
+
+
+def test_every_case_has_a_baseline():
+    assert set(benchmarks.CASES) == set(benchmarks.load_baselines())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", sorted(benchmarks.CASES))
+def test_case_runs(name):
+    benchmarks.CASES[name].setup()()
+
+
+def test_run_reports_per_operation():
+    bench = benchmarks.Case("test", lambda: lambda: None, ops=10)
+
+    result = benchmarks.run(bench, repeat=3)
+
+    assert len(result.timings) == 3
+    assert result.best <= result.median
+
+
+@pytest.mark.django_db
+def test_command_fails_on_regression(mocker):
+    mocker.patch.object(
+        benchmarks, "load_baselines", return_value={"postcodes.normalise": 1e-12}
+    )
+
+    with pytest.raises(CommandError, match="postcodes.normalise"):
+        call_command(benchmark.Command(), "--filter=postcodes.normalise", "--repeat=1")
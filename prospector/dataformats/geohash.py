@@ -0,0 +1,103 @@
+"""Geohashes, for finding nearby places with a plain prefix index.
+
+A geohash names a cell of a grid over the globe; each extra character splits
+the cell into 32, and cells sharing a prefix lie within the prefix's cell.  At
+9 characters a cell is about 5 m across.
+"""
+
+import math
+from typing import List
+from typing import Set
+from typing import Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_M = 6371008.8
+
+# (south, west, north, east) in degrees
+Box = Tuple[float, float, float, float]
+
+
+def encode(lat: float, lon: float, precision: int = 9) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    code = []
+    bits = 0
+    bit_count = 0
+    even = True  # Bits alternate between longitude and latitude, longitude first
+    while len(code) < precision:
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            code.append(BASE32[bits])
+            bits = bit_count = 0
+    return "".join(code)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """The (height, width) of a cell in degrees."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180 / 2**lat_bits, 360 / 2**lon_bits
+
+
+def cover(box: Box, max_cells: int = 32) -> Set[str]:
+    """The fewest, longest geohashes whose cells cover ``box``, up to ``max_cells``."""
+    south, west, north, east = box
+    for precision in range(9, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.ceil((north - south) / height) + 1
+        columns = math.ceil((east - west) / width) + 1
+        if rows * columns <= max_cells or precision == 1:
+            break
+
+    lats = [min(north, south + i * height) for i in range(rows)] + [north]
+    lons = [min(east, west + i * width) for i in range(columns)] + [east]
+    return {encode(lat, lon, precision) for lat in lats for lon in lons}
+
+
+def distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def radius_box(lat: float, lon: float, metres: float) -> Box:
+    """The box around the circle of ``metres`` about (lat, lon)."""
+    d_lat = math.degrees(metres / EARTH_RADIUS_M)
+    d_lon = d_lat / max(math.cos(math.radians(lat)), 1e-9)
+    return lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon
+
+
+def polygon_box(polygon: List[Tuple[float, float]]) -> Box:
+    lats = [lat for lat, _ in polygon]
+    lons = [lon for _, lon in polygon]
+    return min(lats), min(lons), max(lats), max(lons)
+
+
+def in_polygon(lat: float, lon: float, polygon: List[Tuple[float, float]]) -> bool:
+    """Whether (lat, lon) is inside ``polygon``, a list of (lat, lon) corners."""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lon_i = polygon[i]
+        lat_j, lon_j = polygon[j]
+        if (lat_i > lat) != (lat_j > lat) and lon < (lon_j - lon_i) * (lat - lat_i) / (
+            lat_j - lat_i
+        ) + lon_i:
+            inside = not inside
+        j = i
+    return inside
@@ -4,6 +4,11 @@
 # Original Java code is Copyright (C) 2009-2015 The Libphonenumber Authors.
 import re
 from collections import namedtuple
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
 from django.utils import html
 
 
@@ -13,6 +18,12 @@ class ParseError(Exception):
 
 _IGNORE_CHARS = [" ", "\n", "\t", "(", ")", "-"]
 
+# Numbers that normalise without error: an optional "+" or a leading "0", then
+# only digits and _IGNORE_CHARS.  Others go the slow way, to find the error.
+_VALID = re.compile("[ \n\t()\\-]*(?:[+0][0-9 \n\t()\\-]*)?")
+# Everything but digits and spaces, once a number is known to be valid
+_DROP = str.maketrans("", "", "+\n\t()-")
+
 
 def normalise(num: str) -> str:
     """
@@ -27,16 +38,37 @@ def normalise(num: str) -> str:
     It makes some assumptions; for example, if no international prefix is provided
     (00 or +) then it's a UK number.
     """
-    parsed = ""
+    if _VALID.fullmatch(num):
+        parsed = num.translate(_DROP)
+    else:
+        parsed = _parse(num)
+
+    # International & national dialling codes
+    if parsed.startswith("00"):
+        parsed = parsed[2:]
+    elif parsed.startswith("0"):
+        parsed = "44" + parsed[1:]
+
+    if parsed.startswith("44"):
+        # We strip spaces from UK numbers to make comparison better.
+        # You can put them back with format().
+        return "+" + parsed.replace(" ", "")
+    else:
+        return "+" + parsed
+
+
+def _parse(num: str) -> str:
+    """The digits and spaces of ``num``, or the ParseError explaining why not."""
+    parsed = []
     seen_data = False
     seen_plus = False
 
-    for idx, digit in enumerate(num):
+    for digit in num:
         if digit.isdigit():
             if digit != "0" and not seen_data and not seen_plus:
                 raise ParseError("Number should start with either a '0' or a '+'")
 
-            parsed = parsed + digit
+            parsed.append(digit)
             seen_data = True
 
         elif digit == "+":
@@ -48,7 +80,7 @@ def normalise(num: str) -> str:
         elif digit == " ":
             # We save spaces in case we don't understand the country code.
             # In this case we want to return the number with spacing intact.
-            parsed = parsed + digit
+            parsed.append(digit)
 
         elif digit in _IGNORE_CHARS:
             pass
@@ -56,18 +88,25 @@ def normalise(num: str) -> str:
         else:
             raise ParseError(f"'{html.escape(digit)}' not allowed in a phone number")
 
-    # International & national dialling codes
-    if parsed.startswith("00"):
-        parsed = parsed[2:]
-    elif parsed.startswith("0"):
-        parsed = "44" + parsed[1:]
+    return "".join(parsed)
 
-    if parsed.startswith("44"):
-        # We strip spaces from UK numbers to make comparison better.
-        # You can put them back with format().
-        return "+" + parsed.replace(" ", "")
-    else:
-        return "+" + parsed
+
+def normalise_all(nums: Iterable[str]) -> List[Optional[str]]:
+    """``normalise`` each of ``nums``, such as a column of saved answers.
+
+    Numbers that can't be normalised are None rather than errors, and blanks
+    stay blank.
+    """
+    normalised = []
+    for num in nums:
+        if not num:
+            normalised.append(num)
+            continue
+        try:
+            normalised.append(normalise(num))
+        except ParseError:
+            normalised.append(None)
+    return normalised
 
 
 _NumberFormat = namedtuple("NumberFormat", "pattern, format, leading_digits_pattern")
@@ -110,35 +149,120 @@ _FORMATS = [
 ]
 
 
-# Stolen ruthlessly from the python-phonenumbers GitHub project:
-# https://github.com/daviddrysdale/python-phonenumbers/blob/76d17e1278bebb5746026d0e7c3fe6159ee689d0/python/phonenumbers/phonenumberutil.py
-def fullmatch(pattern, string, flags=0):
+def _expand(pattern: str) -> List[str]:
+    """The digit prefixes that match ``pattern``, a leading digits pattern.
+
+    Leading digits patterns only use digits, classes such as "[02-9]",
+    non-capturing groups and "|", so each matches a finite set of prefixes.
+    """
+    prefixes, end = _expand_alternatives(pattern, 0)
+    if end != len(pattern):
+        raise ValueError("Unsupported leading digits pattern %r" % pattern)
+    return prefixes
+
+
+def _expand_alternatives(pattern: str, i: int) -> Tuple[List[str], int]:
+    alternatives = []
+    while True:
+        prefixes = [""]
+        while i < len(pattern) and pattern[i] not in "|)":
+            if pattern.startswith("(?:", i):
+                options, i = _expand_alternatives(pattern, i + 3)
+                i += 1  # The ")"
+            elif pattern[i] == "[":
+                end = pattern.index("]", i)
+                options = _expand_class(pattern[i + 1 : end])
+                i = end + 1
+            elif pattern[i].isdigit():
+                options = [pattern[i]]
+                i += 1
+            else:
+                raise ValueError("Unsupported leading digits pattern %r" % pattern)
+            prefixes = [prefix + option for prefix in prefixes for option in options]
+        alternatives.extend(prefixes)
+        if i < len(pattern) and pattern[i] == "|":
+            i += 1
+        else:
+            return alternatives, i
+
+
+def _expand_class(members: str) -> List[str]:
+    digits = []
+    i = 0
+    while i < len(members):
+        if i + 2 < len(members) and members[i + 1] == "-":
+            digits.extend(
+                str(d) for d in range(int(members[i]), int(members[i + 2]) + 1)
+            )
+            i += 3
+        else:
+            digits.append(members[i])
+            i += 1
+    return digits
+
+
+# A group of a _NumberFormat pattern, such as "(\\d{5})" or "(\\d{4,5})"
+_GROUP = re.compile("\\(\\\\d\\{(\\d+)(?:,(\\d+))?\\}\\)")
+
+
+def _groups(num_format) -> Tuple[Tuple[int, int], ...]:
+    """The shortest and longest length of each group of ``num_format``.
+
+    Only the last group's length may vary, and the format must be the groups
+    separated by spaces.
+    """
+    groups = tuple(
+        (int(low), int(high or low)) for low, high in _GROUP.findall(num_format.pattern)
+    )
+    if (
+        _GROUP.sub("", num_format.pattern)
+        or any(low != high for low, high in groups[:-1])
+        or num_format.format != " ".join("\\%d" % (i + 1) for i in range(len(groups)))
+    ):
+        raise ValueError("Unsupported number format %r" % (num_format,))
+    return groups
+
+
+def _compile(formats) -> dict:
+    """A trie of the leading digits of ``formats``, for ``_choose``.
+
+    Each node is a dict of the next digit to its node.  Where the digits so far
+    match a format's leading digits, the node's ``None`` key lists the format's
+    index and group lengths.
     """
-    Try to find an appropriate formatting pattern for the `string`.
+    trie: dict = {}
+    for index, num_format in enumerate(formats):
+        groups = _groups(num_format)
+        for prefix in _expand(num_format.leading_digits_pattern):
+            node = trie
+            for digit in prefix:
+                node = node.setdefault(digit, {})
+            node.setdefault(None, []).append((index, groups))
+    return trie
+
+
+_TRIE = _compile(_FORMATS)
 
-    Try to apply the pattern at the start of the string, returning a match
-    object if the whole string matches, or None if no match was found.
+
+def _choose(national_number: str) -> Optional[Tuple[Tuple[int, int], ...]]:
+    """The group lengths of the first of _FORMATS to fit ``national_number``.
+
+    That's the first whose leading digits match, and whose groups add up to
+    the number's length.
     """
-    # Build a version of the pattern with a non-capturing group around it.
-    # This is needed to get m.end() to correctly report the size of the
-    # matched expression (as per the final doctest above).
-    grouped_pattern = re.compile("^(?:%s)$" % pattern.pattern, pattern.flags)
-    m = grouped_pattern.match(string)
-    if m and m.end() < len(string):
-        # Incomplete match (which should never happen because of the $ at the
-        # end of the regexp), treat as failure.
-        m = None  # pragma no cover
-    return m
-
-
-def _choose_formatting_pattern_for_number(available_formats, national_number):
-    for num_format in available_formats:
-        ld_pattern = re.compile(num_format.leading_digits_pattern)
-        ld_match = ld_pattern.match(national_number)
-        if ld_match:
-            format_pattern = re.compile(num_format.pattern)
-            if fullmatch(format_pattern, national_number):
-                return num_format
+    candidates = []
+    node = _TRIE
+    for digit in national_number:
+        node = node.get(digit)
+        if node is None:
+            break
+        candidates.extend(node.get(None, ()))
+    length = len(national_number)
+    for _, groups in sorted(candidates):
+        fixed = sum(low for low, _ in groups[:-1])
+        low, high = groups[-1]
+        if fixed + low <= length <= fixed + high:
+            return groups
     return None
 
 
@@ -158,10 +282,15 @@ def format(num: str) -> str:
     if normalised.startswith("+44"):
         val = normalised[3:]
 
-        f = _choose_formatting_pattern_for_number(_FORMATS, val)
-        if f:
-            return "0" + re.sub(f.pattern, f.format, val)
-        else:
+        groups = _choose(val)
+        if groups is None:
             return num
+        parts = []
+        start = 0
+        for low, _ in groups[:-1]:
+            parts.append(val[start : start + low])
+            start += low
+        parts.append(val[start:])
+        return "0" + " ".join(parts)
 
     return normalised
@@ -1,18 +1,64 @@
+"""UK postcodes, in the one canonical form the app stores and compares.
+
+The canonical form is upper case, with only letters and digits and a single
+space before the inward code (the last three characters), e.g. "PL1 2AB".
+Canonical postcodes are interned, so the many rows of an import or report that
+share a postcode share one string.
+"""
+
 import re
+import sys
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+NOT_POSTCODE = re.compile("[^A-Z0-9]+")
+
+# Validates the *structure* of the UK postcode provided, ignoring some edge case
+# non-geographic postcodes. Based on the 'fixed' version of the 'official' UK
+# postcode regex.
+# See https://stackoverflow.com/questions/164979/regex-for-matching-uk-postcodes
+HOUSEHOLD_POSTCODE = re.compile("[A-Z]{1,2}\\d[A-Z\\d]? ?\\d[A-Z]{2}", re.IGNORECASE)
 
 
 def normalise(code: str) -> str:
-    """Make some text into something resembling a postcode."""
-    regex = re.compile("[A-Z0-9]")
-    stripped = "".join(c for c in code.upper() if re.match(regex, c))
-    return stripped[:-3] + " " + stripped[-3:]
+    """Make some text into something resembling a postcode.
+
+    Text with no letters or digits normalises to "".
+    """
+    stripped = NOT_POSTCODE.sub("", code.upper())
+    if not stripped:
+        return ""
+    return sys.intern(stripped[:-3] + " " + stripped[-3:])
 
 
 def validate_household_postcode(code: str) -> bool:
-    # Validates the *structure* of the UK postcode provided, ignoring some
-    # edge case non-geographic postcodes. Based on the 'fixed' version of the
-    # 'official' UK postcode regex.
-    # See https://stackoverflow.com/questions/164979/regex-for-matching-uk-postcodes
+    return HOUSEHOLD_POSTCODE.fullmatch(code) is not None
+
+
+def parse(code: str) -> Optional[str]:
+    """``code`` in canonical form, or None if it isn't a household postcode."""
+    postcode = normalise(code)
+    return postcode if validate_household_postcode(postcode) else None
+
+
+def normalise_all(codes: Iterable[str]) -> List[str]:
+    """``normalise`` each of ``codes``, such as a column of an import."""
+    return _each(normalise, codes)
+
+
+def parse_all(codes: Iterable[str]) -> List[Optional[str]]:
+    """``parse`` each of ``codes``, such as a column of an import."""
+    return _each(parse, codes)
+
 
-    regex = re.compile("^[A-Z]{1,2}\\d[A-Z\\d]? ?\\d[A-Z]{2}$", re.IGNORECASE)
-    return bool(re.match(regex, code))
+def _each(function, codes):
+    # Columns repeat postcodes many times over, so each is only done once
+    done: Dict[str, Optional[str]] = {}
+    result = []
+    for code in codes:
+        if code not in done:
+            done[code] = function(code)
+        result.append(done[code])
+    return result
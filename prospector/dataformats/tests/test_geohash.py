@@ -0,0 +1,36 @@
+import random
+
+from prospector.dataformats import geohash
+
+
+def test_encode():
+    assert geohash.encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert geohash.encode(42.605, -5.603, 5) == "ezs42"
+    # Shorter geohashes are prefixes of longer ones
+    assert geohash.encode(50.3755, -4.1427).startswith(
+        geohash.encode(50.3755, -4.1427, 5)
+    )
+
+
+def test_cover_contains_every_point_in_the_box():
+    rng = random.Random(0)
+    box = (50.36, -4.16, 50.38, -4.13)
+    cells = geohash.cover(box)
+    assert len(cells) <= 32
+    for _ in range(1000):
+        point = geohash.encode(rng.uniform(box[0], box[2]), rng.uniform(box[1], box[3]))
+        assert any(point.startswith(cell) for cell in cells)
+
+
+def test_distance_and_radius_box():
+    # Plymouth Hoe to the Barbican
+    assert 800 < geohash.distance(50.3646, -4.1421, 50.3678, -4.1315) < 870
+    south, west, north, east = geohash.radius_box(50.37, -4.14, 500)
+    assert round(geohash.distance(50.37, -4.14, north, -4.14)) == 500
+    assert round(geohash.distance(50.37, -4.14, 50.37, east)) == 500
+
+
+def test_in_polygon():
+    triangle = [(0, 0), (0, 10), (10, 0)]
+    assert geohash.in_polygon(2, 2, triangle)
+    assert not geohash.in_polygon(8, 8, triangle)
@@ -2,6 +2,7 @@ import pytest
 
 from prospector.dataformats.phone_numbers import format
 from prospector.dataformats.phone_numbers import normalise
+from prospector.dataformats.phone_numbers import normalise_all
 from prospector.dataformats.phone_numbers import ParseError
 
 
@@ -49,3 +50,30 @@ def test_format():
     assert format("+49 929 6911 444") == "+49 929 6911 444"
 
     assert format("++++") == "++++"
+
+
+@pytest.mark.parametrize(
+    "num, formatted",
+    [
+        ("08001111", "0800 1111"),
+        ("0845 4641", "0845 46 41"),
+        ("0845464 1234", "0845 464 1234"),
+        ("0800123456", "0800 123456"),
+        ("01387312345", "013873 12345"),
+        ("0207 946 0000", "020 7946 0000"),
+        ("07624 123456", "07624 123456"),
+        ("0300 123 4567", "0300 123 4567"),
+        ("0161 78", "0161 78"),
+    ],
+)
+def test_format_each_pattern(num, formatted):
+    assert format(num) == formatted
+
+
+def test_normalise_all():
+    assert normalise_all(["0161 783 6911", "", "FREDDO", "+49929 198 3922"]) == [
+        "+441617836911",
+        "",
+        None,
+        "+49929 198 3922",
+    ]
@@ -1,4 +1,7 @@
 from prospector.dataformats.postcodes import normalise
+from prospector.dataformats.postcodes import normalise_all
+from prospector.dataformats.postcodes import parse
+from prospector.dataformats.postcodes import parse_all
 from prospector.dataformats.postcodes import validate_household_postcode
 
 
@@ -18,3 +21,26 @@ def test_reject_common_postcode_mistakes():
 
 def test_pass_unusual_correct_postcode():
     assert validate_household_postcode("SW1A 2AA")
+
+
+def test_normalise_nothing():
+    assert normalise("") == ""
+    assert normalise(" -- ") == ""
+
+
+def test_canonical_forms_are_interned():
+    assert normalise("".join(["pl1", "2ab"])) is normalise("PL1  2AB")
+
+
+def test_parse():
+    assert parse("pl1-2ab") == "PL1 2AB"
+    assert parse("PL1 2AB\n") == "PL1 2AB"
+    assert parse("YO10 ABG") is None
+    assert parse("") is None
+
+
+def test_batches():
+    codes = ["pl12ab", "", "PL1 2AB", "Y010 4BG", "pl12ab"]
+    assert normalise_all(codes) == ["PL1 2AB", "", "PL1 2AB", "Y010 4BG", "PL1 2AB"]
+    assert parse_all(codes) == ["PL1 2AB", None, "PL1 2AB", None, "PL1 2AB"]
+    assert normalise_all(iter(codes)) == [normalise(c) for c in codes]
@@ -0,0 +1,65 @@
+import statistics
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from prospector.apis import recorder
+
+
+class Command(BaseCommand):
+    help = "Summarise the external API calls kept by the API recorder"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=settings.API_RECORDER_DIR,
+            help="Where the recordings are (API_RECORDER_DIR by default)",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options["dir"])
+        services = sorted(path.stem for path in directory.glob("*.jsonl"))
+        if not services:
+            raise CommandError("No recordings in %s" % directory)
+
+        calls = defaultdict(list)
+        for service in services:
+            for record in recorder.Store(service, directory).records():
+                calls[service, record["function"]].append(record)
+
+        self.stdout.write(
+            "%-40s %7s %7s %9s %9s %9s %10s %12s"
+            % (
+                "call",
+                "calls",
+                "errors",
+                "p50 ms",
+                "p95 ms",
+                "max ms",
+                "mean B",
+                "total B",
+            )
+        )
+        for (service, function), records in sorted(calls.items()):
+            durations = sorted(r["duration_ms"] for r in records)
+            sizes = [r["size"] for r in records if "size" in r]
+            self.stdout.write(
+                "%-40s %7d %7d %9.1f %9.1f %9.1f %10.0f %12d"
+                % (
+                    "%s %s" % (service, function),
+                    len(records),
+                    sum("error" in r for r in records),
+                    _percentile(durations, 50),
+                    _percentile(durations, 95),
+                    durations[-1],
+                    statistics.mean(sizes) if sizes else 0,
+                    sum(sizes),
+                )
+            )
+
+
+def _percentile(ordered: list, percent: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
@@ -0,0 +1,125 @@
+import fnmatch
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from django.test.utils import override_settings
+
+from prospector import benchmarks
+from prospector.benchmarks import cases  # noqa: F401 registers the cases
+
+
+class Rollback(Exception):
+    pass
+
+
+class NoMigrations(dict):
+    """MIGRATION_MODULES that builds every app's tables straight from its models."""
+
+    def __contains__(self, app_label):
+        return True
+
+    def __getitem__(self, app_label):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Time the questionnaire hot paths and compare them to the baselines"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--filter",
+            default="*",
+            help="Only run cases whose name matches this glob pattern",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timings taken per case"
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=1.5,
+            help="Fail if a median exceeds its baseline by this factor",
+        )
+        parser.add_argument(
+            "--update-baselines",
+            action="store_true",
+            default=False,
+            help="Save the medians as the new baselines instead of comparing",
+        )
+        parser.add_argument(
+            "--fresh-db",
+            action="store_true",
+            default=False,
+            help="Run against a throwaway test database created from the models",
+        )
+
+    def handle(self, *args, **options):
+        if not options["fresh_db"]:
+            return self.benchmark(options)
+
+        with override_settings(MIGRATION_MODULES=NoMigrations()):
+            old_name = settings.DATABASES[connection.alias]["NAME"]
+            connection.creation.create_test_db(verbosity=0, serialize=False)
+            try:
+                self.benchmark(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def benchmark(self, options):
+        selected = [
+            bench
+            for name, bench in sorted(benchmarks.CASES.items())
+            if fnmatch.fnmatch(name, options["filter"])
+        ]
+        if not selected:
+            raise CommandError("No benchmark matches %r" % options["filter"])
+
+        baselines = benchmarks.load_baselines()
+        regressions = []
+        self.stdout.write(
+            "%-60s %12s %12s %12s" % ("case", "best", "median", "baseline")
+        )
+
+        for bench in selected:
+            # Every case runs in a transaction that is rolled back, so fixtures
+            # and anything the code under test writes are thrown away.
+            try:
+                with transaction.atomic():
+                    result = benchmarks.run(bench, repeat=options["repeat"])
+                    raise Rollback
+            except Rollback:
+                pass
+
+            baseline = baselines.get(bench.name)
+            self.stdout.write(
+                "%-60s %12s %12s %12s"
+                % (
+                    bench.name,
+                    _duration(result.best),
+                    _duration(result.median),
+                    _duration(baseline) if baseline else "-",
+                )
+            )
+            if options["update_baselines"]:
+                baselines[bench.name] = result.median
+            elif baseline and result.median > baseline * options["threshold"]:
+                regressions.append((bench.name, result.median / baseline))
+
+        if options["update_baselines"]:
+            benchmarks.save_baselines(baselines)
+            self.stdout.write("Baselines saved to %s" % benchmarks.BASELINES)
+        elif regressions:
+            raise CommandError(
+                "Slower than baseline: "
+                + ", ".join("%s (x%.1f)" % regression for regression in regressions)
+            )
+
+
+def _duration(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "%.2f%s" % (seconds / scale, unit)
+    return "%.0fns" % (seconds / 1e-9)
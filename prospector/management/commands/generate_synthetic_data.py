@@ -0,0 +1,142 @@
+import csv
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from prospector.apps.crm.models import CrmResult
+from prospector.apps.crm.models import refresh_crm_status
+from prospector.apps.parity.management.commands.data_upload import parse_row
+from prospector.apps.parity.models import ParityData
+from prospector.apps.questionnaire.models import Answers
+from prospector.testutils import synthetic
+
+# Share of Answers for a property that is in the Parity data
+PARITY_MATCH_RATE = 0.85
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic Parity data and Answers histories for scale testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--parity-rows",
+            type=int,
+            default=10000,
+            help="Size of the Parity data set the Answers are drawn from",
+        )
+        parser.add_argument(
+            "--parity-csv",
+            help="Write the Parity data to this file, in the layout data_upload reads",
+        )
+        parser.add_argument(
+            "--load-parity",
+            action="store_true",
+            default=False,
+            help="Also insert the Parity data into ParityData, without a CSV",
+        )
+        parser.add_argument(
+            "--answers",
+            type=int,
+            default=0,
+            help="Number of Answers, with their CRM results, to create",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Spread the Answers over this many days up to now",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not (options["parity_csv"] or options["load_parity"] or options["answers"]):
+            raise CommandError(
+                "Nothing to do: give --parity-csv, --load-parity or --answers"
+            )
+
+        started = time.perf_counter()
+        if options["parity_csv"]:
+            self.write_parity_csv(options)
+        if options["load_parity"]:
+            self.load_parity(options)
+        if options["answers"]:
+            self.create_answers(options)
+        self.stdout.write("Done in %.1fs" % (time.perf_counter() - started))
+
+    def write_parity_csv(self, options):
+        with open(options["parity_csv"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(synthetic.PARITY_COLUMNS)
+            writer.writerows(
+                synthetic.parity_rows(options["parity_rows"], options["seed"])
+            )
+        self.stdout.write(
+            "Wrote %d Parity rows to %s"
+            % (options["parity_rows"], options["parity_csv"])
+        )
+
+    def load_parity(self, options):
+        rows = synthetic.parity_rows(options["parity_rows"], options["seed"])
+        for batch in _batches(rows, options["batch_size"]):
+            ParityData.objects.bulk_create([parse_row(row) for row in batch])
+        self.stdout.write("Inserted %d Parity rows" % options["parity_rows"])
+
+    def create_answers(self, options):
+        seed = options["seed"]
+        end = timezone.now()
+        results = 0
+        for batch in _batches(range(options["answers"]), options["batch_size"]):
+            answers = []
+            histories = []
+            for index in batch:
+                answers.append(self.make_answers(seed, index, options["parity_rows"]))
+                histories.append(synthetic.history(seed, index, end, options["days"]))
+
+            with transaction.atomic():
+                Answers.objects.bulk_create(answers)
+                # auto_now_add and auto_now overwrite the timestamps on insert, so
+                # they are put back afterwards
+                crm_results = []
+                for instance, history in zip(answers, histories):
+                    instance.created_at = history["created_at"]
+                    instance.updated_at = history["updated_at"]
+                    instance.completed_at = history["completed_at"]
+                    crm_results.extend(
+                        CrmResult(answers=instance, state=state, created_at=at)
+                        for state, at in history["crm"]
+                    )
+                Answers.objects.bulk_update(
+                    answers, ["created_at", "updated_at", "completed_at"]
+                )
+                CrmResult.objects.bulk_create(crm_results)
+                CrmResult.objects.bulk_update(crm_results, ["created_at"])
+                refresh_crm_status(instance.pk for instance in answers)
+            results += len(crm_results)
+
+        self.stdout.write(
+            "Created %d Answers and %d CRM results" % (options["answers"], results)
+        )
+
+    @staticmethod
+    def make_answers(seed, index, parity_rows):
+        rng = random.Random("%s:match:%d" % (seed, index))
+        if parity_rows and rng.random() < PARITY_MATCH_RATE:
+            parity = synthetic.parity_row(seed, rng.randrange(parity_rows))
+            return synthetic.make_answers(seed, index, parity)
+        return synthetic.make_answers(seed, index)
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,259 @@
+"""Prometheus-style metrics shared by the web, Celery and RQ processes.
+
+Metrics are declared at module level, in an app's ``metrics`` module (see
+``autodiscover``) or next to the code that records them::
+
+    SUBMISSIONS = metrics.Counter(
+        "prospector_crm_submissions_total", "CRM submissions", ["outcome"]
+    )
+    SUBMISSIONS.inc(outcome="success")
+
+Samples are written to the METRICS_BACKEND, Redis by default, so every process
+adds to the same totals, and ``exposition`` renders them all in the Prometheus
+text format for the ``/.well-known/x-metrics`` endpoint.  Recording a metric
+never raises: if the backend is unavailable the sample is dropped and logged.
+
+Metrics recorded on every request are declared with ``buffered=True``.  Their
+samples are summed in the process and added to the backend from a background
+thread every METRICS_FLUSH_INTERVAL seconds, so a slow or unavailable backend
+never holds up a response.
+"""
+
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from functools import wraps
+from importlib import import_module
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.module_loading import module_has_submodule
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY: Dict[str, "Metric"] = {}
+
+_backend = None
+
+
+def backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.METRICS_BACKEND)()
+    return _backend
+
+
+def reset_backend():
+    global _backend
+    _backend = None
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs: Iterable) -> str:
+    pairs = list(pairs)
+    if not pairs:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, _escape(value)) for name, value in pairs
+    )
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Buffer:
+    """Samples to add to the backend, summed until a background thread flushes them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, dict] = {}
+        self._pid = None
+
+    def incr(self, metric: str, samples: dict):
+        with self._lock:
+            stored = self._samples.setdefault(metric, {})
+            for sample, amount in samples.items():
+                stored[sample] = stored.get(sample, 0) + amount
+            # One flusher per process; a forked worker starts its own
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(
+                    target=self._flush_forever, name="metrics-flush", daemon=True
+                ).start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._samples = self._samples, {}
+        for metric, samples in pending.items():
+            try:
+                backend().incr(metric, samples)
+            except Exception as e:
+                logger.warning("Could not record metric %s: %s", metric, e)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+
+_buffer = Buffer()
+atexit.register(_buffer.flush)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable = (),
+        buffered: bool = False,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buffered = buffered
+        REGISTRY[name] = self
+
+    def _label_pairs(self, labels: dict) -> list:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                "%s takes labels %s, not %s"
+                % (self.name, self.labelnames, tuple(labels))
+            )
+        return [(name, labels[name]) for name in self.labelnames]
+
+    def _record(self, method: str, samples: dict):
+        if self.buffered and method == "incr":
+            _buffer.incr(self.name, samples)
+            return
+        try:
+            getattr(backend(), method)(self.name, samples)
+        except Exception as e:
+            logger.warning("Could not record metric %s: %s", self.name, e)
+
+    def samples(self) -> dict:
+        """Sample name and labels, e.g. ``foo_bucket{le="1"}``, to value."""
+        return backend().collect(self.name)
+
+    def exposition(self) -> str:
+        lines = [
+            "# HELP %s %s" % (self.name, self.documentation.replace("\n", " ")),
+            "# TYPE %s %s" % (self.name, self.type),
+        ]
+        for sample, value in sorted(self.samples().items()):
+            lines.append("%s%s %s" % (self.name, sample, _number(value)))
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        self._record("incr", {_labels(self._label_pairs(labels)): amount})
+
+
+class Gauge(Metric):
+    """A value that goes up and down.
+
+    Pass ``collect`` to compute the value when scraped instead, as a function
+    returning {tuple of label values: value}.
+    """
+
+    type = "gauge"
+
+    def __init__(self, *args, collect: Optional[Callable[[], dict]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.collect = collect
+
+    def set(self, value: float, **labels):
+        self._record("set", {_labels(self._label_pairs(labels)): value})
+
+    def samples(self) -> dict:
+        if self.collect is None:
+            return super().samples()
+        return {
+            _labels(zip(self.labelnames, label_values)): value
+            for label_values, value in self.collect().items()
+        }
+
+
+class Histogram(Metric):
+    type = "histogram"
+    DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        pairs = self._label_pairs(labels)
+        # Buckets are stored cumulatively, so scraping needs no arithmetic
+        samples = {
+            "_bucket" + _labels(pairs + [("le", _number(bound))]): 1
+            for bound in self.buckets
+            if value <= bound
+        }
+        samples["_sum" + _labels(pairs)] = value
+        samples["_count" + _labels(pairs)] = 1
+        self._record("incr", samples)
+
+    def time(self, **labels):
+        """Decorate a function to observe how long each call takes."""
+
+        def decorator(func):
+            @wraps(func)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, **labels)
+
+            return timed
+
+        return decorator
+
+
+def autodiscover():
+    """Import each local app's ``metrics`` module, to register its metrics."""
+    for app_name in settings.LOCAL_APPS:
+        if module_has_submodule(import_module(app_name), "metrics"):
+            import_module(".metrics", app_name)
+
+
+def flush():
+    """Add this process's buffered samples to the backend now."""
+    _buffer.flush()
+
+
+def exposition() -> str:
+    autodiscover()
+    flush()
+    return (
+        "\n".join(metric.exposition() for _, metric in sorted(REGISTRY.items())) + "\n"
+    )
+
+
+IMPORT_DURATION = Histogram(
+    "prospector_import_duration_seconds",
+    "Time taken by data import commands",
+    ["command"],
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
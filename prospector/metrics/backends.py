@@ -0,0 +1,54 @@
+import threading
+from collections import defaultdict
+
+import django_rq
+
+KEY_PREFIX = "prospector:metrics:"
+
+
+class LocalBackend:
+    """Keep samples in this process; for tests and single-process development."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(dict)
+
+    def incr(self, metric: str, samples: dict):
+        with self._lock:
+            stored = self._samples[metric]
+            for sample, amount in samples.items():
+                stored[sample] = stored.get(sample, 0) + amount
+
+    def set(self, metric: str, samples: dict):
+        with self._lock:
+            self._samples[metric].update(samples)
+
+    def collect(self, metric: str) -> dict:
+        with self._lock:
+            return dict(self._samples.get(metric, {}))
+
+
+class RedisBackend:
+    """Keep samples in a Redis hash per metric, shared by every process.
+
+    Uses the connection of the "default" RQ queue, which the web, Celery and RQ
+    processes are all configured with.
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection or django_rq.get_connection("default")
+
+    def incr(self, metric: str, samples: dict):
+        pipeline = self.connection.pipeline(transaction=False)
+        for sample, amount in samples.items():
+            pipeline.hincrbyfloat(KEY_PREFIX + metric, sample, amount)
+        pipeline.execute()
+
+    def set(self, metric: str, samples: dict):
+        self.connection.hset(KEY_PREFIX + metric, mapping=samples)
+
+    def collect(self, metric: str) -> dict:
+        return {
+            sample.decode(): float(value)
+            for sample, value in self.connection.hgetall(KEY_PREFIX + metric).items()
+        }
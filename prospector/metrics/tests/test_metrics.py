@@ -0,0 +1,194 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.http import HttpResponseNotFound
+from django.test import override_settings
+from django.utils import timezone
+
+from prospector import metrics
+from prospector.apis.crm import crm
+from prospector.apps.crm import metrics as crm_metrics
+from prospector.apps.crm import services
+from prospector.apps.parity.management.commands import data_upload
+from prospector.apps.questionnaire import tasks
+from prospector.apps.questionnaire.tests.factories import AnswersFactory
+from prospector.management.commands import generate_synthetic_data
+from prospector.metrics.backends import RedisBackend
+from prospector.middleware.metrics import MetricsMiddleware
+
+METRICS_URL = "/.well-known/x-metrics"
+
+
+@pytest.fixture(autouse=True)
+def fresh_backend():
+    metrics.reset_backend()
+    yield
+    metrics.reset_backend()
+
+
+def test_histogram_exposition():
+    histogram = metrics.Histogram(
+        "test_duration_seconds", "Test durations", ["view"], buckets=(0.1, 1)
+    )
+
+    histogram.observe(0.05, view="Start")
+    histogram.observe(0.5, view="Start")
+
+    assert histogram.exposition().splitlines() == [
+        "# HELP test_duration_seconds Test durations",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{view="Start",le="+Inf"} 2',
+        'test_duration_seconds_bucket{view="Start",le="0.1"} 1',
+        'test_duration_seconds_bucket{view="Start",le="1"} 2',
+        'test_duration_seconds_count{view="Start"} 2',
+        'test_duration_seconds_sum{view="Start"} 0.55',
+    ]
+
+
+def test_labels_are_checked_and_escaped():
+    counter = metrics.Counter("test_total", "Test", ["reason"])
+
+    counter.inc(reason='a "quoted"\nvalue')
+
+    assert 'test_total{reason="a \\"quoted\\"\\nvalue"} 1' in counter.exposition()
+    with pytest.raises(ValueError):
+        counter.inc(other="x")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+    def hincrbyfloat(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field.encode()] = float(values.get(field.encode(), 0)) + amount
+
+    def hset(self, key, mapping):
+        values = self.hashes.setdefault(key, {})
+        values.update({field.encode(): value for field, value in mapping.items()})
+
+    def hgetall(self, key):
+        return self.hashes.get(key, {})
+
+
+def test_redis_backend_shares_samples_between_instances():
+    connection = FakeRedis()
+    RedisBackend(connection).incr("m", {'{a="1"}': 2})
+    RedisBackend(connection).incr("m", {'{a="1"}': 3})
+
+    assert RedisBackend(connection).collect("m") == {'{a="1"}': 5.0}
+
+
+def test_recording_never_raises(mocker):
+    mocker.patch.object(
+        metrics.backends.LocalBackend, "incr", side_effect=ConnectionError
+    )
+
+    metrics.Counter("test_broken_total", "Test").inc()
+
+
+def test_buffered_samples_are_written_on_flush(mocker):
+    histogram = metrics.Histogram(
+        "test_buffered_seconds", "Test", ["view"], buckets=(1,), buffered=True
+    )
+    histogram.observe(0.5, view="Start")
+    histogram.observe(2, view="Start")
+    assert histogram.samples() == {}
+
+    metrics.flush()
+
+    assert histogram.samples() == {
+        '_bucket{view="Start",le="1"}': 1,
+        '_bucket{view="Start",le="+Inf"}': 2,
+        '_sum{view="Start"}': 2.5,
+        '_count{view="Start"}': 2,
+    }
+    mocker.patch.object(
+        metrics.backends.LocalBackend, "incr", side_effect=ConnectionError
+    )
+    histogram.observe(0.5, view="Start")
+    metrics.flush()
+
+
+@pytest.mark.django_db
+def test_cleanup_counts_deleted_answers():
+    AnswersFactory(terms_accepted_at=None)
+    AnswersFactory(terms_accepted_at=timezone.now())
+
+    tasks.cleanup()
+
+    assert metrics.REGISTRY["prospector_cleanup_deleted_total"].samples() == {
+        '{reason="terms_not_accepted"}': 1
+    }
+
+
+@pytest.mark.django_db
+def test_import_duration(tmp_path):
+    path = tmp_path / "parity.csv"
+    call_command(
+        generate_synthetic_data.Command(), "--parity-rows=3", "--parity-csv=%s" % path
+    )
+
+    call_command(data_upload.Command(), "--file=%s" % path)
+
+    samples = metrics.IMPORT_DURATION.samples()
+    assert samples['_count{command="data_upload"}'] == 1
+
+
+@pytest.mark.django_db
+def test_pending_gauges():
+    AnswersFactory(completed_at=timezone.now() - timezone.timedelta(hours=1))
+
+    assert crm_metrics.PENDING.samples() == {"": 1}
+    assert 3500 < crm_metrics.PENDING_AGE.samples()[""] < 3700
+
+
+@pytest.mark.django_db
+@override_settings(METRICS_TOKEN="secret")
+def test_endpoint(client):
+    assert client.get(METRICS_URL).status_code == 401
+
+    response = client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    assert "# TYPE prospector_crm_submissions_total counter" in body
+    assert "prospector_crm_pending_answers 0" in body
+
+
+@override_settings(METRICS_TOKEN="")
+def test_endpoint_is_off_without_a_token(rf):
+    middleware = MetricsMiddleware(lambda request: HttpResponseNotFound())
+    assert middleware(rf.get(METRICS_URL)).status_code == 404
+
+
+@pytest.mark.django_db
+@override_settings(METRICS_TOKEN="secret")
+def test_async_endpoint(rf):
+    async def not_found(request):
+        return HttpResponseNotFound()
+
+    middleware = async_to_sync(MetricsMiddleware(not_found))
+
+    assert middleware(rf.get("/")).status_code == 404
+    response = middleware(rf.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret"))
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_crm_submission_outcomes(mocker):
+    answers = AnswersFactory(completed_at=timezone.now())
+    mocker.patch.object(crm, "create_pcc_record", return_value={"error": "no"})
+
+    with pytest.raises(services.CrmSubmissionError):
+        services.push(None, answers)
+
+    assert crm_metrics.SUBMISSIONS.samples() == {'{outcome="failed"}': 1}
+    assert crm_metrics.SUBMIT_DURATION.samples()['_count{outcome="failed"}'] == 1
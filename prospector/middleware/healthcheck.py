@@ -1,3 +1,5 @@
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
 from django.http import HttpResponse
 
 
@@ -17,10 +19,22 @@ class HealthCheckMiddleware:
     MIDDLEWARE list.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         if request.path == "/.well-known/x-healthcheck":
             return HttpResponse("ok")
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path == "/.well-known/x-healthcheck":
+            return HttpResponse("ok")
+        return await self.get_response(request)
@@ -0,0 +1,57 @@
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from prospector import metrics
+
+
+class MetricsMiddleware:
+    """
+    Serve the metrics of every process in the Prometheus text format.
+
+    Like HealthCheckMiddleware, this answers before ALLOWED_HOSTS is checked, so
+    that a scraper can reach each instance directly, at
+    /.well-known/x-metrics.  Scrapers must send
+    ``Authorization: Bearer <METRICS_TOKEN>``; with no METRICS_TOKEN set the
+    endpoint is off.
+
+    This must be placed above django.middleware.common.CommonMiddleware in the
+    MIDDLEWARE list.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_scrape(request):
+            return self.scrape(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.is_scrape(request):
+            # Reads every metric from the backend, so off the event loop
+            return await sync_to_async(self.scrape, thread_sensitive=False)(request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def is_scrape(request) -> bool:
+        return request.path == "/.well-known/x-metrics" and bool(settings.METRICS_TOKEN)
+
+    @staticmethod
+    def scrape(request):
+        if not constant_time_compare(
+            request.headers.get("Authorization", ""),
+            "Bearer %s" % settings.METRICS_TOKEN,
+        ):
+            return HttpResponse("Unauthorized", status=401)
+        return HttpResponse(metrics.exposition(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,308 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from django.utils.module_loading import import_string
+
+from prospector import metrics
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestStats"]] = ContextVar(
+    "performance_request_stats", default=None
+)
+_MISSING = object()
+
+REQUEST_DURATION = metrics.Histogram(
+    "prospector_request_duration_seconds",
+    "Time taken to respond to a request, by view and method",
+    ["view", "method"],
+    buffered=True,
+)
+
+
+class RequestStats:
+    """What one request spent its time on."""
+
+    def __init__(self):
+        self.view = None
+        self.started = time.perf_counter()
+        self.wall = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache = Counter()  # "hits" and "misses"
+        self.http_calls = Counter()  # By tag
+        self.http_time = Counter()
+
+    def measures(self) -> dict:
+        """Flat measures, in the units budgets are given in."""
+        measures = {
+            "wall_ms": self.wall * 1000,
+            "queries": self.queries,
+            "db_ms": self.db_time * 1000,
+            "http_ms": sum(self.http_time.values()) * 1000,
+            "cache_hits": self.cache["hits"],
+            "cache_misses": self.cache["misses"],
+        }
+        for tag, calls in self.http_calls.items():
+            measures["%s_calls" % tag] = calls
+            measures["%s_ms" % tag] = self.http_time[tag] * 1000
+        return measures
+
+
+class Aggregates:
+    """Per-view totals since the process started, shared between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def add(self, stats: RequestStats, over_budget: bool):
+        with self._lock:
+            view = self._views.setdefault(
+                stats.view, {"requests": 0, "over_budget": 0, "total": Counter()}
+            )
+            view["requests"] += 1
+            view["over_budget"] += over_budget
+            measures = stats.measures()
+            view["total"].update(measures)
+            view.setdefault("max", {})
+            for name, value in measures.items():
+                view["max"][name] = max(view["max"].get(name, 0), value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    "requests": view["requests"],
+                    "over_budget": view["over_budget"],
+                    "mean": {
+                        measure: round(total / view["requests"], 2)
+                        for measure, total in sorted(view["total"].items())
+                    },
+                    "max": {
+                        measure: round(value, 2)
+                        for measure, value in sorted(view["max"].items())
+                    },
+                }
+                for name, view in sorted(self._views.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+aggregates = Aggregates()
+
+
+def http_tag(url: str) -> str:
+    """The service an outbound request is for, from PERFORMANCE_HTTP_TAGS."""
+    host = urlsplit(url).hostname or ""
+    tags = settings.PERFORMANCE_HTTP_TAGS
+    crm_host = urlsplit(settings.CRM_API.get("RESOURCE", "")).hostname
+    if crm_host and host == crm_host:
+        return "crm"
+    return tags.get(host, "other")
+
+
+def budget_for(view: str) -> dict:
+    budgets = settings.PERFORMANCE_BUDGETS
+    return {**budgets.get("*", {}), **budgets.get(view, {})}
+
+
+def over_budget(stats: RequestStats) -> dict:
+    """The measures of ``stats`` that exceed its view's budget."""
+    measures = stats.measures()
+    return {
+        name: round(measures.get(name, 0), 2)
+        for name, limit in budget_for(stats.view).items()
+        if measures.get(name, 0) > limit
+    }
+
+
+def _send(original):
+    @wraps(original)
+    def send(self, request, **kwargs):
+        stats = _current.get()
+        if stats is None:
+            return original(self, request, **kwargs)
+        started = time.perf_counter()
+        try:
+            return original(self, request, **kwargs)
+        finally:
+            tag = http_tag(str(request.url))
+            stats.http_calls[tag] += 1
+            stats.http_time[tag] += time.perf_counter() - started
+
+    send.instrumented = True
+    return send
+
+
+def _async_send(original):
+    @wraps(original)
+    async def send(self, request, **kwargs):
+        stats = _current.get()
+        if stats is None:
+            return await original(self, request, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await original(self, request, **kwargs)
+        finally:
+            tag = http_tag(str(request.url))
+            stats.http_calls[tag] += 1
+            stats.http_time[tag] += time.perf_counter() - started
+
+    send.instrumented = True
+    return send
+
+
+def time_query(execute, sql, params, many, context):
+    """A database execute wrapper that times queries in the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def _time_queries(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, time_query)
+
+
+def _cache_get(original):
+    @wraps(original)
+    def get(self, key, default=None, version=None):
+        stats = _current.get()
+        if stats is None:
+            return original(self, key, default, version)
+        value = original(self, key, _MISSING, version)
+        stats.cache["misses" if value is _MISSING else "hits"] += 1
+        return default if value is _MISSING else value
+
+    get.instrumented = True
+    return get
+
+
+def instrument():
+    """Time queries and outbound HTTP and count cache hits; idempotent.
+
+    Every call ``requests`` makes goes through ``Session.send`` (and every httpx
+    call through its clients' ``send``), and the session and postcode caches are
+    read with ``get``, so wrapping those once covers the Postcoder, Data8 and CRM
+    clients and the configured caches.  Queries are timed by ``time_query``, an
+    execute wrapper added to each database connection as it's made, in whichever
+    thread.  The request being measured is found from a context variable, which
+    follows it from an async view into the threads its sync code runs in.
+    Outside a request the wrappers do nothing but call through.
+    """
+    if not getattr(requests.Session.send, "instrumented", False):
+        requests.Session.send = _send(requests.Session.send)
+    if not getattr(httpx.Client.send, "instrumented", False):
+        httpx.Client.send = _send(httpx.Client.send)
+    if not getattr(httpx.AsyncClient.send, "instrumented", False):
+        httpx.AsyncClient.send = _async_send(httpx.AsyncClient.send)
+    connection_created.connect(_time_queries, dispatch_uid=__name__)
+    for connection in connections.all(initialized_only=True):
+        _time_queries(None, connection)
+    for cache in settings.CACHES.values():
+        backend = import_string(cache["BACKEND"])
+        if not getattr(backend.get, "instrumented", False):
+            backend.get = _cache_get(backend.get)
+
+
+class PerformanceMiddleware:
+    """
+    Record where each request spends its time, per view.
+
+    Wall time, database queries and their time, cache hits and misses and
+    outbound HTTP calls (tagged by service, see ``http_tag``) are added to
+    per-view ``aggregates``, which staff can read at
+    ``<ADMIN_URL>performance/``.  A request that exceeds its view's entry in
+    PERFORMANCE_BUDGETS (or the "*" entry) is logged as a warning, e.g. a
+    ``postcoder_calls`` budget of 1 catches a page that looks the postcode up
+    twice.  With DEBUG on, the timings are also sent in a Server-Timing header.
+
+    Place this straight after HealthCheckMiddleware so that everything but
+    health checks is measured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        instrument()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, stats, response)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, stats, response)
+
+    def finish(self, request, stats: RequestStats, response):
+        stats.wall = time.perf_counter() - stats.started
+        if stats.view is None:
+            stats.view = getattr(request.resolver_match, "view_name", None) or "-"
+        exceeded = over_budget(stats)
+        if exceeded:
+            logger.warning(
+                "%s %s over budget: %s", request.method, stats.view, exceeded
+            )
+        aggregates.add(stats, bool(exceeded))
+        REQUEST_DURATION.observe(stats.wall, view=stats.view, method=request.method)
+
+        if settings.DEBUG:
+            response["Server-Timing"] = ", ".join(
+                "%s;dur=%.1f" % (name[:-3], value)
+                for name, value in stats.measures().items()
+                if name.endswith("_ms")
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = _current.get()
+        if stats is not None:
+            view_class = getattr(view_func, "view_class", None)
+            stats.view = (view_class or view_func).__name__
+
+
+def performance_report(request):
+    """This process's per-view aggregates, as JSON."""
+    return JsonResponse(
+        {"budgets": settings.PERFORMANCE_BUDGETS, "views": aggregates.snapshot()}
+    )
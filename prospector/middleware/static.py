@@ -0,0 +1,42 @@
+from asgiref.sync import iscoroutinefunction
+from asgiref.sync import markcoroutinefunction
+from asgiref.sync import sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, able to run in an async middleware chain as well as a sync one.
+
+    WhiteNoise's own middleware is sync only, so under ASGI Django would run it,
+    and everything after it, the views included, in a thread for each request.
+    This serves static files from a thread, as they are opened from disk, and
+    passes every other request straight on.
+
+    Use this in place of whitenoise.middleware.WhiteNoiseMiddleware, where its
+    docs say to put that.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            find_file = sync_to_async(self.find_file, thread_sensitive=False)
+            static_file = await find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            serve = sync_to_async(self.serve, thread_sensitive=False)
+            return await serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,132 @@
+import logging
+
+import httpx
+import pytest
+import requests
+from asgiref.sync import async_to_sync
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test import override_settings
+from django.urls import reverse
+
+from prospector.apis import postcoder
+from prospector.apps.questionnaire.models import Answers
+from prospector.benchmarks import cases
+from prospector.middleware import performance
+from prospector.middleware.performance import PerformanceMiddleware
+
+
+@pytest.fixture(autouse=True)
+def aggregates():
+    performance.aggregates.reset()
+    yield performance.aggregates
+    performance.aggregates.reset()
+
+
+def lookup_twice(request):
+    caches["default"].set("seen", 1)
+    caches["default"].get("seen")
+    caches["default"].get("unseen")
+    requests.get("https://ws.postcoder.com/pcw/KEY/addressbase/PL1")
+    requests.get("https://ws.postcoder.com/pcw/KEY/addressbase/PL1")
+    requests.post("https://crm.example.com/api/data/v9.1/entities")
+    return HttpResponse("ok")
+
+
+@override_settings(
+    CRM_API={"RESOURCE": "https://crm.example.com/"},
+    PERFORMANCE_BUDGETS={"*": {"postcoder_calls": 1}},
+    DEBUG=True,
+)
+def test_records_cache_and_tagged_http_calls(requests_mock, caplog, aggregates):
+    requests_mock.get("https://ws.postcoder.com/pcw/KEY/addressbase/PL1", json=[])
+    requests_mock.post("https://crm.example.com/api/data/v9.1/entities", json={})
+
+    def get_response(request):
+        middleware.process_view(request, lookup_twice, (), {})
+        return lookup_twice(request)
+
+    middleware = PerformanceMiddleware(get_response)
+
+    with caplog.at_level(logging.WARNING, logger=performance.__name__):
+        response = middleware(RequestFactory().get("/"))
+
+    view = aggregates.snapshot()["lookup_twice"]
+    assert view["requests"] == 1
+    assert view["over_budget"] == 1
+    assert view["mean"]["cache_hits"] == 1
+    assert view["mean"]["cache_misses"] == 1
+    assert view["mean"]["postcoder_calls"] == 2
+    assert view["mean"]["crm_calls"] == 1
+    assert "postcoder_calls" in caplog.text
+    assert "postcoder;dur=" in response["Server-Timing"]
+
+
+def test_outside_a_request_nothing_is_recorded(requests_mock, aggregates):
+    PerformanceMiddleware(lookup_twice)
+    requests_mock.get("https://ws.postcoder.com/", json=[])
+
+    requests.get("https://ws.postcoder.com/")
+
+    assert caches["default"].get("missing", "default") == "default"
+    assert aggregates.snapshot() == {}
+
+
+@pytest.mark.django_db
+@override_settings(PERFORMANCE_BUDGETS={})
+def test_records_queries_per_view_class(aggregates):
+    cases.trail()()
+
+    views = aggregates.snapshot()
+    assert views["PropertyAddress"]["requests"] == 2  # POST and redirected GET
+    assert views["PropertyAddress"]["mean"]["queries"] > 0
+    assert views["RecommendedMeasures"]["requests"] == 1
+
+
+@pytest.mark.django_db
+@override_settings(POSTCODER_API_KEY="KEY")
+def test_records_async_views(aggregates, monkeypatch):
+    response = httpx.Response(200, json=[])
+    monkeypatch.setattr(
+        httpx,
+        "AsyncHTTPTransport",
+        lambda retries: httpx.MockTransport(lambda request: response),
+    )
+
+    async def lookup(request):
+        await postcoder.aget_for_postcode("PL2 1BX")
+        await Answers.objects.acount()
+        return HttpResponse("ok")
+
+    middleware = PerformanceMiddleware(lookup)
+    assert iscoroutinefunction(middleware)
+    async_to_sync(middleware)(RequestFactory().get("/"))
+
+    view = aggregates.snapshot()["-"]
+    assert view["mean"]["postcoder_calls"] == 1
+    assert view["mean"]["queries"] == 1
+
+
+@pytest.mark.django_db
+def test_times_queries_on_new_connections():
+    performance.instrument()
+    connection = connections.create_connection("default")
+    try:
+        connection.ensure_connection()
+        assert connection.execute_wrappers == [performance.time_query]
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db
+def test_report_is_staff_only(client, admin_client, aggregates):
+    url = reverse("performance-report")
+
+    assert client.get(url).status_code == 302
+    response = admin_client.get(url)
+
+    assert response.status_code == 200
+    assert "budgets" in response.json()
@@ -0,0 +1,329 @@
+"""Synthetic Parity rows and Answers for benchmarks and load tests.
+
+Values for columns that ``prepopulate_from_parity`` copies onto ``Answers`` are
+drawn from the matching ``Answers`` field's choices, so prepopulated answers
+behave like real ones in the eligibility and recommendation properties.
+Every row has its own ``random.Random``, seeded from the seed and the row's
+index, so a seed always gives the same data and any row can be rebuilt without
+the ones before it.
+"""
+
+import random
+import uuid
+from datetime import datetime
+from datetime import timedelta
+from typing import Optional
+
+from prospector.apps.crm.models import CrmState
+from prospector.apps.questionnaire import enums
+from prospector.apps.questionnaire.models import Answers
+
+# The 49 columns of the Parity CSV, in the order data_upload reads them.
+PARITY_COLUMNS = [
+    "org_ref",
+    "address_link",
+    "googlemaps",
+    "address_1",
+    "address_2",
+    "address_3",
+    "postcode",
+    "sap_score",
+    "sap_band",
+    "lodged_epc_score",
+    "lodged_epc_band",
+    "unused_11",
+    "unused_12",
+    "unused_13",
+    "unused_14",
+    "tco2_current",
+    "unused_16",
+    "unused_17",
+    "unused_18",
+    "realistic_fuel_bill",
+    "type",
+    "attachment",
+    "construction_years",
+    "heated_rooms",
+    "unused_24",
+    "wall_construction",
+    "wall_insulation",
+    "roof_construction",
+    "roof_insulation",
+    "floor_construction",
+    "floor_insulation",
+    "glazing",
+    "heating",
+    "boiler_efficiency",
+    "main_fuel",
+    "controls_adequacy",
+    "local_authority",
+    "ward",
+    "parliamentary_constituency",
+    "region_name",
+    "tenure",
+    "uprn",
+    "lat_coordinate",
+    "long_coordinate",
+    "unused_44",
+    "lower_super_output_area_code",
+    "total_floor_area",
+    "income_decile",
+    "multiple_deprivation_index",
+]
+
+# Parity column -> the Answers field whose choices it is drawn from
+PARITY_CHOICE_FIELDS = {
+    "type": "property_type",
+    "attachment": "property_attachment",
+    "construction_years": "property_construction_years",
+    "wall_construction": "wall_construction",
+    "wall_insulation": "walls_insulation",
+    "roof_construction": "roof_construction",
+    "roof_insulation": "roof_insulation",
+    "floor_construction": "floor_construction",
+    "floor_insulation": "floor_insulation",
+    "glazing": "glazing",
+    "heating": "heating",
+    "boiler_efficiency": "boiler_efficiency",
+    "main_fuel": "main_fuel",
+    "controls_adequacy": "controls_adequacy",
+}
+
+STREETS = [
+    "Benbow Street",
+    "Armada Way",
+    "Mutley Plain",
+    "Embankment Road",
+    "Union Street",
+    "North Hill",
+    "Albert Road",
+    "Alma Road",
+]
+WARDS = ["Drake", "Stoke", "Devonport", "Compton", "Efford and Lipson", "St Peter"]
+PHONE_FORMATS = [
+    "01752 4%05d",
+    "(01752) 4%05d",
+    "+44 7700 9%05d",
+    "0044 20 794%05d",
+    "07700-9%05d",
+]
+# Parity rows have UPRNs from PARITY_UPRN; Answers for a property that isn't in
+# the Parity data have theirs from UNMATCHED_UPRN, so they never match a row
+PARITY_UPRN = 100000000000
+UNMATCHED_UPRN = 900000000000
+SAP_BANDS = [(92, "A"), (81, "B"), (69, "C"), (55, "D"), (39, "E"), (21, "F")]
+TENURES = [
+    ("Owner-occupied", 0.62),
+    ("Rented (private)", 0.21),
+    ("Rented (social)", 0.17),
+]
+RESPONDENT_ROLES = [
+    (enums.RespondentRole.OWNER_OCCUPIER, 0.6),
+    (enums.RespondentRole.TENANT, 0.25),
+    (enums.RespondentRole.LANDLORD, 0.1),
+    (enums.RespondentRole.OTHER, 0.05),
+]
+
+COMPLETION_RATE = 0.7
+# The CRM submissions of a completed questionnaire
+CRM_HISTORIES = [
+    ((CrmState.SUCCESS,), 0.85),
+    ((CrmState.FAILURE, CrmState.SUCCESS), 0.07),
+    ((CrmState.FAILURE,), 0.03),
+    ((), 0.05),
+]
+
+
+def _rng(seed, kind: str, index: int) -> random.Random:
+    # Each row has its own generator, so any row can be rebuilt on its own
+    return random.Random("%s:%s:%d" % (seed, kind, index))
+
+
+def _choices(field_name: str) -> list:
+    return [value for value, _ in Answers._meta.get_field(field_name).choices]
+
+
+def _weighted(rng: random.Random, weighted: list):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def sap_band(score: float) -> str:
+    for lower, band in SAP_BANDS:
+        if score >= lower:
+            return band
+    return "G"
+
+
+def postcode(rng: random.Random) -> str:
+    return "PL%d %d%s" % (
+        rng.randint(1, 9),
+        rng.randint(1, 9),
+        "".join(rng.choice("ABDEFGHJLNPQRSTUWXYZ") for _ in range(2)),
+    )
+
+
+def phone_number(rng: random.Random) -> str:
+    """A UK phone number, in one of the ways people type them."""
+    return rng.choice(PHONE_FORMATS) % rng.randint(0, 99999)
+
+
+def parity_row(seed, index: int) -> list:
+    """Row ``index`` of the Parity CSV, as the strings data_upload reads.
+
+    SAP scores are roughly normal around 62, like the English housing stock, and
+    fuel bills and emissions grow with floor area and fall with the SAP score.
+    """
+    rng = _rng(seed, "parity", index)
+    sap_score = round(min(100, max(1, rng.gauss(62, 14))), 2)
+    lodged_score = round(sap_score + rng.gauss(0, 5)) if rng.random() < 0.7 else None
+    lodged_score = min(100, max(1, lodged_score)) if lodged_score else None
+    floor_area = round(min(400, max(25, rng.lognormvariate(4.45, 0.35))))
+    fuel_bill = round(floor_area * (130 - sap_score) * rng.uniform(0.2, 0.3))
+    values = {
+        "org_ref": "ORG%07d" % index,
+        "address_link": "LINK%07d" % index,
+        "googlemaps": "",
+        "address_1": "%d %s" % (rng.randint(1, 300), rng.choice(STREETS)),
+        "address_2": "Plymouth",
+        "address_3": "",
+        "postcode": postcode(rng),
+        "sap_score": str(sap_score),
+        "sap_band": sap_band(sap_score),
+        "lodged_epc_score": str(lodged_score or ""),
+        "lodged_epc_band": sap_band(lodged_score) if lodged_score else "",
+        "tco2_current": "%.1f" % (fuel_bill / 330),
+        "realistic_fuel_bill": str(fuel_bill),
+        "heated_rooms": str(max(1, round(floor_area / 18))),
+        "local_authority": "Plymouth",
+        "ward": rng.choice(WARDS),
+        "parliamentary_constituency": "Plymouth Sutton and Devonport",
+        "region_name": "South West",
+        "tenure": _weighted(rng, TENURES),
+        "uprn": str(PARITY_UPRN + index),
+        "lat_coordinate": "%.8f" % rng.uniform(50.35, 50.44),
+        "long_coordinate": "%.8f" % rng.uniform(-4.2, -4.05),
+        "lower_super_output_area_code": "E010%05d" % rng.randint(0, 99999),
+        "total_floor_area": str(floor_area),
+        "income_decile": str(rng.randint(1, 10)),
+        "multiple_deprivation_index": str(rng.randint(1, 10)),
+    }
+    for column, field_name in PARITY_CHOICE_FIELDS.items():
+        values[column] = str(rng.choice(_choices(field_name)))
+    return [values.get(column, "") for column in PARITY_COLUMNS]
+
+
+def short_uid(seed: int, index: int) -> str:
+    """A ``short_uid`` like ``utils.generate_id``'s, unique for each seed and index.
+
+    Bulk inserts skip ``Answers.save``, which is what usually sets it.
+    """
+    letters, digits = "ABCDEFGHIJKLMNPQRSTUVWXYZ", "123456789"
+    number = (seed * 10**8 + index) % (25**5 * 9**5)
+    number, uid = divmod(number, 9**5)
+    code = ""
+    for _ in range(5):
+        number, letter = divmod(number, 25)
+        uid, digit = divmod(uid, 9)
+        code += letters[letter] + digits[digit]
+    return code
+
+
+def make_answers(seed, index: int, parity: Optional[list] = None) -> Answers:
+    """Unsaved Answers number ``index``, for the property in ``parity`` if given.
+
+    Choice fields are picked at random, with the property's fields then copied
+    from the Parity row as ``prepopulate_from_parity`` would.  Incomes are
+    log-normal around the regional median.
+    """
+    rng = _rng(seed, "answers", index)
+    income = int(round(rng.lognormvariate(10.35, 0.55), -2))
+    instance = Answers(
+        uuid=uuid.UUID(int=rng.getrandbits(128), version=4),
+        short_uid=short_uid(seed, index),
+        first_name="Test",
+        last_name="Respondent %d" % index,
+        email="respondent%d@example.com" % index,
+        contact_phone=phone_number(rng),
+        property_address_1="%d %s" % (rng.randint(1, 300), rng.choice(STREETS)),
+        property_address_3="Plymouth",
+        property_postcode=postcode(rng),
+        uprn=str(UNMATCHED_UPRN + index),
+        sap_score=round(min(100, max(1, rng.gauss(62, 14)))),
+        household_income=income,
+        household_income_after_tax=int(round(income * rng.uniform(0.75, 0.9), -2)),
+        housing_costs=int(round(income * rng.uniform(0.15, 0.35) / 12, -1)),
+        total_floor_area=round(min(400, max(25, rng.lognormvariate(4.45, 0.35)))),
+    )
+    for field in Answers._meta.concrete_fields:
+        if field.choices:
+            setattr(instance, field.attname, rng.choice(field.choices)[0])
+    instance.respondent_role = _weighted(rng, RESPONDENT_ROLES)
+    instance.sap_band = sap_band(instance.sap_score)
+
+    if parity:
+        row = dict(zip(PARITY_COLUMNS, parity))
+        for column, field_name in PARITY_CHOICE_FIELDS.items():
+            setattr(instance, field_name, row[column])
+        instance.property_address_1 = row["address_1"]
+        instance.property_address_2 = row["address_2"]
+        instance.property_postcode = row["postcode"]
+        instance.uprn = row["uprn"]
+        instance.parity_id = row["uprn"]
+        instance.sap_score = int(float(row["sap_score"]))
+        instance.sap_band = row["sap_band"]
+        instance.lodged_epc_score = row["lodged_epc_score"] or None
+        instance.lodged_epc_band = row["lodged_epc_band"] or None
+        instance.total_floor_area = int(row["total_floor_area"])
+        instance.realistic_fuel_bill = row["realistic_fuel_bill"]
+        instance.t_co2_current = row["tco2_current"]
+        instance.heated_rooms = int(row["heated_rooms"])
+        instance.income_decile = int(row["income_decile"])
+        instance.multiple_deprivation_index = int(row["multiple_deprivation_index"])
+    else:
+        instance.realistic_fuel_bill = str(
+            round(instance.total_floor_area * (130 - instance.sap_score) / 4)
+        )
+    return instance
+
+
+def synthetic_answers(count: int, seed: int = 0):
+    for i in range(count):
+        yield make_answers(seed, i)
+
+
+def parity_rows(count: int, seed: int = 0):
+    for i in range(count):
+        yield parity_row(seed, i)
+
+
+def history(seed, index: int, end: datetime, days: int) -> dict:
+    """When Answers ``index`` was started and completed, and its CRM submissions.
+
+    Questionnaires are spread evenly over the ``days`` before ``end``.  Returns
+    ``created_at``, ``updated_at`` and ``completed_at`` (None if abandoned), and
+    ``crm``, a list of (state, created_at) for its ``CrmResult`` rows.
+    """
+    rng = _rng(seed, "history", index)
+    created_at = end - timedelta(days=rng.uniform(0, days))
+    if rng.random() >= COMPLETION_RATE:
+        updated_at = created_at + timedelta(seconds=rng.expovariate(1 / 300))
+        return {
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "completed_at": None,
+            "crm": [],
+        }
+
+    completed_at = created_at + timedelta(seconds=rng.expovariate(1 / 900))
+    crm = []
+    submitted_at = completed_at
+    for state in _weighted(rng, CRM_HISTORIES):
+        submitted_at += timedelta(seconds=rng.expovariate(1 / 120))
+        crm.append((state, submitted_at))
+    return {
+        "created_at": created_at,
+        "updated_at": completed_at,
+        "completed_at": completed_at,
+        "crm": crm,
+    }
@@ -126,8 +126,10 @@ class TrailMixin:
             )
 
     def set_trail(self, trail):
-        # This is just for mocking, really.
-        self.request.session[self.trail_session_id] = trail
+        # Only write when the trail actually changes, so re-posting a page already
+        # on the trail doesn't mark the session as modified and force a save.
+        if self.request.session.get(self.trail_session_id) != trail:
+            self.request.session[self.trail_session_id] = trail
 
     def get_trail_initial(self):
         """Get the starting page for the trail."""
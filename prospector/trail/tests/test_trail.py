@@ -1,10 +1,12 @@
+from django.contrib.sessions.middleware import SessionMiddleware
 from django.shortcuts import redirect
 from django.test import override_settings
+from django.test import RequestFactory
 from django.urls import path
 from django.views.generic import TemplateView
 
 from ..mixin import TrailMixin
-
+from prospector.testutils import add_middleware_to_request
 
 #
 # Fake setup data for unit testing
@@ -102,3 +104,24 @@ def test_disallowed_view():
     view = Page3()
 
     assert view.dispatch(None).url == redirect("page2").url
+
+
+def test_set_trail_only_writes_session_on_change():
+    """Re-setting the same trail shouldn't mark the session as modified."""
+
+    class Page2(TrailMixin, FakeView):
+        trail_initial = ["Page1"]
+        trail_session_id = "trail"
+
+    view = Page2()
+    view.request = RequestFactory().get("/")
+    add_middleware_to_request(view.request, SessionMiddleware)
+    view.request.session["trail"] = ["Page1", "Page2"]
+    view.request.session.modified = False
+
+    view.set_trail(["Page1", "Page2"])
+    assert view.request.session.modified is False
+
+    view.set_trail(["Page1", "Page2", "Page3"])
+    assert view.request.session.modified is True
+    assert view.get_trail() == ["Page1", "Page2", "Page3"]
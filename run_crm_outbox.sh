@@ -0,0 +1,10 @@
+#!/bin/bash
+export DJANGO_SETTINGS_MODULE=config.settings.production
+cd /home/plymouth/prospector
+source /home/plymouth/venv/bin/activate
+
+set -a
+. /home/plymouth/prospector/.env
+set +a
+
+python manage.py drain_crm_outbox